@@ -1 +1,220 @@
-from housing.component.data_ingestion import DataIngestion
+# app.py
+
+# Import required libraries and packages
+import os
+import time
+import itertools
+import threading
+from flask import Flask, Response, g, request, jsonify, stream_with_context
+
+from housing.config import Configuration
+from housing.logger import logging, set_log_levels
+from housing.serving.model_loader import HotReloadingModel
+from housing.serving.micro_batcher import MicroBatcher
+from housing.serving.bulk_scoring import BulkScorer
+from housing.serving.prediction_cache import PredictionCache
+from housing.serving.input_validation import RecordValidator, find_invalid_input_error
+from housing.serving.metrics import metrics, register_serving_collector
+
+app = Flask(__name__)
+
+serving_config = Configuration().serving_config()
+logger = logging.getLogger('housing.serving.app')
+set_log_levels(serving_config.log_levels)
+housing_model = HotReloadingModel(
+    export_dir_path=serving_config.export_dir_path,
+    poll_interval=serving_config.model_poll_interval,
+    use_flat_forest=serving_config.use_flat_forest
+)
+
+prediction_cache = None
+if serving_config.prediction_cache_size > 0:
+    prediction_cache = PredictionCache(
+        max_entries=serving_config.prediction_cache_size,
+        ttl_seconds=serving_config.prediction_cache_ttl_seconds,
+        shared_cache_file_path=serving_config.shared_prediction_cache_file_path,
+        shared_max_entries=serving_config.shared_prediction_cache_max_entries
+    )
+
+record_validator = RecordValidator(schema_file_path=serving_config.schema_file_path)
+
+metrics.enabled = serving_config.metrics_enabled
+register_serving_collector(metrics, housing_model, prediction_cache)
+
+# The model loader is started by the first request of every process, after a server forked it
+model_loader_lock = threading.Lock()
+model_loader_pid = None
+
+# The process whose server was checked for concurrent requests
+concurrency_checked_pid = None
+
+def get_served_model() -> tuple:
+    """
+    Returns the served version and model, starting the model loader in this process if needed.
+    """
+    global model_loader_pid
+    if model_loader_pid != os.getpid():
+        with model_loader_lock:
+            if model_loader_pid != os.getpid():
+                housing_model.start()
+                model_loader_pid = os.getpid()
+    return housing_model.get_model()
+
+def preload_model() -> None:
+    """
+    Loads the current version in the master process of a pre-forking server, so the workers
+    share the model pages copy-on-write instead of loading a copy each. The background model
+    loader is still started by the first request of each worker, as threads do not survive a fork.
+    """
+    housing_model.reload()
+    logger.info('preloaded model version: [%s] in process: [%d]', housing_model.version, os.getpid())
+
+def predict_rows(rows: list) -> list:
+    """
+    Predicts a micro-batch of records with one transform and predict call.
+
+    Returns:
+        list: The model version and the prediction of every record.
+    """
+    version, model = get_served_model()
+    if model is None:
+        raise LookupError(f'no model is published in: [{serving_config.export_dir_path}]')
+    if prediction_cache is None:
+        predictions = model.predict_records(rows)
+    else:
+        # Only the rows missing from the cache are predicted
+        predictions = prediction_cache.predict(
+            model_version=version,
+            rows=rows,
+            predict_function=model.predict_records
+        )
+    return [(version, float(prediction)) for prediction in predictions]
+
+micro_batcher = MicroBatcher(
+    predict_function=predict_rows,
+    max_batch_size=serving_config.max_batch_size,
+    max_wait_us=serving_config.max_wait_us
+)
+
+def get_error_response(error: Exception, action: str) -> tuple:
+    """
+    Answers an input that does not match the schema with 400 and its description, and any
+    other failure with 500 and a generic message, its details staying in the server log.
+    """
+    invalid_input_error = find_invalid_input_error(error)
+    if invalid_input_error is not None:
+        logger.info('%s rejected: [%s]', action, invalid_input_error)
+        return jsonify({'error': str(invalid_input_error)}), 400
+    logger.error('%s failed', action, exc_info=error)
+    return jsonify({'error': f'{action} failed with an internal error'}), 500
+
+@app.before_request
+def start_request_timer():
+    if metrics.enabled:
+        g.request_start_time = time.perf_counter()
+
+@app.before_request
+def check_concurrency():
+    """
+    Warns once per process when the server hands it one request at a time, as the
+    micro-batcher then never sees concurrent requests and every batch holds one request.
+    """
+    global concurrency_checked_pid
+    if concurrency_checked_pid == os.getpid():
+        return
+    concurrency_checked_pid = os.getpid()
+    if not request.environ.get('wsgi.multithread', False):
+        logger.warning(
+            'process: [%d] serves one request at a time, requests are not batched; '
+            'run threaded workers, see gunicorn.conf.py', os.getpid()
+        )
+
+@app.after_request
+def observe_request_time(response):
+    if metrics.enabled and 'request_start_time' in g:
+        metrics.observe_stage('request', time.perf_counter() - g.request_start_time)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Exposes the serving metrics of this process in the Prometheus text format.
+    """
+    if not metrics.enabled:
+        return jsonify({'error': 'metrics are disabled'}), 404
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/health', methods=['GET'])
+def health():
+    version, _ = get_served_model()
+    return jsonify({
+        'status': 'ok' if version is not None else 'no model',
+        'model_version': version,
+        'prediction_cache': prediction_cache.get_stats() if prediction_cache is not None else None
+    })
+
+@app.route('/predict', methods=['POST'])
+def predict():
+    """
+    Predicts one record given as a JSON object, or several records given as a JSON list.
+    """
+    parse_start_time = time.perf_counter() if metrics.enabled else None
+    payload = request.get_json(silent=True)
+    if parse_start_time is not None:
+        metrics.observe_stage('parse', time.perf_counter() - parse_start_time)
+
+    rows = payload if isinstance(payload, list) else [payload]
+    if len(rows) == 0 or not all(isinstance(row, dict) for row in rows):
+        return jsonify({'error': 'expected a JSON object or a list of JSON objects'}), 400
+
+    try:
+        record_validator.validate(rows)
+        results = micro_batcher.submit(rows).result()
+    except LookupError as e:
+        logger.warning('prediction refused: [%s]', e)
+        return jsonify({'error': 'no model is published yet'}), 503
+    except Exception as e:
+        return get_error_response(e, 'prediction')
+
+    version = results[0][0]
+    predictions = [prediction for _, prediction in results]
+    return jsonify({
+        'model_version': version,
+        'prediction': predictions if isinstance(payload, list) else predictions[0]
+    })
+
+@app.route('/predict/bulk', methods=['POST'])
+def predict_bulk():
+    """
+    Scores a streamed CSV upload and streams the predictions back as CSV, in input order.
+    """
+    version, model = get_served_model()
+    if model is None:
+        logger.warning('bulk scoring refused: no model is published in: [%s]', serving_config.export_dir_path)
+        return jsonify({'error': 'no model is published yet'}), 503
+
+    # The whole upload is scored by the version that was served when it started
+    bulk_scorer = BulkScorer(
+        housing_model=model,
+        schema_file_path=serving_config.schema_file_path,
+        chunk_size=serving_config.bulk_chunk_size,
+        workers=serving_config.bulk_workers,
+        model_version=version,
+        include_input=request.args.get('include_input', 'false').lower() == 'true'
+    )
+
+    # Score the first chunks before answering, so an input that does not match the schema gets an error status
+    csv_blocks = bulk_scorer.iter_csv(request.stream)
+    try:
+        first_block = next(csv_blocks)
+    except Exception as e:
+        return get_error_response(e, 'bulk scoring')
+
+    return Response(
+        stream_with_context(itertools.chain([first_block], csv_blocks)),
+        mimetype='text/csv',
+        headers={'X-Model-Version': version}
+    )
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
@@ -0,0 +1,183 @@
+# asgi.py
+
+# Import required libraries and packages
+import json
+import time
+import asyncio
+
+from housing.config import Configuration
+from housing.logger import logging, set_log_levels
+from housing.serving.model_loader import HotReloadingModel
+from housing.serving.prediction_cache import PredictionCache
+from housing.serving.inference_executor import InferenceExecutor, QueueFullError
+from housing.serving.input_validation import RecordValidator, InvalidInputError
+from housing.serving.metrics import metrics, register_serving_collector
+
+# Asynchronous prediction service, run with: uvicorn asgi:app --host 0.0.0.0 --port $PORT
+#
+# Requests are read and parsed on the event loop, so slow clients and idle keep-alive
+# connections cost no thread. Model calls go to a bounded inference executor: requests
+# beyond its queue depth are refused with 503 and requests past their deadline get 504.
+
+serving_config = Configuration().serving_config()
+logger = logging.getLogger('housing.serving.asgi')
+set_log_levels(serving_config.log_levels)
+housing_model = HotReloadingModel(
+    export_dir_path=serving_config.export_dir_path,
+    poll_interval=serving_config.model_poll_interval,
+    use_flat_forest=serving_config.use_flat_forest
+)
+inference_executor = InferenceExecutor(
+    workers=serving_config.inference_workers,
+    max_queue_depth=serving_config.max_queue_depth
+)
+
+prediction_cache = None
+if serving_config.prediction_cache_size > 0:
+    prediction_cache = PredictionCache(
+        max_entries=serving_config.prediction_cache_size,
+        ttl_seconds=serving_config.prediction_cache_ttl_seconds,
+        shared_cache_file_path=serving_config.shared_prediction_cache_file_path,
+        shared_max_entries=serving_config.shared_prediction_cache_max_entries
+    )
+
+record_validator = RecordValidator(schema_file_path=serving_config.schema_file_path)
+
+metrics.enabled = serving_config.metrics_enabled
+register_serving_collector(metrics, housing_model, prediction_cache)
+inference_queue_depth = metrics.gauge('housing_inference_queue_depth', 'Model calls waiting for an inference worker.')
+
+class RequestError(Exception):
+    """
+    Raised to answer a request with an error status.
+    """
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+def predict_rows(rows: list) -> tuple:
+    """
+    Predicts records with the served model, on an inference worker.
+
+    Returns:
+        tuple: The model version and the predictions.
+    """
+    version, model = housing_model.get_model()
+    if model is None:
+        raise LookupError(f'no model is published in: [{serving_config.export_dir_path}]')
+    if prediction_cache is None:
+        return version, [float(prediction) for prediction in model.predict_records(rows)]
+    return version, prediction_cache.predict(model_version=version, rows=rows, predict_function=model.predict_records)
+
+async def read_body(receive) -> bytes:
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise RequestError(400, 'client disconnected')
+        body.extend(message.get('body', b''))
+        if len(body) > serving_config.max_request_bytes:
+            raise RequestError(413, f'request body exceeds {serving_config.max_request_bytes} bytes')
+        if not message.get('more_body', False):
+            return bytes(body)
+
+async def send_body(send, status: int, body: bytes, content_type: bytes) -> None:
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', content_type), (b'content-length', str(len(body)).encode())]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+async def send_json(send, status: int, payload: dict) -> None:
+    await send_body(send, status, json.dumps(payload).encode(), b'application/json')
+
+async def predict(receive, deadline: float) -> dict:
+    """
+    Predicts one record given as a JSON object, or several records given as a JSON list.
+    """
+    body = await read_body(receive)
+    parse_start_time = time.perf_counter() if metrics.enabled else None
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise RequestError(400, 'expected a JSON object or a list of JSON objects')
+    if parse_start_time is not None:
+        metrics.observe_stage('parse', time.perf_counter() - parse_start_time)
+    rows = payload if isinstance(payload, list) else [payload]
+    if len(rows) == 0 or not all(isinstance(row, dict) for row in rows):
+        raise RequestError(400, 'expected a JSON object or a list of JSON objects')
+    try:
+        record_validator.validate(rows)
+    except InvalidInputError as e:
+        logger.info('prediction rejected: [%s]', e)
+        raise RequestError(400, str(e))
+
+    try:
+        if metrics.enabled:
+            inference_queue_depth.labels().set(inference_executor.waiting)
+        version, predictions = await inference_executor.run(predict_rows, rows, deadline=deadline)
+    except QueueFullError as e:
+        raise RequestError(503, str(e))
+    except asyncio.TimeoutError:
+        raise RequestError(504, f'prediction did not complete within {serving_config.request_deadline_ms} ms')
+    except LookupError as e:
+        logger.warning('prediction refused: [%s]', e)
+        raise RequestError(503, 'no model is published yet')
+    except Exception as e:
+        # The details of an internal failure stay in the server log
+        logger.error('prediction failed', exc_info=e)
+        raise RequestError(500, 'prediction failed with an internal error')
+
+    return {
+        'model_version': version,
+        'prediction': predictions if isinstance(payload, list) else predictions[0]
+    }
+
+async def lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            inference_executor.start()
+            # Loading the model reads and unpickles files, keep it off the event loop
+            await asyncio.get_running_loop().run_in_executor(None, housing_model.start)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            housing_model.stop()
+            inference_executor.shutdown()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send) -> None:
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    deadline = asyncio.get_running_loop().time() + serving_config.request_deadline_ms / 1000
+    request_start_time = time.perf_counter() if metrics.enabled else None
+    route = (scope['method'], scope['path'])
+    try:
+        if route == ('GET', '/health'):
+            await send_json(send, 200, {
+                'status': 'ok' if housing_model.version is not None else 'no model',
+                'model_version': housing_model.version,
+                'inference_running': inference_executor.running,
+                'inference_waiting': inference_executor.waiting,
+                'prediction_cache': prediction_cache.get_stats() if prediction_cache is not None else None
+            })
+        elif route == ('GET', '/metrics') and metrics.enabled:
+            await send_body(send, 200, metrics.render_prometheus().encode(), b'text/plain; version=0.0.4')
+        elif route == ('POST', '/predict'):
+            await send_json(send, 200, await predict(receive, deadline))
+        else:
+            raise RequestError(404, f'no route for {scope["method"]} {scope["path"]}')
+    except RequestError as e:
+        await send_json(send, e.status, {'error': str(e)})
+    except Exception as e:
+        logger.error('request: [%s %s] failed', scope['method'], scope['path'], exc_info=e)
+        await send_json(send, 500, {'error': 'internal error'})
+
+    if request_start_time is not None:
+        metrics.observe_stage('request', time.perf_counter() - request_start_time)
@@ -0,0 +1,58 @@
+# gunicorn.conf.py
+
+# Import required libraries and packages
+import gc
+import os
+import multiprocessing
+
+from housing.logger import logging
+from housing.serving.memory_report import get_memory_usage
+
+logger = logging.getLogger('housing.serving.gunicorn')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Inference is CPU bound, one worker per core unless configured otherwise
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+
+# The micro-batcher only coalesces requests a worker serves concurrently: a sync worker
+# serves one request at a time and every batch would hold a single record. The threads of a
+# worker mostly wait for their batch, the prediction itself runs once per batch.
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 16))
+
+# Import the app, and with it the model, in the master before forking the workers
+preload_app = True
+
+# Requests a worker serves between two reports of its memory, 0 disables the reports
+memory_report_every = int(os.environ.get('GUNICORN_MEMORY_REPORT_EVERY', 1000))
+
+def when_ready(server):
+    """
+    Loads the model in the master once the app is imported, then freezes the heap.
+
+    Objects moved to the permanent generation are never visited by the garbage collector,
+    so collections in the workers do not write to the pages holding the model.
+    """
+    from app import preload_model
+    preload_model()
+    gc.collect()
+    gc.freeze()
+    logger.info('master: [%d] memory: [%s]', os.getpid(), get_memory_usage())
+
+def post_request(worker, req, environ, resp):
+    """
+    Reports how much of the memory of a worker is still shared with the master, every
+    memory_report_every requests.
+
+    Right after the fork every page is shared, only serving requests shows whether the
+    pages holding the model stay shared. The same numbers are exported on /metrics.
+    """
+    if memory_report_every <= 0:
+        return
+    worker.served_requests = getattr(worker, 'served_requests', 0) + 1
+    if worker.served_requests % memory_report_every == 0:
+        logger.info(
+            'worker: [%d] memory after [%d] requests: [%s]',
+            worker.pid, worker.served_requests, get_memory_usage()
+        )
@@ -0,0 +1,562 @@
+# housing/component/artifact_retention.py
+
+# Import required libraries and packages
+import os
+import sys
+import shutil
+import sqlite3
+import hashlib
+import argparse
+import threading
+import contextlib
+from datetime import datetime, timedelta
+from collections import namedtuple
+
+from housing.constant import *
+from housing.logger import logging
+from housing.exception import CustomException
+from housing.entity.config_entity import ArtifactRetentionConfig
+from housing.entity.artifact_entity import ArtifactRetentionArtifact
+from housing.component.model_registry import ModelRegistry
+from housing.pipeline.stage_cache import StageCache
+from housing.util import read_yaml
+
+# Files smaller than this are not worth a hardlink
+MIN_DEDUPLICATED_FILE_SIZE = 4096
+
+# Tables of the file digest index
+FILE_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS file (
+    file_path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    modified_time_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS file_digest_index ON file (size, digest);
+"""
+
+# A named tuple that represents the artifacts of one pipeline run.
+#
+# Attributes:
+#     time_stamp (str): The timestamp of the run.
+#     started_at (datetime): The start time of the run, parsed from its timestamp.
+#     dir_paths (list): The run directory of every stage, artifact/<stage>/<time_stamp>.
+ArtifactRun = namedtuple(
+    'ArtifactRun',
+    [
+        'time_stamp',
+        'started_at',
+        'dir_paths'
+    ]
+)
+
+class ArtifactRetention:
+    """
+    Removes the artifacts of old pipeline runs and deduplicates the files of the kept ones.
+
+    Every run writes below artifact/<stage>/<time_stamp>. Runs beyond the newest
+    keep_last_runs, older than max_age_days, or the oldest ones while the artifacts exceed
+    max_size_gb are removed. The run of the best model is never removed, and neither is the
+    directory of any model recorded in the model registry. Runs younger than min_age_hours
+    may still be running and are left alone, and so are the runs whose artifacts a pipeline
+    reused from the stage cache within min_age_hours. The stage cache entries of a run are
+    removed before its directories, so a pipeline never reuses an artifact being removed.
+
+    Identical files of different runs, such as the downloaded dataset, are replaced by
+    hardlinks to one copy. The digests are kept in an SQLite index, so a pass only hashes new
+    or changed files, at most deduplicate_max_mb_per_pass megabytes of them, and the next
+    pass carries on where it stopped.
+
+    Args:
+        artifact_retention_config (ArtifactRetentionConfig): The retention policies.
+        current_time_stamp (str): The timestamp of the run of this process, which is never removed.
+
+    Raises:
+        CustomException: If an error occurs while initializing the retention.
+    """
+    def __init__(
+        self,
+        artifact_retention_config: ArtifactRetentionConfig,
+        current_time_stamp: str=CURRENT_TIMESTAMP
+    ) -> None:
+        try:
+            self.artifact_retention_config = artifact_retention_config
+            self.current_time_stamp = current_time_stamp
+            self.stop_event = threading.Event()
+            self.thread = None
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_runs(self) -> list:
+        """
+        List the runs found in the artifact directory, oldest first.
+
+        Directories whose name is not a run timestamp, such as the search result store or
+        the model registry, are shared by every run and never listed.
+
+        Returns:
+            list: The list of ArtifactRun.
+        """
+        try:
+            artifact_dir = self.artifact_retention_config.artifact_dir
+            runs = dict()
+            if not os.path.isdir(artifact_dir):
+                return []
+
+            for stage_entry in os.scandir(artifact_dir):
+                if not stage_entry.is_dir(follow_symlinks=False):
+                    continue
+                for run_entry in os.scandir(stage_entry.path):
+                    if not run_entry.is_dir(follow_symlinks=False):
+                        continue
+                    try:
+                        started_at = datetime.strptime(run_entry.name, RUN_TIMESTAMP_FORMAT)
+                    except ValueError:
+                        continue
+                    run = runs.setdefault(run_entry.name, ArtifactRun(run_entry.name, started_at, []))
+                    run.dir_paths.append(run_entry.path)
+
+            return sorted(runs.values(), key=lambda run: run.started_at)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_protected_paths(self, now: datetime=None) -> tuple:
+        """
+        Collect what the model registry and the recently used stage cache entries still refer to.
+
+        Args:
+            now (datetime): The time the age of the stage cache entries is measured at.
+
+        Returns:
+            tuple: The timestamps of the runs that are kept entirely, the one of the best model,
+            and the directories of every registered model, which are kept within removed runs.
+        """
+        try:
+            protected_time_stamps = set([self.current_time_stamp])
+            protected_dir_paths = set()
+
+            # A pipeline skipping unchanged stages reads the artifacts of the runs that produced them
+            stage_cache_file_path = self.artifact_retention_config.stage_cache_file_path
+            if os.path.exists(stage_cache_file_path):
+                used_since = self.get_min_age_cutoff(now or datetime.now()).timestamp()
+                for file_path in StageCache(stage_cache_file_path=stage_cache_file_path).get_used_file_paths(used_since):
+                    time_stamp = self.get_run_time_stamp(file_path)
+                    if time_stamp is not None:
+                        protected_time_stamps.add(time_stamp)
+
+            model_registry_file_path = self.artifact_retention_config.model_registry_file_path
+            if not os.path.exists(model_registry_file_path):
+                return protected_time_stamps, protected_dir_paths
+
+            model_registry = ModelRegistry(registry_file_path=model_registry_file_path)
+            for registered_model in model_registry.get_history():
+                protected_dir_paths.add(os.path.dirname(os.path.abspath(registered_model.model_path)))
+
+            # The best model may be retrained incrementally from the artifacts of its run
+            champion = model_registry.get_champion()
+            if champion is not None:
+                protected_time_stamps.add(champion.time_stamp)
+                champion_model_paths = [champion.model_path]
+
+                # A compacted best model is warm started from the trained model it points to
+                source_file_path = os.path.join(os.path.dirname(champion.model_path), COMPACTED_MODEL_SOURCE_FILE_NAME)
+                if os.path.exists(source_file_path):
+                    champion_model_paths.append(read_yaml(file_path=source_file_path)[SOURCE_MODEL_PATH_KEY])
+
+                for champion_model_path in champion_model_paths:
+                    champion_time_stamp = self.get_run_time_stamp(champion_model_path)
+                    if champion_time_stamp is not None:
+                        protected_time_stamps.add(champion_time_stamp)
+            return protected_time_stamps, protected_dir_paths
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_min_age_cutoff(self, now: datetime) -> datetime:
+        """
+        The start time before which a run, or the last use of a stage cache entry, is old enough to remove.
+        """
+        return now - timedelta(hours=self.artifact_retention_config.min_age_hours)
+
+    def release_run(self, run: ArtifactRun, now: datetime) -> bool:
+        """
+        Remove the stage cache entries of a run before its directories are removed.
+
+        Returns:
+            bool: Whether the run can be removed, False if a pipeline reused one of its
+            artifacts since the protected paths were collected.
+        """
+        try:
+            stage_cache_file_path = self.artifact_retention_config.stage_cache_file_path
+            if not os.path.exists(stage_cache_file_path):
+                return True
+            return StageCache(stage_cache_file_path=stage_cache_file_path).release_entries(
+                dir_paths=run.dir_paths,
+                used_before=self.get_min_age_cutoff(now).timestamp()
+            )
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_run_time_stamp(self, file_path: str) -> str:
+        """
+        The timestamp of the run a file belongs to, None if it is not in a run directory.
+        """
+        relative_path = os.path.relpath(os.path.abspath(file_path), self.artifact_retention_config.artifact_dir)
+        parts = relative_path.split(os.sep)
+        if len(parts) < 3 or parts[0] == os.pardir:
+            return None
+        return parts[1]
+
+    @staticmethod
+    def is_protected(file_path: str, protected_dir_paths: set) -> bool:
+        return any(
+            file_path == dir_path or file_path.startswith(dir_path + os.sep) for dir_path in protected_dir_paths
+        )
+
+    @staticmethod
+    def walk_files(dir_path: str):
+        """
+        Yield the path and the stat of every regular file below a directory.
+        """
+        stack = [dir_path]
+        while len(stack) > 0:
+            try:
+                entries = list(os.scandir(stack.pop()))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    try:
+                        yield entry.path, entry.stat(follow_symlinks=False)
+                    except FileNotFoundError:
+                        continue
+
+    def get_disk_usage(self, runs: list, protected_dir_paths: set) -> tuple:
+        """
+        Measure the disk usage of the artifacts, counting every hardlinked file once.
+
+        Returns:
+            tuple: The total size in bytes, the size of every file identified by its device and
+            inode, and the timestamps of the runs each file could be removed with. Files of no
+            run or of a protected directory map to None, since they are never removed.
+        """
+        try:
+            run_dir_paths = {dir_path: run.time_stamp for run in runs for dir_path in run.dir_paths}
+            file_sizes = dict()
+            file_runs = dict()
+            for file_path, file_stat in self.walk_files(self.artifact_retention_config.artifact_dir):
+                file_key = (file_stat.st_dev, file_stat.st_ino)
+                file_sizes[file_key] = file_stat.st_size
+
+                time_stamp = None
+                if not self.is_protected(file_path, protected_dir_paths):
+                    time_stamp = run_dir_paths.get(self.get_run_dir_path(file_path))
+                file_runs.setdefault(file_key, set()).add(time_stamp)
+            return sum(file_sizes.values()), file_sizes, file_runs
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_run_dir_path(self, file_path: str) -> str:
+        """
+        The artifact/<stage>/<time_stamp> directory holding a file.
+        """
+        artifact_dir = self.artifact_retention_config.artifact_dir
+        parts = os.path.relpath(file_path, artifact_dir).split(os.sep)
+        return os.path.join(artifact_dir, *parts[:2])
+
+    def select_expired_runs(self, runs: list, protected_time_stamps: set, disk_usage: tuple, now: datetime) -> tuple:
+        """
+        Apply the count, age and size policies, oldest run first.
+
+        Args:
+            runs (list): The runs, oldest first.
+            protected_time_stamps (set): The timestamps of the runs that are never removed.
+            disk_usage (tuple): The disk usage, see get_disk_usage.
+            now (datetime): The time the ages are measured at.
+
+        Returns:
+            tuple: The runs to remove and the number of bytes their removal frees.
+        """
+        try:
+            config = self.artifact_retention_config
+            total_size, file_sizes, file_runs = disk_usage
+            max_size = None if config.max_size_gb is None else config.max_size_gb * 1024 ** 3
+            max_age_cutoff = None if config.max_age_days is None else now - timedelta(days=config.max_age_days)
+            min_age_cutoff = self.get_min_age_cutoff(now)
+
+            # The bytes freed by a run are the files no other remaining run or directory links to
+            run_files = dict()
+            for file_key, time_stamps in file_runs.items():
+                for time_stamp in time_stamps:
+                    run_files.setdefault(time_stamp, []).append(file_key)
+
+            # A removed run whose registered model was kept has nothing left to remove
+            runs = [run for run in runs if run.time_stamp in run_files]
+
+            # Runs beyond the newest keep_last_runs are removed regardless of their size and age
+            kept_time_stamps = set()
+            if config.keep_last_runs is not None:
+                kept_time_stamps = set(run.time_stamp for run in runs[-config.keep_last_runs:])
+
+            expired_runs = []
+            freed_bytes = 0
+            for run in runs:
+                if run.time_stamp in protected_time_stamps or run.started_at > min_age_cutoff:
+                    continue
+                is_over_count = config.keep_last_runs is not None and run.time_stamp not in kept_time_stamps
+                is_too_old = max_age_cutoff is not None and run.started_at < max_age_cutoff
+                is_over_size = max_size is not None and total_size - freed_bytes > max_size
+                if not (is_over_count or is_too_old or is_over_size):
+                    continue
+
+                expired_runs.append(run)
+                for file_key in run_files.get(run.time_stamp, []):
+                    file_runs[file_key].discard(run.time_stamp)
+                    if len(file_runs[file_key]) == 0:
+                        freed_bytes += file_sizes[file_key]
+            return expired_runs, freed_bytes
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def remove_run(self, run: ArtifactRun, protected_dir_paths: set) -> None:
+        """
+        Remove the directories of a run, except the directories of registered models.
+        """
+        try:
+            for dir_path in run.dir_paths:
+                if not any(protected_path.startswith(dir_path + os.sep) for protected_path in protected_dir_paths):
+                    shutil.rmtree(dir_path, ignore_errors=True)
+                    continue
+
+                for file_path, _ in list(self.walk_files(dir_path)):
+                    if not self.is_protected(file_path, protected_dir_paths):
+                        os.remove(file_path)
+
+                # Remove the directories left empty, deepest first
+                for walk_dir_path, _, _ in sorted(os.walk(dir_path), key=lambda item: -len(item[0])):
+                    with contextlib.suppress(OSError):
+                        os.rmdir(walk_dir_path)
+            logging.info('removed artifacts of run: [%s]', run.time_stamp)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @contextlib.contextmanager
+    def __connect_file_index(self):
+        file_index_file_path = self.artifact_retention_config.file_index_file_path
+        os.makedirs(os.path.dirname(file_index_file_path), exist_ok=True)
+        connection = sqlite3.connect(file_index_file_path, timeout=30.0)
+        try:
+            connection.executescript(FILE_INDEX_SCHEMA)
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def get_digest(file_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as file_obj:
+            for block in iter(lambda: file_obj.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def deduplicate(self, runs: list) -> tuple:
+        """
+        Replace identical files of the given runs by hardlinks to one copy.
+
+        Args:
+            runs (list): The finished runs whose files are deduplicated.
+
+        Returns:
+            tuple: The number of files replaced by a hardlink and the bytes it freed.
+        """
+        try:
+            hash_budget = int(self.artifact_retention_config.deduplicate_max_mb_per_pass * 1024 * 1024)
+            deduplicated_files = 0
+            deduplicated_bytes = 0
+            with self.__connect_file_index() as connection:
+                indexed_files = {
+                    row[0]: row[1:] for row in
+                    connection.execute('SELECT file_path, size, modified_time_ns, inode, digest FROM file')
+                }
+
+                # Hash the files that are new or changed since the last pass, within the budget
+                files = dict()
+                for run in runs:
+                    for dir_path in run.dir_paths:
+                        for file_path, file_stat in self.walk_files(dir_path):
+                            if file_stat.st_size < MIN_DEDUPLICATED_FILE_SIZE:
+                                continue
+                            indexed_file = indexed_files.get(file_path)
+                            if indexed_file is not None and indexed_file[:3] == (
+                                file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino
+                            ):
+                                files[file_path] = (file_stat, indexed_file[3])
+                            elif hash_budget > 0:
+                                hash_budget -= file_stat.st_size
+                                files[file_path] = (file_stat, self.get_digest(file_path))
+                                connection.execute(
+                                    'INSERT OR REPLACE INTO file VALUES (?, ?, ?, ?, ?)',
+                                    (file_path, file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino, files[file_path][1])
+                                )
+
+                # Forget the files that were removed
+                removed_file_paths = [(file_path,) for file_path in indexed_files if not os.path.exists(file_path)]
+                connection.executemany('DELETE FROM file WHERE file_path = ?', removed_file_paths)
+
+                # Link every copy to the first one, unless it already is a link to it
+                canonical_files = dict()
+                for file_path in sorted(files):
+                    file_stat, digest = files[file_path]
+                    canonical = canonical_files.setdefault((file_stat.st_size, digest, file_stat.st_dev), (file_path, file_stat))
+                    canonical_path, canonical_stat = canonical
+                    if canonical_stat.st_ino == file_stat.st_ino:
+                        continue
+
+                    temp_file_path = f'{file_path}.{os.getpid()}.link'
+                    try:
+                        os.link(canonical_path, temp_file_path)
+                        os.replace(temp_file_path, file_path)
+                    except OSError as e:
+                        with contextlib.suppress(OSError):
+                            os.remove(temp_file_path)
+                        logging.info('could not link: [%s] to: [%s]: %s', file_path, canonical_path, e)
+                        continue
+
+                    connection.execute(
+                        'UPDATE file SET modified_time_ns = ?, inode = ? WHERE file_path = ?',
+                        (canonical_stat.st_mtime_ns, canonical_stat.st_ino, file_path)
+                    )
+                    if file_stat.st_nlink == 1:
+                        deduplicated_bytes += file_stat.st_size
+                    deduplicated_files += 1
+            return deduplicated_files, deduplicated_bytes
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def initiate_artifact_retention(self, dry_run: bool=False) -> ArtifactRetentionArtifact:
+        """
+        Run one retention pass: remove the expired runs, then deduplicate the remaining ones.
+
+        Args:
+            dry_run (bool): Only report what would be removed, without removing or linking anything.
+
+        Returns:
+            ArtifactRetentionArtifact: The outcome of the pass.
+        """
+        try:
+            now = datetime.now()
+            runs = self.get_runs()
+            protected_time_stamps, protected_dir_paths = self.get_protected_paths(now)
+            disk_usage = self.get_disk_usage(runs, protected_dir_paths)
+            expired_runs, freed_bytes = self.select_expired_runs(runs, protected_time_stamps, disk_usage, now)
+
+            deduplicated_files, deduplicated_bytes = 0, 0
+            if not dry_run:
+                kept_runs = []
+                for run in expired_runs:
+                    if not self.release_run(run, now):
+                        logging.info('kept run: [%s], a pipeline reused its artifacts during the pass', run.time_stamp)
+                        kept_runs.append(run)
+                        continue
+                    self.remove_run(run, protected_dir_paths)
+
+                # The bytes freed are measured again when a run was kept after all
+                if len(kept_runs) > 0:
+                    expired_runs = [run for run in expired_runs if run not in kept_runs]
+                    freed_bytes = disk_usage[0] - self.get_disk_usage(self.get_runs(), protected_dir_paths)[0]
+
+                # Only finished runs are deduplicated, a running one may still rewrite its files
+                if self.artifact_retention_config.deduplicate:
+                    min_age_cutoff = self.get_min_age_cutoff(now)
+                    expired_time_stamps = set(run.time_stamp for run in expired_runs)
+                    finished_runs = [
+                        run for run in runs
+                        if run.time_stamp not in expired_time_stamps
+                        and run.time_stamp != self.current_time_stamp
+                        and run.started_at <= min_age_cutoff
+                    ]
+                    deduplicated_files, deduplicated_bytes = self.deduplicate(finished_runs)
+
+            artifact_retention_artifact = ArtifactRetentionArtifact(
+                removed_runs=[run.time_stamp for run in expired_runs],
+                freed_bytes=freed_bytes,
+                deduplicated_files=deduplicated_files,
+                deduplicated_bytes=deduplicated_bytes,
+                artifact_size=disk_usage[0] - freed_bytes - deduplicated_bytes
+            )
+            logging.info('artifact retention artifact: [%s]', artifact_retention_artifact)
+            return artifact_retention_artifact
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def start(self) -> None:
+        """
+        Run a retention pass every interval_seconds on a background thread.
+        """
+        try:
+            if self.thread is not None:
+                return
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.__run_periodically, name='artifact-retention', daemon=True)
+            self.thread.start()
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def stop(self, timeout: float=None) -> None:
+        """
+        Stop the background thread, after the pass it may be running.
+        """
+        try:
+            self.stop_event.set()
+            if self.thread is not None:
+                self.thread.join(timeout)
+                self.thread = None
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def __run_periodically(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                self.initiate_artifact_retention()
+            except Exception as e:
+                # A failed pass must not stop the next ones
+                logging.exception('artifact retention pass failed: %s', e)
+            self.stop_event.wait(self.artifact_retention_config.interval_seconds)
+
+def main(args=None) -> None:
+    """
+    Command line entry point: runs one retention pass, or keeps running them with --watch.
+    """
+    from housing.config import Configuration
+
+    parser = argparse.ArgumentParser(description='Remove old pipeline runs and deduplicate their artifacts.')
+    parser.add_argument('--config', default=CONFIG_FILE_PATH, help='the pipeline configuration file')
+    parser.add_argument('--dry-run', action='store_true', help='only report the runs that would be removed')
+    parser.add_argument('--watch', action='store_true', help='keep running a pass every interval_seconds')
+    arguments = parser.parse_args(args)
+
+    # No run is in progress in this process, so its timestamp protects nothing
+    artifact_retention = ArtifactRetention(
+        artifact_retention_config=Configuration(config_file_path=arguments.config).artifact_retention_config(),
+        current_time_stamp=None
+    )
+    if arguments.watch:
+        artifact_retention.start()
+        try:
+            artifact_retention.thread.join()
+        except KeyboardInterrupt:
+            artifact_retention.stop()
+        return
+
+    artifact_retention_artifact = artifact_retention.initiate_artifact_retention(dry_run=arguments.dry_run)
+    print(f'{"would remove" if arguments.dry_run else "removed"} runs: {artifact_retention_artifact.removed_runs}')
+    print(f'freed: {artifact_retention_artifact.freed_bytes} bytes, '
+          f'deduplicated: {artifact_retention_artifact.deduplicated_files} files, '
+          f'{artifact_retention_artifact.deduplicated_bytes} bytes')
+    print(f'artifact size: {artifact_retention_artifact.artifact_size} bytes')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+# housing/component/cv_fold_cache.py
+
+# Import required libraries and packages
+import os
+import sys
+import hashlib
+import numpy as np
+
+from housing.logger import logging
+from housing.exception import CustomException
+
+# File name templates of the fold index arrays
+TRAIN_INDEX_FILE_NAME = 'fold_{}_train.npy'
+TEST_INDEX_FILE_NAME = 'fold_{}_test.npy'
+
+class CVFoldCache:
+    """
+    Cross validation folds materialised once per training run.
+
+    The fold index arrays are saved as .npy artifacts and read back memory-mapped, so every
+    estimator and every grid point is cross validated on exactly the same folds without
+    splitting the data again. The cache can be passed as the cv argument of sklearn's
+    model selection functions.
+
+    Args:
+        fold_cache_dir (str): The directory holding the fold index arrays.
+
+    Raises:
+        CustomException: If an error occurs while initializing the cache.
+    """
+    def __init__(self, fold_cache_dir: str) -> None:
+        try:
+            self.fold_cache_dir = fold_cache_dir
+            self.n_splits = 0
+            self.fingerprint = None
+            self.splitter_repr = None
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def materialise(self, cv, X, y=None, groups=None) -> None:
+        """
+        Split the data with a cross validation splitter and save the fold index arrays.
+
+        Args:
+            cv (object): The cross validation splitter.
+            X (np.array): The training input features.
+            y (np.array, optional): The training target feature.
+            groups (np.array, optional): The group labels of the samples.
+        """
+        try:
+            os.makedirs(self.fold_cache_dir, exist_ok=True)
+            digest = hashlib.sha256()
+            n_splits = 0
+            for fold_number, (train_index, test_index) in enumerate(cv.split(X, y, groups)):
+                np.save(self.__get_file_path(TRAIN_INDEX_FILE_NAME, fold_number), train_index)
+                np.save(self.__get_file_path(TEST_INDEX_FILE_NAME, fold_number), test_index)
+                digest.update(np.ascontiguousarray(train_index).data)
+                digest.update(np.ascontiguousarray(test_index).data)
+                n_splits += 1
+
+            self.n_splits = n_splits
+            self.fingerprint = digest.hexdigest()
+            self.splitter_repr = repr(cv)
+            logging.info(f'materialised [{n_splits}] cv folds of [{self.splitter_repr}] into: [{self.fold_cache_dir}]')
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_n_splits(self, X=None, y=None, groups=None) -> int:
+        """
+        Returns the number of materialised folds.
+        """
+        return self.n_splits
+
+    def split(self, X=None, y=None, groups=None):
+        """
+        Yield the memory-mapped train and test index arrays of every fold.
+
+        Yields:
+            tuple: The train index array and the test index array of a fold.
+        """
+        try:
+            for fold_number in range(self.n_splits):
+                yield (
+                    np.load(self.__get_file_path(TRAIN_INDEX_FILE_NAME, fold_number), mmap_mode='r'),
+                    np.load(self.__get_file_path(TEST_INDEX_FILE_NAME, fold_number), mmap_mode='r')
+                )
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_spec(self) -> dict:
+        """
+        Describe the folds for search result store keys.
+
+        Returns:
+            dict: The splitter representation and the fingerprint of the fold index arrays.
+        """
+        return {'cv': self.splitter_repr, 'folds': self.fingerprint}
+
+    def __get_file_path(self, file_name_template: str, fold_number: int) -> str:
+        return os.path.join(self.fold_cache_dir, file_name_template.format(fold_number))
+
+    def __repr__(self) -> str:
+        return f'{CVFoldCache.__name__}(n_splits={self.n_splits}, cv={self.splitter_repr})'
@@ -3,12 +3,21 @@
 # Import required libraries and packages
 import os
 import sys
+import time
+import shutil
+import hashlib
 import tarfile
 import numpy as np
 import pandas as pd
 from six.moves import urllib
 from sklearn.model_selection import StratifiedShuffleSplit
 
+try:
+    import fcntl
+except ImportError:
+    # Without file locks, concurrent runs may download the same file, the last one wins
+    fcntl = None
+
 from housing.logger import logging
 from housing.exception import CustomException
 
@@ -85,6 +94,18 @@ class DataIngestion:
             # Create the file path by combining the download directory and the file name
             tgz_file_path = os.path.join(tgz_download_dir, housing_file_name)
 
+            # Reuse the download of another run if the download cache is enabled
+            if self.__data_ingestion_config.download_cache_dir is not None:
+                cached_file_path = self.__get_cached_download(download_url)
+                if os.path.exists(tgz_file_path):
+                    os.remove(tgz_file_path)
+                try:
+                    os.link(cached_file_path, tgz_file_path)
+                except OSError:
+                    shutil.copy2(cached_file_path, tgz_file_path)
+                logging.info(f'file :[{tgz_file_path}] has been taken from the download cache')
+                return tgz_file_path
+
             # Download the file from the URL and save it to the specified path
             logging.info(f'downloading file from :[{download_url}] into :[{tgz_file_path}]')
             urllib.request.urlretrieve(download_url, tgz_file_path)
@@ -96,6 +117,55 @@ class DataIngestion:
             # If there is an error during the download process, raise a custom exception
             raise CustomException(e, sys) from e
 
+    def __get_cached_download(self, download_url: str) -> str:
+        """
+        Returns the file of the download cache holding the given URL, downloading it first if
+        it is missing or older than the maximum age.
+
+        Concurrent runs share the cache: the first one downloads the file while holding the
+        lock of the URL, the others wait and reuse it. Files are moved into place atomically,
+        so a cached file is always complete.
+
+        Args:
+            download_url (str): The URL of the file.
+
+        Returns:
+            str: The file path of the cached file.
+
+        Raises:
+            CustomException: If there is an error during the download process.
+        """
+        try:
+            download_cache_dir = self.__data_ingestion_config.download_cache_dir
+            max_age_seconds = self.__data_ingestion_config.download_cache_max_age_hours * 3600
+
+            # Every URL gets its own directory, named after its digest
+            url_digest = hashlib.sha256(download_url.encode('utf-8')).hexdigest()[:32]
+            cached_file_dir = os.path.join(download_cache_dir, url_digest)
+            cached_file_path = os.path.join(cached_file_dir, os.path.basename(download_url))
+            os.makedirs(cached_file_dir, exist_ok=True)
+
+            with open(os.path.join(download_cache_dir, f'{url_digest}.lock'), 'w') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+                if os.path.exists(cached_file_path) and time.time() - os.path.getmtime(cached_file_path) <= max_age_seconds:
+                    logging.info(f'reusing cached download of :[{download_url}] from :[{cached_file_path}]')
+                    return cached_file_path
+
+                # Download next to the cached file, then replace it in one step
+                logging.info(f'downloading file from :[{download_url}] into the download cache :[{cached_file_path}]')
+                temp_file_path = f'{cached_file_path}.{os.getpid()}.tmp'
+                try:
+                    urllib.request.urlretrieve(download_url, temp_file_path)
+                    os.replace(temp_file_path, cached_file_path)
+                finally:
+                    if os.path.exists(temp_file_path):
+                        os.remove(temp_file_path)
+                return cached_file_path
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
     def __extract_tgz_file(self, tgz_file_path: str) -> None:
         """
         Extracts a tar.gz file into a specified directory.
@@ -115,7 +185,7 @@ class DataIngestion:
             
             # If the directory already exists, remove it
             if os.path.exists(raw_data_dir):
-                os.remove(raw_data_dir)
+                shutil.rmtree(raw_data_dir)
             
             # Create the directory if it doesn't exist
             os.makedirs(raw_data_dir, exist_ok=True)
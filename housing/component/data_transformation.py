@@ -4,17 +4,14 @@
 import numpy as np
 import os
 import sys
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
-from sklearn.pipeline import Pipeline
-from sklearn.compose import ColumnTransformer
-from sklearn.impute import SimpleImputer
 
+from housing.constant import *
 from housing.logger import logging
-from housing.util import read_yaml
+from housing.exception import CustomException
+from housing.util import load_dataset_schema
 from housing.entity.config_entity import DataTransformationConfig
 from housing.entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact, DataTransformationArtifact
 
-from housing.component.feature_generator import FeatureGenerator
 from housing.util import save_numpy_array_data, save_object, load_data
 
 class DataTransformation:
@@ -84,20 +81,20 @@ class DataTransformation:
             # Obtain the schema file path
             schema_file_path = self.data_validation_artifact.schema_file_path
             
-            # Load the training and test data as pandas dataframes
+            # Load the training and test data as pandas dataframes in the configured precision
             logging.info('loading training and test data as pandas dataframe')
-            train_df = load_data(file_path=train_file_path, schema_file_path=schema_file_path)
-            test_df = load_data(file_path=test_file_path, schema_file_path=schema_file_path)
+            precision = self.data_transformation_config.precision
+            train_df = load_data(file_path=train_file_path, schema_file_path=schema_file_path, dtype=precision)
+            test_df = load_data(file_path=test_file_path, schema_file_path=schema_file_path, dtype=precision)
             
-            # Read the schema file to obtain the target column name
-            schema = read_yaml(file_path=schema_file_path)
-            target_column_name = schema[TARGET_COLUMN_KEY]
+            # Obtain the target column name from the parsed schema
+            target_column_name = load_dataset_schema(schema_file_path).target_column
             
             # Split the input and target features from the training and testing dataframes
             logging.info('splitting input and target feature from training and testing dataframe')
-            input_feature_train_df = train_df.drop(columns=[target_column_name], axis=1)
+            input_feature_train_df = train_df.drop(columns=[target_column_name])
             target_feature_train_df = train_df[target_column_name]
-            input_feature_test_df = test_df.drop(columns=[target_column_name], axis=1)
+            input_feature_test_df = test_df.drop(columns=[target_column_name])
             target_feature_test_df = test_df[target_column_name]
             
             # Apply the preprocessing object on the training and testing dataframes
@@ -106,8 +103,8 @@ class DataTransformation:
             input_feature_test_arr = preprocessing_obj.transform(input_feature_test_df)
 
             # Combine the input and target features into arrays
-            train_arr = np.c_[input_feature_train_arr, np.array(target_feature_train_df)]
-            test_arr = np.c_[input_feature_test_arr, np.array(target_feature_test_df)]
+            train_arr = np.c_[input_feature_train_arr, np.array(target_feature_train_df, dtype=precision)]
+            test_arr = np.c_[input_feature_test_arr, np.array(target_feature_test_df, dtype=precision)]
             
             # Obtain the transformed train and test directories
             transformed_train_dir = self.data_transformation_config.transformed_train_dir
@@ -149,7 +146,7 @@ class DataTransformation:
             # Raise a custom exception if an error occurs during the data transformation process
             raise CustomException(e, sys) from e
 
-    def get_data_transformer_object(self) -> ColumnTransformer:
+    def get_data_transformer_object(self) -> 'ColumnTransformer':
         """
         A function to create a ColumnTransformer object for data transformation.
 
@@ -163,18 +160,25 @@ class DataTransformation:
         - CustomException: If an error occurs during the extraction process.
         """
         try:
+            # sklearn is only imported by the runs that build a preprocessing object
+            from sklearn.preprocessing import StandardScaler, OneHotEncoder
+            from sklearn.pipeline import Pipeline
+            from sklearn.compose import ColumnTransformer
+            from sklearn.impute import SimpleImputer
+            from housing.component.feature_generator import FeatureGenerator
+
             # Get the file path of the dataset schema
             schema_file_path = self.data_validation_artifact.schema_file_path
             
             # Read the dataset schema from the file
-            dataset_schema = read_yaml(file_path=schema_file_path)
+            dataset_schema = load_dataset_schema(schema_file_path)
             
             # Get the list of numerical columns from the dataset schema
-            numerical_columns = dataset_schema[NUMERICAL_COLUMN_KEY]
+            numerical_columns = list(dataset_schema.numerical_columns)
             logging.info(f'numerical columns: [{numerical_columns}]')
             
             # Get the list of categorical columns from the dataset schema
-            categorical_columns = dataset_schema[CATEGORICAL_COLUMN_KEY]
+            categorical_columns = list(dataset_schema.categorical_columns)
             logging.info(f'categorical columns: [{categorical_columns}]')
             
             # Create a pipeline for numerical column preprocessing
@@ -194,8 +198,8 @@ class DataTransformation:
             cat_pipeline = Pipeline(steps=[
                 # Impute missing values with most frequent value
                 ('impute', SimpleImputer(strategy='most_frequent')),
-                # One-hot encode categorical features
-                ('one_hot_encoder', OneHotEncoder()),
+                # One-hot encode categorical features in the configured precision
+                ('one_hot_encoder', OneHotEncoder(dtype=self.data_transformation_config.precision)),
                 # Scale the categorical features
                 ('scaler', StandardScaler(with_mean=False))
             ])
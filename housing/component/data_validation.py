@@ -2,15 +2,11 @@
 
 # Import required libraries and packages
 import os
+import sys
 import json
 
-from evidently.model_profile import Profile
-from evidently.model_profile.sections import DataDriftProfileSection
-from evidently.dashboard import Dashboard
-from evidently.dashboard.tabs import DataDriftTab
-
 from housing.logger import logging
-from housing.entity.artifact_entity import DataIngestionArtifact
+from housing.entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact
 from housing.entity.config_entity import DataValidationConfig
 from housing.exception import CustomException
 
@@ -36,7 +32,7 @@ class DataValidation:
             # Raise a custom exception if an error occurs during the extraction process
             raise CustomException(e, sys) from e
 
-    def initiate_data_validation(self) -> DataValidationArtifact:
+    def initiate_data_validation(self, save_drift_report: bool=True) -> DataValidationArtifact:
         """
         Initiate the data validation process.
 
@@ -44,6 +40,10 @@ class DataValidation:
         1. Checks if the train and test files exist.
         2. Validates the dataset schema.
         3. Checks for any data drift.
+
+        Args:
+            save_drift_report: Whether to save the drift report and its page, False when the
+                pipeline renders them concurrently with the next stages.
         
         Returns:
             DataValidationArtifact: An object containing the paths to the schema file, 
@@ -60,7 +60,8 @@ class DataValidation:
             self.validate_dataset_schema()
 
             # Step 3: Check for any data drift
-            self.is_data_drift_found()
+            if save_drift_report:
+                self.is_data_drift_found()
 
             # Create a DataValidationArtifact object with the necessary information
             data_validation_artifact = DataValidationArtifact(
@@ -95,6 +96,8 @@ class DataValidation:
             CustomException: If an error occurs during the extraction process.
         """
         try:
+            import pandas as pd
+
             # Read the train dataframe from the CSV file
             train_df = pd.read_csv(self.data_ingestion_artifact.train_file_path)
             
@@ -174,6 +177,10 @@ class DataValidation:
             CustomException: If an error occurs during the extraction process.
         """
         try:
+            # evidently pulls in its whole dashboard stack, so it is only imported by the runs that need it
+            from evidently.model_profile import Profile
+            from evidently.model_profile.sections import DataDriftProfileSection
+
             # Create a profile with only the data drift section
             profile = Profile(sections=[DataDriftProfileSection()])
             
@@ -218,6 +225,9 @@ class DataValidation:
             CustomException: If an error occurs during the process.
         """
         try:
+            from evidently.dashboard import Dashboard
+            from evidently.dashboard.tabs import DataDriftTab
+
             # Create a Dashboard object with a DataDriftTab
             dashboard = Dashboard(tabs=[DataDriftTab()])
 
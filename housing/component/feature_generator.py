@@ -2,6 +2,7 @@
 
 # Import required libraries and packages
 import sys
+import numpy as np
 from sklearn.base import BaseEstimator, TransformerMixin
 
 from housing.constant import *
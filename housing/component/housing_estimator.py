@@ -2,6 +2,13 @@
 
 # Import required libraries and packages
 import sys
+import time
+import threading
+import numpy as np
+
+from housing.exception import CustomException
+from housing.serving.metrics import metrics
+from housing.serving.flat_forest import FlatForest
 
 # Housing Estimator Model Class 
 class HousingEstimatorModel:
@@ -11,15 +18,17 @@ class HousingEstimatorModel:
     Args:   
         preprocessing_object (object): The preprocessing object.    
         trained_model_object (object): The trained model object.
+        dtype (str, optional): The floating point dtype the model was trained in, e.g. 'float32'.
         
     Raises:
         CustomException: If an error occurs during the housing estimation process.
     """
-    def __init__(self, preprocessing_object, trained_model_object):
+    def __init__(self, preprocessing_object, trained_model_object, dtype=None):
         try:
             # Store the preprocessing and trained model objects
             self.preprocessing_object = preprocessing_object
             self.trained_model_object = trained_model_object
+            self.dtype = dtype
         except Exception as e: 
             # Raise a custom exception if an error occurs   
             raise CustomException(e, sys) from e
@@ -38,16 +47,292 @@ class HousingEstimatorModel:
             CustomException: If an error occurs during the prediction process.
         """
         try:
+            # Stage timings are only taken while metrics are enabled
+            timed = metrics.enabled
+            if timed:
+                start_time = time.perf_counter()
+
             # Transform input features
             transformed_feature = self.preprocessing_object.transform(X)
-            
-            # Make predictions using the trained model
-            return self.trained_model_object.predict(transformed_feature)
+
+            # Keep the features in the precision the model was trained in
+            if self.dtype is not None:
+                transformed_feature = transformed_feature.astype(self.dtype, copy=False)
+
+            if timed:
+                transform_time = time.perf_counter()
+                metrics.observe_stage('transform', transform_time - start_time)
+
+            # Make predictions using the trained model, or the inference engine standing in for it
+            prediction = self.get_predictor().predict(transformed_feature)
+
+            if timed:
+                metrics.observe_stage('predict', time.perf_counter() - transform_time)
+                metrics.predict_rows.labels(path='dataframe').observe(len(prediction))
+            return prediction
         
         except Exception as e:
             # Raise a custom exception if an error occurs
             raise CustomException(e, sys) from e
             
+    def predict_one(self, record: dict) -> float:
+        """
+        Make a prediction for a single record given as a plain dict.
+
+        Args:
+            record (dict): The input features, keyed by column name.
+
+        Returns:
+            float: The predicted value.
+        """
+        try:
+            return self.predict_records([record])[0]
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def predict_records(self, records: list) -> np.array:
+        """
+        Make predictions for records given as plain dicts, without building a DataFrame.
+
+        The fitted steps of the preprocessing object are applied directly to NumPy buffers,
+        using a column index built on first use. Every step computes exactly what its
+        transform method computes, so results are bit-identical to predict. Missing fields are
+        imputed like missing values. Preprocessing objects the fast path does not know, and
+        records it cannot encode, go through predict.
+
+        Args:
+            records (list): The input features of every record, keyed by column name.
+
+        Returns:
+            np.array: Predicted values.
+        """
+        try:
+            record_plan = self.get_record_plan()
+            if record_plan is not None:
+                timed = metrics.enabled
+                if timed:
+                    start_time = time.perf_counter()
+
+                try:
+                    transformed_feature = self.transform_records(records, record_plan)
+                except (KeyError, TypeError, ValueError):
+                    transformed_feature = None
+
+                if transformed_feature is not None:
+                    if self.dtype is not None:
+                        transformed_feature = transformed_feature.astype(self.dtype, copy=False)
+
+                    if timed:
+                        transform_time = time.perf_counter()
+                        metrics.observe_stage('transform', transform_time - start_time)
+
+                    # Linear models predict with the same product their predict method computes
+                    model = self.trained_model_object
+                    if record_plan['linear_model']:
+                        prediction = transformed_feature @ model.coef_ + model.intercept_
+                    else:
+                        prediction = self.get_predictor().predict(transformed_feature)
+
+                    if timed:
+                        metrics.observe_stage('predict', time.perf_counter() - transform_time)
+                        metrics.predict_rows.labels(path='records').observe(len(prediction))
+                    return prediction
+
+            import pandas as pd
+            return self.predict(pd.DataFrame.from_records(records))
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_predictor(self):
+        """
+        Returns the object predicting transformed features: the flat forest engine if it is
+        enabled, the trained model otherwise.
+        """
+        return getattr(self, '_predictor', None) or self.trained_model_object
+
+    def enable_flat_forest(self, X) -> bool:
+        """
+        Predict with the vectorized flat forest engine instead of the trained forest, after
+        checking that it predicts exactly the same values on a sample.
+
+        Args:
+            X (pd.DataFrame): The sample of input records to check parity on.
+
+        Returns:
+            bool: True if the engine is enabled, False if the trained model is not a supported forest.
+
+        Raises:
+            CustomException: If the engine does not predict the same values as the trained model.
+        """
+        try:
+            model = self.trained_model_object
+            if type(model).__name__ not in (
+                'RandomForestRegressor', 'ExtraTreesRegressor', 'DecisionTreeRegressor', 'ExtraTreeRegressor'
+            ):
+                return False
+
+            flat_forest = FlatForest.from_estimator(model)
+            transformed_feature = self.preprocessing_object.transform(X)
+            if self.dtype is not None:
+                transformed_feature = transformed_feature.astype(self.dtype, copy=False)
+            flat_forest.check_parity(model, transformed_feature)
+
+            self._predictor = flat_forest
+            return True
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_record_plan(self) -> dict:
+        """
+        Build, once, the column index and fitted constants used by predict_records.
+
+        Returns:
+            dict: The plan, or None if the preprocessing object is not supported by the fast path.
+        """
+        try:
+            record_plan = getattr(self, '_record_plan', False)
+            if record_plan is False:
+                record_plan = self.__build_record_plan()
+                self._record_plan = record_plan
+            return record_plan
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def __build_record_plan(self) -> dict:
+        # The steps are only needed to recognize a fitted preprocessing object, which already imported them
+        from sklearn.pipeline import Pipeline
+        from sklearn.impute import SimpleImputer
+        from sklearn.compose import ColumnTransformer
+        from sklearn.linear_model import LinearRegression, Ridge
+        from sklearn.preprocessing import OneHotEncoder, StandardScaler
+        from housing.component.feature_generator import FeatureGenerator
+
+        preprocessing = self.preprocessing_object
+        if not isinstance(preprocessing, ColumnTransformer):
+            return None
+        if getattr(preprocessing, 'sparse_output_', False):
+            return None
+
+        blocks = []
+        width = 0
+        for name, pipeline, columns in preprocessing.transformers_:
+            if name == 'remainder' and pipeline == 'drop':
+                continue
+            if not isinstance(pipeline, Pipeline) or len(columns) == 0:
+                return None
+            steps = [step for _, step in pipeline.steps]
+
+            if isinstance(steps[-2] if len(steps) > 1 else None, OneHotEncoder):
+                imputer, encoder, scaler = steps if len(steps) == 3 else (None, None, None)
+                if not (isinstance(imputer, SimpleImputer) and imputer.strategy == 'most_frequent'
+                        and isinstance(encoder, OneHotEncoder) and encoder.drop_idx_ is None
+                        and isinstance(scaler, StandardScaler) and not scaler.with_mean):
+                    return None
+
+                # The scaler multiplies the sparse one-hot values by the inverse scale, in the dtype of the encoder
+                inverse_scale = (1 / scaler.scale_ if scaler.scale_ is not None else np.ones(scaler.n_features_in_))
+                encoded_values = np.ones(len(inverse_scale), dtype=encoder.dtype)
+                encoded_values *= inverse_scale
+
+                category_positions = []
+                offset = width
+                for categories in encoder.categories_:
+                    category_positions.append({category: offset + index for index, category in enumerate(categories)})
+                    offset += len(categories)
+                blocks.append({
+                    'kind': 'categorical',
+                    'columns': list(columns),
+                    'fill_values': list(imputer.statistics_),
+                    'category_positions': category_positions,
+                    'encoded_values': encoded_values.astype(np.float64),
+                    'start': width
+                })
+                width = offset
+                continue
+
+            imputer, *generators, scaler = steps
+            if not (isinstance(imputer, SimpleImputer) and imputer.strategy in ('mean', 'median')
+                    and not np.isnan(imputer.statistics_).any()
+                    and isinstance(scaler, StandardScaler) and scaler.with_mean and scaler.with_std
+                    and len(generators) <= 1 and all(isinstance(step, FeatureGenerator) for step in generators)):
+                return None
+            blocks.append({
+                'kind': 'numerical',
+                'columns': list(columns),
+                'statistics': np.asarray(imputer.statistics_, dtype=np.float64),
+                'generator': generators[0] if len(generators) == 1 else None,
+                'mean': scaler.mean_,
+                'scale': scaler.scale_,
+                'start': width
+            })
+            width += scaler.n_features_in_
+
+        model = self.trained_model_object
+        return {
+            'blocks': blocks,
+            'width': width,
+            'buffers': threading.local(),
+            'linear_model': isinstance(model, (LinearRegression, Ridge)) and model.coef_.ndim == 1
+        }
+
+    @staticmethod
+    def transform_records(records: list, record_plan: dict) -> np.array:
+        """
+        Apply the preprocessing plan to records, writing straight into the transformed feature matrix.
+        """
+        # A single record reuses buffers allocated once per thread
+        buffers = record_plan['buffers']
+        if len(records) == 1:
+            transformed_feature = getattr(buffers, 'transformed_feature', None)
+            if transformed_feature is None:
+                transformed_feature = buffers.transformed_feature = np.zeros((1, record_plan['width']))
+            else:
+                transformed_feature.fill(0)
+        else:
+            transformed_feature = np.zeros((len(records), record_plan['width']))
+
+        for block in record_plan['blocks']:
+            columns = block['columns']
+            if block['kind'] == 'numerical':
+                X = np.array([[record.get(column) for column in columns] for record in records], dtype=np.float64)
+
+                # Median imputation
+                missing = np.isnan(X)
+                if missing.any():
+                    X[missing] = block['statistics'][np.nonzero(missing)[1]]
+
+                # Generated features
+                generator = block['generator']
+                if generator is not None:
+                    X = generator.transform(X)
+
+                # Standard scaling
+                X -= block['mean'].astype(X.dtype, copy=False)
+                X /= block['scale'].astype(X.dtype, copy=False)
+                transformed_feature[:, block['start']:block['start'] + X.shape[1]] = X
+                continue
+
+            encoded_values = block['encoded_values']
+            for column_index, column in enumerate(columns):
+                category_positions = block['category_positions'][column_index]
+                fill_value = block['fill_values'][column_index]
+                for row_index, record in enumerate(records):
+                    value = record.get(column)
+                    if value is None or value != value:
+                        value = fill_value
+                    position = category_positions[value]
+                    transformed_feature[row_index, position] = encoded_values[position - block['start']]
+
+        return transformed_feature
+
+    def __getstate__(self):
+        # The record plan holds thread-local buffers that cannot be pickled, and the inference
+        # engine duplicates the trained model; both are rebuilt after loading
+        state = self.__dict__.copy()
+        state.pop('_record_plan', None)
+        state.pop('_predictor', None)
+        return state
+
     def __repr__(self):
         # Get the name of the class of the trained model object
         class_name = type(self.trained_model_object).__name__
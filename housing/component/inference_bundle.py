@@ -0,0 +1,221 @@
+# housing/component/inference_bundle.py
+
+# Import required libraries and packages
+import os
+import sys
+import tempfile
+import numpy as np
+from sklearn.pipeline import Pipeline
+from sklearn.impute import SimpleImputer
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.linear_model import LinearRegression, Ridge, Lasso, ElasticNet, SGDRegressor
+
+from housing.logger import logging
+from housing.exception import CustomException
+from housing.util import get_new_file_mode
+from housing.component.feature_generator import FeatureGenerator
+from housing.component.housing_estimator import HousingEstimatorModel
+from housing.serving.bundle_runtime import InferenceBundle
+from housing.serving.flat_forest import FlatForest
+
+class InferenceBundleExporter:
+    """
+    Flattens a HousingEstimatorModel into a compact inference bundle.
+
+    The fitted constants of the preprocessing pipeline and the parameters of the model are
+    written as plain NumPy arrays into one .npz file, which the NumPy-only InferenceBundle
+    runtime executes. Linear models are stored as coefficients, forests and single trees as
+    concatenated node arrays with the offset of every tree.
+
+    Args:
+        housing_model (HousingEstimatorModel): The model to export.
+
+    Raises:
+        CustomException: If the model uses a step or estimator the bundle cannot represent.
+    """
+    def __init__(self, housing_model: HousingEstimatorModel) -> None:
+        try:
+            self.housing_model = housing_model
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_preprocessing_arrays(self) -> dict:
+        """
+        Extract the fitted constants of the numerical and categorical pipelines.
+        """
+        try:
+            preprocessing = self.housing_model.preprocessing_object
+            if not isinstance(preprocessing, ColumnTransformer):
+                raise Exception(f'unsupported preprocessing object: [{type(preprocessing).__name__}]')
+
+            arrays = dict()
+            for name, pipeline, columns in preprocessing.transformers_:
+                if name == 'remainder':
+                    if pipeline != 'drop':
+                        raise Exception(f'unsupported remainder: [{pipeline}]')
+                    continue
+                if not isinstance(pipeline, Pipeline):
+                    raise Exception(f'unsupported transformer: [{name}]')
+
+                steps = [step for _, step in pipeline.steps]
+                if any(isinstance(step, OneHotEncoder) for step in steps):
+                    arrays.update(self.get_categorical_arrays(steps, columns))
+                else:
+                    arrays.update(self.get_numerical_arrays(steps, columns))
+
+            if 'num_columns' not in arrays or 'cat_columns' not in arrays:
+                raise Exception('the bundle needs one numerical and one categorical pipeline')
+            return arrays
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def get_numerical_arrays(steps: list, columns: list) -> dict:
+        """
+        Extract imputer statistics, generated feature indexes and scaler constants.
+        """
+        try:
+            imputer, *generators, scaler = steps
+            if not (isinstance(imputer, SimpleImputer) and imputer.strategy in ('mean', 'median')):
+                raise Exception(f'unsupported numerical imputer: [{imputer}]')
+            if not (isinstance(scaler, StandardScaler) and scaler.with_mean and scaler.with_std):
+                raise Exception(f'unsupported numerical scaler: [{scaler}]')
+            if len(generators) > 1 or not all(isinstance(step, FeatureGenerator) for step in generators):
+                raise Exception(f'unsupported numerical steps: {generators}')
+
+            generator = generators[0] if len(generators) == 1 else None
+            return {
+                'num_columns': np.array(columns, dtype=str),
+                'num_impute': np.asarray(imputer.statistics_, dtype=np.float64),
+                'num_generate_features': np.array(generator is not None),
+                'num_add_bedrooms_per_room': np.array(generator is not None and bool(generator.add_bedrooms_per_room)),
+                'num_generator_ix': np.array([
+                    generator.total_rooms_ix,
+                    generator.population_ix,
+                    generator.households_ix,
+                    generator.total_bedrooms_ix
+                ] if generator is not None else [0, 0, 0, 0], dtype=np.int64),
+                'num_mean': np.asarray(scaler.mean_, dtype=np.float64),
+                'num_scale': np.asarray(scaler.scale_, dtype=np.float64)
+            }
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def get_categorical_arrays(steps: list, columns: list) -> dict:
+        """
+        Extract the most frequent values, the one-hot categories and the scaler constants.
+        """
+        try:
+            imputer, encoder, scaler = steps
+            if not (isinstance(imputer, SimpleImputer) and imputer.strategy == 'most_frequent'):
+                raise Exception(f'unsupported categorical imputer: [{imputer}]')
+            if not isinstance(encoder, OneHotEncoder) or encoder.drop_idx_ is not None:
+                raise Exception(f'unsupported categorical encoder: [{encoder}]')
+            if not (isinstance(scaler, StandardScaler) and not scaler.with_mean):
+                raise Exception(f'unsupported categorical scaler: [{scaler}]')
+
+            arrays = {
+                'cat_columns': np.array(columns, dtype=str),
+                'cat_impute': np.array([str(value) for value in imputer.statistics_], dtype=str),
+                'cat_scale': np.asarray(scaler.scale_)
+            }
+            for index, categories in enumerate(encoder.categories_):
+                # The runtime looks categories up with a binary search
+                arrays[f'cat_categories_{index}'] = np.array([str(value) for value in categories], dtype=str)
+                if not np.all(arrays[f'cat_categories_{index}'][:-1] < arrays[f'cat_categories_{index}'][1:]):
+                    raise Exception(f'categories of column: [{columns[index]}] are not sorted')
+            return arrays
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_model_arrays(self) -> dict:
+        """
+        Extract the model parameters as coefficients or flattened tree node arrays.
+        """
+        try:
+            model = self.housing_model.trained_model_object
+            if isinstance(model, (LinearRegression, Ridge, Lasso, ElasticNet, SGDRegressor)):
+                return {
+                    'model_type': np.array('linear'),
+                    'coef': np.ravel(model.coef_),
+                    'intercept': np.asarray(model.intercept_).reshape(-1)[0]
+                }
+
+            # Forests and trees are stored as their concatenated node arrays
+            flat_arrays = FlatForest.flatten_trees(model)
+            arrays = {f'tree_{name}': array for name, array in flat_arrays.items()}
+            arrays['model_type'] = np.array('forest')
+            return arrays
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def export(self, file_path: str) -> str:
+        """
+        Write the bundle to an .npz file.
+
+        Args:
+            file_path (str): The file path of the bundle.
+
+        Returns:
+            str: The file path of the bundle.
+        """
+        try:
+            arrays = self.get_preprocessing_arrays()
+            arrays.update(self.get_model_arrays())
+            arrays['dtype'] = np.array(np.dtype(self.housing_model.dtype or np.float64).name)
+
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            file_descriptor, temp_file_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix='.npz')
+            try:
+                with os.fdopen(file_descriptor, 'wb') as bundle_file:
+                    np.savez(bundle_file, **arrays)
+                os.chmod(temp_file_path, get_new_file_mode(file_path))
+                os.replace(temp_file_path, file_path)
+            except Exception:
+                os.remove(temp_file_path)
+                raise
+
+            logging.info(f'inference bundle: [{file_path}] of size: [{os.path.getsize(file_path)}] bytes')
+            return file_path
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def check_parity(self, file_path: str, dataframe, tolerance: float) -> float:
+        """
+        Compare the predictions of the exported bundle with the ones of the original estimator.
+
+        Args:
+            file_path (str): The file path of the bundle.
+            dataframe (pd.DataFrame): The rows to predict.
+            tolerance (float): The maximum difference allowed, relative to the largest prediction.
+
+        Returns:
+            float: The maximum absolute difference between the predictions.
+
+        Raises:
+            CustomException: If the predictions differ by more than the tolerance.
+        """
+        try:
+            bundle = InferenceBundle.load(file_path)
+            expected = np.asarray(self.housing_model.predict(dataframe), dtype=np.float64).reshape(-1)
+            predicted = np.asarray(
+                bundle.predict_columns({column: dataframe[column].to_numpy() for column in bundle.columns}),
+                dtype=np.float64
+            ).reshape(-1)
+
+            max_difference = float(np.max(np.abs(predicted - expected))) if len(expected) > 0 else 0.0
+            allowed_difference = tolerance * max(1.0, float(np.max(np.abs(expected))) if len(expected) > 0 else 1.0)
+            logging.info(
+                f'inference bundle parity on [{len(expected)}] rows: max difference: [{max_difference}], '
+                f'allowed: [{allowed_difference}]'
+            )
+            if not max_difference <= allowed_difference:
+                raise Exception(
+                    f'inference bundle predictions differ from the estimator by [{max_difference}], '
+                    f'allowed: [{allowed_difference}]'
+                )
+            return max_difference
+        except Exception as e:
+            raise CustomException(e, sys) from e
@@ -0,0 +1,360 @@
+# housing/component/model_compaction.py
+
+# Import required libraries and packages
+import os
+import sys
+import numpy as np
+from sklearn.metrics import r2_score, mean_squared_error
+
+from housing.constant import *
+from housing.logger import logging
+from housing.exception import CustomException
+from housing.entity.config_entity import ModelCompactionConfig
+from housing.entity.artifact_entity import DataTransformationArtifact, ModelTrainerArtifact, ModelCompactionArtifact
+from housing.component.housing_estimator import HousingEstimatorModel
+from housing.serving.flat_forest import FlatForest, TREE_LEAF
+from housing.serving.compact_forest import CompactForestRegressor
+from housing.util import write_yaml, load_numpy_array_data, load_object, save_object
+
+# Pruning thresholds tried, as fractions of the range of the node values
+PRUNE_FRACTIONS = (0.0, 1e-4, 3e-4, 1e-3, 3e-3, 1e-2, 3e-2)
+
+class ModelCompaction:
+
+    def __init__(
+        self,
+        model_compaction_config: ModelCompactionConfig,
+        data_transformation_artifact: DataTransformationArtifact,
+        model_trainer_artifact: ModelTrainerArtifact
+    ) -> None:
+        """
+        Initializes a new instance of the ModelCompaction class.
+
+        Parameters:
+        - model_compaction_config (ModelCompactionConfig): The configuration object for model compaction.
+        - data_transformation_artifact (DataTransformationArtifact): The artifact object for data transformation,
+          whose testing data bounds the accuracy lost by compaction.
+        - model_trainer_artifact (ModelTrainerArtifact): The artifact object for model training.
+
+        Raises:
+        - CustomException: If an error occurs during initialization.
+        """
+        try:
+            logging.info(f"{'>>' * 30} model compaction log started {'<<' * 30} ")
+            self.model_compaction_config = model_compaction_config
+            self.data_transformation_artifact = data_transformation_artifact
+            self.model_trainer_artifact = model_trainer_artifact
+        except Exception as e:
+            # Raise a custom exception if an error occurs during initialization
+            raise CustomException(e, sys) from e
+
+    def initiate_model_compaction(self) -> ModelCompactionArtifact:
+        """
+        Replaces a trained forest by a compact, prediction-only copy.
+
+        Thresholds are rounded down to float32, which leaves every split unchanged, and node
+        values are stored as float32 or, if configured, quantized. Subtrees whose leaves all
+        predict the same value are merged into one leaf, and subtrees whose leaves differ by
+        less than a pruning threshold are collapsed into their parent. The largest pruning
+        threshold, and the quantization, are only kept while the R2 on the testing data stays
+        within max_accuracy_loss of the trained forest. Other models are passed through.
+
+        Returns:
+            ModelCompactionArtifact: An object containing the file path of the compacted model and
+            the size and accuracy of the model before and after compaction.
+
+        Raises:
+            CustomException: If an error occurs during the model compaction process.
+        """
+        try:
+            trained_model_file_path = self.model_trainer_artifact.trained_model_file_path
+            housing_model = load_object(file_path=trained_model_file_path)
+            trained_model = housing_model.trained_model_object
+
+            try:
+                node_arrays = FlatForest.flatten_trees(trained_model)
+            except Exception:
+                return self.get_uncompacted_artifact(message=f'{type(trained_model).__name__} is not a forest')
+
+            # Load the testing data the trained model was scored on
+            test_array = load_numpy_array_data(file_path=self.data_transformation_artifact.transformed_test_file_path)
+            x_test, y_test = test_array[:, :-1], test_array[:, -1]
+            if housing_model.dtype is not None:
+                x_test = x_test.astype(housing_model.dtype, copy=False)
+            original_test_rmse, original_test_accuracy = self.evaluate_model(trained_model, x_test, y_test)
+
+            compact_forest, prune_threshold, compacted_test_rmse, compacted_test_accuracy = self.search_compact_forest(
+                node_arrays,
+                n_features=x_test.shape[1],
+                x_test=x_test,
+                y_test=y_test,
+                min_test_accuracy=original_test_accuracy - self.model_compaction_config.max_accuracy_loss
+            )
+            if compact_forest is None:
+                return self.get_uncompacted_artifact(
+                    message=f'no compaction stays within an accuracy loss of {self.model_compaction_config.max_accuracy_loss}'
+                )
+
+            # Save the compacted forest with the preprocessing object of the trained model
+            compacted_model_file_path = self.model_compaction_config.compacted_model_file_path
+            save_object(
+                file_path=compacted_model_file_path,
+                obj=HousingEstimatorModel(
+                    preprocessing_object=housing_model.preprocessing_object,
+                    trained_model_object=compact_forest,
+                    dtype=housing_model.dtype
+                )
+            )
+
+            # Incremental training warm starts from the trained forest, which the compacted one points to
+            write_yaml(
+                file_path=os.path.join(os.path.dirname(compacted_model_file_path), COMPACTED_MODEL_SOURCE_FILE_NAME),
+                data={SOURCE_MODEL_PATH_KEY: trained_model_file_path}
+            )
+
+            original_size = os.path.getsize(trained_model_file_path)
+            compacted_size = os.path.getsize(compacted_model_file_path)
+            compaction_report = {
+                'original_model': {
+                    'path': trained_model_file_path,
+                    'size': original_size,
+                    'node_count': int(len(node_arrays['feature'])),
+                    'test_rmse': float(original_test_rmse),
+                    'test_accuracy': float(original_test_accuracy)
+                },
+                'compacted_model': {
+                    'path': compacted_model_file_path,
+                    'size': compacted_size,
+                    'node_count': compact_forest.node_count,
+                    'test_rmse': float(compacted_test_rmse),
+                    'test_accuracy': float(compacted_test_accuracy)
+                },
+                'size_ratio': compacted_size / original_size,
+                'accuracy_loss': float(original_test_accuracy - compacted_test_accuracy),
+                'leaf_quantization_bits': None if compact_forest.value_scale is None else compact_forest.value.dtype.itemsize * 8,
+                'prune_threshold': float(prune_threshold)
+            }
+            compaction_report_file_path = self.model_compaction_config.compaction_report_file_path
+            write_yaml(file_path=compaction_report_file_path, data=compaction_report)
+            logging.info('compaction report: [%s]', compaction_report)
+
+            model_compaction_artifact = ModelCompactionArtifact(
+                is_compacted=True,
+                message='model compacted successfully',
+                compacted_model_file_path=compacted_model_file_path,
+                compaction_report_file_path=compaction_report_file_path,
+                original_size=original_size,
+                compacted_size=compacted_size,
+                original_test_rmse=float(original_test_rmse),
+                compacted_test_rmse=float(compacted_test_rmse),
+                original_test_accuracy=float(original_test_accuracy),
+                compacted_test_accuracy=float(compacted_test_accuracy)
+            )
+            logging.info('model compaction artifact: [%s]', model_compaction_artifact)
+            return model_compaction_artifact
+        except Exception as e:
+            # Raise a custom exception if an error occurs during the model compaction process
+            raise CustomException(e, sys) from e
+
+    def get_uncompacted_artifact(self, message: str) -> ModelCompactionArtifact:
+        """
+        Builds the artifact passing the trained model through unchanged.
+
+        Parameters:
+        - message (str): The reason the model is not compacted.
+        """
+        try:
+            logging.info(f'model is not compacted: [{message}]')
+            trained_model_file_path = self.model_trainer_artifact.trained_model_file_path
+            model_size = os.path.getsize(trained_model_file_path)
+            model_compaction_artifact = ModelCompactionArtifact(
+                is_compacted=False,
+                message=message,
+                compacted_model_file_path=trained_model_file_path,
+                compaction_report_file_path=None,
+                original_size=model_size,
+                compacted_size=model_size,
+                original_test_rmse=self.model_trainer_artifact.test_rmse,
+                compacted_test_rmse=self.model_trainer_artifact.test_rmse,
+                original_test_accuracy=self.model_trainer_artifact.test_accuracy,
+                compacted_test_accuracy=self.model_trainer_artifact.test_accuracy
+            )
+            logging.info('model compaction artifact: [%s]', model_compaction_artifact)
+            return model_compaction_artifact
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def search_compact_forest(self, node_arrays: dict, n_features: int, x_test, y_test, min_test_accuracy: float) -> tuple:
+        """
+        Finds the most compact forest whose testing accuracy stays above a minimum.
+
+        Quantized leaves are tried first, if configured, then float32 leaves. For each, the
+        pruning threshold grows until the accuracy drops below the minimum.
+
+        Parameters:
+        - node_arrays (dict): The concatenated node arrays of the trained forest.
+        - n_features (int): The number of features of the forest.
+        - x_test (np.array): The transformed testing input features.
+        - y_test (np.array): The testing target feature.
+        - min_test_accuracy (float): The lowest testing R2 accepted.
+
+        Returns:
+        - tuple: The compact forest, its pruning threshold, testing RMSE and testing R2, or a
+          tuple of None if no candidate is accurate enough.
+        """
+        try:
+            value = node_arrays['value']
+            value_range = float(value.max() - value.min())
+            leaf_quantization_bits = self.model_compaction_config.leaf_quantization_bits
+            prune_fractions = PRUNE_FRACTIONS if self.model_compaction_config.prune else PRUNE_FRACTIONS[:1]
+
+            for quantization_bits in ([leaf_quantization_bits] if leaf_quantization_bits else []) + [None]:
+                best = None
+                for prune_fraction in prune_fractions:
+                    prune_threshold = prune_fraction * value_range
+                    compact_forest = self.build_compact_forest(node_arrays, n_features, quantization_bits, prune_threshold)
+                    test_rmse, test_accuracy = self.evaluate_model(compact_forest, x_test, y_test)
+                    logging.info(
+                        f'compaction candidate: quantization bits: [{quantization_bits}] prune threshold: [{prune_threshold}] '
+                        f'nodes: [{compact_forest.node_count}] test accuracy: [{test_accuracy}]'
+                    )
+                    if test_accuracy < min_test_accuracy:
+                        break
+                    best = (compact_forest, prune_threshold, test_rmse, test_accuracy)
+                if best is not None:
+                    return best
+            return None, None, None, None
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def get_float32_thresholds(threshold) -> np.array:
+        """
+        Rounds thresholds down to the nearest float32.
+
+        Trees compare float32 features against float64 thresholds, so the largest float32 not
+        above a threshold sends every float32 feature the same way as the threshold itself.
+
+        Parameters:
+        - threshold (np.array): The float64 thresholds.
+
+        Returns:
+        - np.array: The float32 thresholds.
+        """
+        try:
+            threshold = np.asarray(threshold, dtype=np.float64)
+            threshold32 = threshold.astype(np.float32)
+            rounded_up = threshold32.astype(np.float64) > threshold
+            threshold32[rounded_up] = np.nextafter(threshold32[rounded_up], np.float32(-np.inf))
+            return threshold32
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def get_node_depths(children_left, children_right, roots) -> np.array:
+        """
+        Computes the depth of every node, walking all trees one level at a time.
+        """
+        try:
+            depth = np.zeros(len(children_left), dtype=np.int64)
+            frontier, level = np.asarray(roots), 0
+            while len(frontier) > 0:
+                depth[frontier] = level
+                frontier = frontier[children_left[frontier] != TREE_LEAF]
+                frontier = np.concatenate([children_left[frontier], children_right[frontier]])
+                level += 1
+            return depth
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def build_compact_forest(self, node_arrays: dict, n_features: int, quantization_bits: int, prune_threshold: float) -> CompactForestRegressor:
+        """
+        Builds a compact forest, merging and pruning subtrees and renumbering the remaining nodes.
+
+        Parameters:
+        - node_arrays (dict): The concatenated node arrays of the trained forest.
+        - n_features (int): The number of features of the forest.
+        - quantization_bits (int): The number of bits of quantized node values, None for float32 values.
+        - prune_threshold (float): Subtrees whose leaf values differ by at most this much become one leaf.
+
+        Returns:
+        - CompactForestRegressor: The compact forest.
+        """
+        try:
+            children_left, children_right = node_arrays['children_left'], node_arrays['children_right']
+            roots = node_arrays['offsets'][:-1]
+            is_leaf = children_left == TREE_LEAF
+
+            # Node values as they will be stored
+            value = np.asarray(node_arrays['value'], dtype=np.float64)
+            value_offset, value_scale = 0.0, None
+            if quantization_bits is not None:
+                value_offset = float(value.min())
+                value_scale = max(float(value.max()) - value_offset, np.finfo(np.float64).tiny) / (2 ** quantization_bits - 1)
+                codes = np.rint((value - value_offset) / value_scale).astype(np.dtype(f'uint{quantization_bits}'))
+                stored_value = value_offset + value_scale * codes.astype(np.float64)
+            else:
+                stored_value = value.astype(np.float32).astype(np.float64)
+
+            # Smallest and largest leaf value below every node, from the deepest level up
+            depth = self.get_node_depths(children_left, children_right, roots)
+            leaf_min, leaf_max = stored_value.copy(), stored_value.copy()
+            internal_nodes = np.flatnonzero(~is_leaf)
+            for level in range(int(depth.max()), -1, -1):
+                nodes = internal_nodes[depth[internal_nodes] == level]
+                leaf_min[nodes] = np.minimum(leaf_min[children_left[nodes]], leaf_min[children_right[nodes]])
+                leaf_max[nodes] = np.maximum(leaf_max[children_left[nodes]], leaf_max[children_right[nodes]])
+
+            # Subtrees with a single leaf value keep it, pruned ones predict their training mean
+            collapsed = ~is_leaf & (leaf_max - leaf_min <= prune_threshold)
+            merged = collapsed & (leaf_max == leaf_min)
+            stored_value[merged] = leaf_min[merged]
+            if quantization_bits is not None:
+                codes[merged] = np.rint((leaf_min[merged] - value_offset) / value_scale).astype(codes.dtype)
+
+            # Keep the nodes still reachable from the roots
+            is_new_leaf = is_leaf | collapsed
+            kept = np.zeros(len(children_left), dtype=bool)
+            frontier = np.asarray(roots)
+            while len(frontier) > 0:
+                kept[frontier] = True
+                frontier = frontier[~is_new_leaf[frontier]]
+                frontier = np.concatenate([children_left[frontier], children_right[frontier]])
+
+            # Renumber the kept nodes, which keeps every tree contiguous
+            new_index = np.cumsum(kept) - 1
+            kept_nodes = np.flatnonzero(kept)
+            kept_is_leaf = is_new_leaf[kept_nodes]
+            new_children_left = np.where(kept_is_leaf, TREE_LEAF, new_index[children_left[kept_nodes]])
+            new_children_right = np.where(kept_is_leaf, TREE_LEAF, new_index[children_right[kept_nodes]])
+
+            return CompactForestRegressor(
+                feature=np.where(kept_is_leaf, TREE_LEAF, node_arrays['feature'][kept_nodes]),
+                threshold=self.get_float32_thresholds(np.where(kept_is_leaf, -2.0, node_arrays['threshold'][kept_nodes])),
+                children_left=new_children_left,
+                children_right=new_children_right,
+                offsets=np.append(new_index[roots], len(kept_nodes)),
+                value=codes[kept_nodes] if quantization_bits is not None else stored_value[kept_nodes],
+                value_offset=value_offset,
+                value_scale=value_scale,
+                n_features_in_=n_features
+            )
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def evaluate_model(model, X, y) -> tuple:
+        """
+        Scores a model on testing data.
+
+        Returns:
+        - tuple: The RMSE and the R2 of the predictions.
+        """
+        try:
+            y_pred = model.predict(X)
+            return float(np.sqrt(mean_squared_error(y, y_pred))), float(r2_score(y, y_pred))
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def __del__(self):
+        logging.info(f"{'>>' * 30} model compaction log completed {'<<' * 30} \n\n")
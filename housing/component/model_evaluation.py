@@ -3,79 +3,345 @@
 # Import required libraries and packages
 import os
 import sys
+import hashlib
+import numpy as np
+from sklearn.metrics import r2_score, mean_squared_error
+
+from housing.constant import *
 from housing.logger import logging
 from housing.exception import CustomException
-from housing.entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact, ModelTrainerArtifact
+from housing.entity.artifact_entity import (
+    DataIngestionArtifact, DataValidationArtifact, ModelTrainerArtifact, ModelCompactionArtifact, ModelEvaluationArtifact
+)
 from housing.entity.config_entity import ModelEvaluationConfig
+from housing.util import load_dataset_schema, write_yaml, load_data, load_cached_object, get_file_fingerprint
+from housing.component.model_registry import ModelRegistry
+
+# Upper bound on the number of elements of one bootstrap index matrix
+BOOTSTRAP_MAX_INDEX_MATRIX_SIZE = 2 ** 24
 
 class ModelEvaluation:
-    
+
     def __init__(
         self,
         model_evaluation_config: ModelEvaluationConfig,
         data_ingestion_artifact: DataIngestionArtifact,
         data_validation_artifact: DataValidationArtifact,
-        model_trainer_artifact: ModelTrainerArtifact
+        model_trainer_artifact: ModelTrainerArtifact,
+        model_compaction_artifact: ModelCompactionArtifact=None
     ) -> None:
         try:
             logging.info(f"{'>>' * 30} model evaluation log started {'<<' * 30} ")
             self.model_evaluation_config = model_evaluation_config
             self.model_trainer_artifact = model_trainer_artifact
+            self.model_compaction_artifact = model_compaction_artifact
             self.data_ingestion_artifact = data_ingestion_artifact
             self.data_validation_artifact = data_validation_artifact
+
+            # Open the model registry, seeding it from an existing model evaluation file
+            self.model_registry = ModelRegistry(registry_file_path=model_evaluation_config.model_registry_file_path)
+            self.model_registry.import_yaml(
+                file_path=model_evaluation_config.model_evaluation_file_path,
+                time_stamp=model_evaluation_config.time_stamp
+            )
         except Exception as e:
             # Raise a custom exception if an error occurs during the extraction process
             raise CustomException(e, sys) from e
-        
-    def get_best_model(self):
+
+    def get_best_model_path(self) -> str:
         """
-        Retrieves the best model from the model evaluation file.
+        Retrieves the file path of the best model from the model registry.
 
         Returns:
-            The best model object if found in the evaluation file, otherwise None.
-        
+            The file path of the best model if one has been promoted, otherwise None.
+
         Raises:
             CustomException: If an error occurs during the extraction process.
         """
         try:
-            model = None
-            model_evaluation_file_path = self.model_evaluation_config.model_evaluation_file_path
+            champion = self.model_registry.get_champion()
+            return None if champion is None else champion.model_path
+        except Exception as e:
+            # Raise a custom exception if an error occurs during the extraction process
+            raise CustomException(e, sys) from e
 
-            # Create an empty evaluation file if it doesn't exist
-            if not os.path.exists(model_evaluation_file_path):
-                write_yaml(file_path=model_evaluation_file_path, data={})
-                return model
+    def get_best_model(self):
+        """
+        Retrieves the best model from the model registry.
 
-            # Read the evaluation file
-            model_eval_file_content = read_yaml(file_path=model_evaluation_file_path)
+        The model is loaded once per file version and shared by later calls.
 
-            # Create an empty dictionary if the file is empty
-            model_eval_file_content = dict() if model_eval_file_content is None else model_eval_file_content
+        Returns:
+            The best model object if found in the evaluation file, otherwise None.
 
-            # Return None if the best model is not found in the evaluation file
-            if BEST_MODEL_KEY not in model_eval_file_content:
-                return model
+        Raises:
+            CustomException: If an error occurs during the extraction process.
+        """
+        try:
+            best_model_path = self.get_best_model_path()
+            if best_model_path is None:
+                return None
 
             # Load and return the best model
-            model = load_object(file_path=model_eval_file_content[BEST_MODEL_KEY][MODEL_PATH_KEY])
-            return model
+            return load_cached_object(file_path=best_model_path)
         except Exception as e:
             # Raise a custom exception if an error occurs during the extraction process
             raise CustomException(e, sys) from e
-    
-    def update_evaluation_report(self, model_evaluation_artifact: ModelEvaluationArtifact):
+
+    def get_batched_predictions(self, model, X):
+        """
+        Predicts the input features in batches of vectorized predictions.
+
+        Args:
+            model (HousingEstimatorModel): The model to predict with.
+            X (pd.DataFrame): The input features.
+
+        Returns:
+            np.array: The predictions of every row.
+        """
+        try:
+            batch_size = self.model_evaluation_config.batch_size
+            predictions = np.empty(len(X), dtype=np.float64)
+            for start in range(0, len(X), batch_size):
+                predictions[start:start + batch_size] = model.predict(X.iloc[start:start + batch_size])
+            return predictions
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_best_model_predictions(self, best_model_path: str, X, data_fingerprint: str):
+        """
+        Predicts the testing data with the best model, reusing cached predictions.
+
+        Predictions are cached on disk under a key built from the best model file version and
+        the testing data fingerprint, so evaluating many challengers against the same best
+        model only predicts the best model once.
+
+        Args:
+            best_model_path (str): The file path of the best model.
+            X (pd.DataFrame): The testing input features.
+            data_fingerprint (str): The fingerprint of the testing data.
+
+        Returns:
+            np.array: The predictions of the best model.
+        """
+        try:
+            cache_key = hashlib.sha256(
+                f'{best_model_path}:{os.stat(best_model_path).st_mtime_ns}:{data_fingerprint}'.encode()
+            ).hexdigest()
+            prediction_cache_dir = self.model_evaluation_config.prediction_cache_dir
+            cache_file_path = os.path.join(prediction_cache_dir, f'{cache_key}.npy')
+
+            if os.path.exists(cache_file_path):
+                logging.info(f'loading cached best model predictions: [{cache_file_path}]')
+                return np.load(cache_file_path)
+
+            predictions = self.get_batched_predictions(load_cached_object(file_path=best_model_path), X)
+            os.makedirs(prediction_cache_dir, exist_ok=True)
+            np.save(cache_file_path, predictions)
+            return predictions
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def get_metrics(y_true, y_pred) -> dict:
+        """
+        Computes the root mean squared error and the R2 score of predictions.
+        """
+        try:
+            return {
+                'rmse': float(np.sqrt(mean_squared_error(y_true, y_pred))),
+                'r2': float(r2_score(y_true, y_pred))
+            }
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_bootstrap_metrics(self, y_true, predictions_list: list) -> list:
+        """
+        Computes the RMSE and R2 score of predictions on bootstrap resamples of the testing data.
+
+        Each resample is a row of an index matrix, so all resamples are scored by a few
+        vectorized NumPy operations. Every model is scored on the same resamples, which makes
+        the per resample metric differences between models meaningful.
+
+        Args:
+            y_true (np.array): The testing target feature.
+            predictions_list (list): The predictions of each model on the testing data.
+
+        Returns:
+            list: One (rmse, r2) tuple of per resample metric arrays for each model.
+        """
+        try:
+            rng = np.random.default_rng(self.model_evaluation_config.bootstrap_random_state)
+            bootstrap_samples = self.model_evaluation_config.bootstrap_samples
+            row_count = len(y_true)
+
+            # Bound the memory of the index matrix by resampling in chunks of rows
+            chunk_size = max(1, BOOTSTRAP_MAX_INDEX_MATRIX_SIZE // row_count)
+            rmse_chunks = [[] for _ in predictions_list]
+            r2_chunks = [[] for _ in predictions_list]
+            for start in range(0, bootstrap_samples, chunk_size):
+                index = rng.integers(0, row_count, size=(min(chunk_size, bootstrap_samples - start), row_count))
+                y_sample = y_true[index]
+                total_sum_of_squares = np.square(y_sample - y_sample.mean(axis=1, keepdims=True)).sum(axis=1)
+                for model_number, predictions in enumerate(predictions_list):
+                    residual_sum_of_squares = np.square(y_sample - predictions[index]).sum(axis=1)
+                    rmse_chunks[model_number].append(np.sqrt(residual_sum_of_squares / row_count))
+                    r2_chunks[model_number].append(1 - residual_sum_of_squares / total_sum_of_squares)
+
+            return [
+                (np.concatenate(rmse_chunks[model_number]), np.concatenate(r2_chunks[model_number]))
+                for model_number in range(len(predictions_list))
+            ]
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_interval(self, values) -> dict:
+        """
+        Computes the percentile confidence interval of bootstrap metric values.
+        """
         try:
-            pass
+            alpha = 1 - self.model_evaluation_config.confidence_level
+            lower, upper = np.quantile(values, [alpha / 2, 1 - alpha / 2])
+            return {'lower': float(lower), 'mean': float(np.mean(values)), 'upper': float(upper)}
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def update_evaluation_report(self, model_evaluation_artifact: ModelEvaluationArtifact, best_model_path: str=None) -> bool:
+        """
+        Promotes an accepted model in the model registry and exports the model evaluation file.
+
+        The promotion is skipped if another pipeline promoted a different model since the
+        evaluation started, because the comparison no longer holds.
+
+        Args:
+            model_evaluation_artifact (ModelEvaluationArtifact): The artifact of the evaluation.
+            best_model_path (str, optional): The file path of the best model the evaluation compared against.
+
+        Returns:
+            bool: True if the model was promoted.
+        """
+        try:
+            if not model_evaluation_artifact.is_model_accepted:
+                return False
+
+            is_promoted = self.model_registry.promote(
+                model_path=model_evaluation_artifact.evaluated_model_path,
+                promoted_at=self.model_evaluation_config.time_stamp,
+                expected_champion_path=best_model_path
+            )
+
+            # Keep the human readable evaluation file in sync with the registry
+            self.model_registry.export_yaml(file_path=self.model_evaluation_config.model_evaluation_file_path)
+            return is_promoted
         except Exception as e:
             # Raise a custom exception if an error occurs during the extraction process
             raise CustomException(e, sys) from e
-        
+
     def initiate_model_evaluation(self) -> ModelEvaluationArtifact:
+        """
+        Compares the trained model against the best model on the testing data.
+
+        Both models are scored on bootstrap resamples of the testing data. The trained model
+        is accepted only if the lower bound of the confidence interval of its R2 improvement
+        over the best model is above zero, so noise in the testing data cannot promote it.
+
+        Returns:
+            ModelEvaluationArtifact: An object telling whether the trained model is accepted.
+
+        Raises:
+            CustomException: If an error occurs during the model evaluation process.
+        """
         try:
-            pass
+            trained_model_file_path = self.model_trainer_artifact.trained_model_file_path
+            test_rmse = self.model_trainer_artifact.test_rmse
+            test_accuracy = self.model_trainer_artifact.test_accuracy
+            model_accuracy = self.model_trainer_artifact.model_accuracy
+
+            # A compacted forest is evaluated, registered and pushed in place of the trained one
+            if self.model_compaction_artifact is not None and self.model_compaction_artifact.is_compacted:
+                trained_model_file_path = self.model_compaction_artifact.compacted_model_file_path
+                test_rmse = self.model_compaction_artifact.compacted_test_rmse
+                test_accuracy = self.model_compaction_artifact.compacted_test_accuracy
+                train_accuracy = self.model_trainer_artifact.train_accuracy
+                model_accuracy = (2 * train_accuracy * test_accuracy) / (train_accuracy + test_accuracy)
+
+            best_model_path = self.get_best_model_path()
+
+            # Load the testing data
+            test_file_path = self.data_ingestion_artifact.test_file_path
+            schema_file_path = self.data_validation_artifact.schema_file_path
+            test_df = load_data(file_path=test_file_path, schema_file_path=schema_file_path)
+            target_column_name = load_dataset_schema(schema_file_path).target_column
+            input_feature_test_df = test_df.drop(columns=[target_column_name])
+            target_feature_test = np.array(test_df[target_column_name], dtype=np.float64)
+
+            # Record the trained model in the registry
+            self.model_registry.register_model(
+                time_stamp=self.model_evaluation_config.time_stamp,
+                model_path=trained_model_file_path,
+                data_fingerprint=get_file_fingerprint(file_path=self.data_ingestion_artifact.train_file_path),
+                train_rmse=self.model_trainer_artifact.train_rmse,
+                test_rmse=test_rmse,
+                train_accuracy=self.model_trainer_artifact.train_accuracy,
+                test_accuracy=test_accuracy,
+                model_accuracy=model_accuracy
+            )
+
+            # Score the trained model
+            trained_model_predictions = self.get_batched_predictions(
+                load_cached_object(file_path=trained_model_file_path),
+                input_feature_test_df
+            )
+            evaluation_report = {
+                'trained_model': dict(self.get_metrics(target_feature_test, trained_model_predictions), path=trained_model_file_path)
+            }
+
+            if best_model_path is None:
+                # Accept the trained model if there is no best model yet
+                logging.info('no best model found, accepting the trained model')
+                (trained_rmse, trained_r2), = self.get_bootstrap_metrics(target_feature_test, [trained_model_predictions])
+                evaluation_report['trained_model'].update(rmse_interval=self.get_interval(trained_rmse), r2_interval=self.get_interval(trained_r2))
+                is_model_accepted = True
+            else:
+                # Score the best model, reusing its cached predictions
+                data_fingerprint = get_file_fingerprint(file_path=test_file_path)
+                best_model_predictions = self.get_best_model_predictions(best_model_path, input_feature_test_df, data_fingerprint)
+                evaluation_report['best_model'] = dict(self.get_metrics(target_feature_test, best_model_predictions), path=best_model_path)
+
+                (trained_rmse, trained_r2), (best_rmse, best_r2) = self.get_bootstrap_metrics(
+                    target_feature_test,
+                    [trained_model_predictions, best_model_predictions]
+                )
+                evaluation_report['trained_model'].update(rmse_interval=self.get_interval(trained_rmse), r2_interval=self.get_interval(trained_r2))
+                evaluation_report['best_model'].update(rmse_interval=self.get_interval(best_rmse), r2_interval=self.get_interval(best_r2))
+                evaluation_report['difference'] = {
+                    'rmse_interval': self.get_interval(trained_rmse - best_rmse),
+                    'r2_interval': self.get_interval(trained_r2 - best_r2)
+                }
+                is_model_accepted = evaluation_report['difference']['r2_interval']['lower'] > 0
+
+            evaluation_report_file_path = self.model_evaluation_config.evaluation_report_file_path
+            model_evaluation_artifact = ModelEvaluationArtifact(
+                is_model_accepted=is_model_accepted,
+                evaluated_model_path=trained_model_file_path,
+                evaluation_report_file_path=evaluation_report_file_path
+            )
+
+            # Promote the accepted model unless the best model changed concurrently
+            if is_model_accepted and not self.update_evaluation_report(model_evaluation_artifact, best_model_path=best_model_path):
+                model_evaluation_artifact = model_evaluation_artifact._replace(is_model_accepted=False)
+
+            evaluation_report['is_model_accepted'] = model_evaluation_artifact.is_model_accepted
+            evaluation_report['confidence_level'] = self.model_evaluation_config.confidence_level
+            evaluation_report['bootstrap_samples'] = self.model_evaluation_config.bootstrap_samples
+            logging.info('evaluation report: [%s]', evaluation_report)
+            write_yaml(file_path=evaluation_report_file_path, data=evaluation_report)
+
+            logging.info('model evaluation artifact: [%s]', model_evaluation_artifact)
+            return model_evaluation_artifact
         except Exception as e:
             # Raise a custom exception if an error occurs during the extraction process
-            raise CustomException(e, sys)
-        
+            raise CustomException(e, sys) from e
+
     def __del__(self):
-        logging.info(f"{'=' * 20}Model Evaluation log completed.{'=' * 20} ")
\ No newline at end of file
+        logging.info(f"{'=' * 20}Model Evaluation log completed.{'=' * 20} ")
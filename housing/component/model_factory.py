@@ -0,0 +1,292 @@
+# housing/component/model_factory.py
+
+# Import required libraries and packages
+import sys
+import importlib
+from collections import namedtuple
+
+import numpy as np
+from sklearn.base import clone, is_classifier
+from sklearn.model_selection import ParameterGrid, check_cv, cross_validate
+
+from housing.constant import *
+from housing.logger import logging
+from housing.exception import CustomException
+from housing.util import read_yaml_cached, thaw_yaml, get_array_fingerprint
+from housing.component.search_result_store import SearchResultStore
+from housing.component.cv_fold_cache import CVFoldCache
+
+# A named tuple that represents a model initialized from the model configuration.
+#
+# Attributes:
+#     model_serial_number (str): The key of the model in the model configuration.
+#     model (object): The estimator initialized with its base parameters.
+#     param_grid_search (dict): The parameter grid to search.
+#     model_name (str): The fully qualified class name of the estimator.
+InitializedModelDetail = namedtuple(
+    'InitializedModelDetail',
+    [
+        'model_serial_number',
+        'model',
+        'param_grid_search',
+        'model_name'
+    ]
+)
+
+# A named tuple that represents the best model found by the grid search of one estimator.
+#
+# Attributes:
+#     model_serial_number (str): The key of the model in the model configuration.
+#     model (object): The estimator initialized with its base parameters.
+#     best_model (object): The best estimator refitted on the complete training data.
+#     best_parameters (dict): The grid point of the best estimator.
+#     best_score (float): The mean cross validation score of the best estimator.
+GridSearchedBestModel = namedtuple(
+    'GridSearchedBestModel',
+    [
+        'model_serial_number',
+        'model',
+        'best_model',
+        'best_parameters',
+        'best_score'
+    ]
+)
+
+class ModelFactory:
+    """
+    Model factory class that searches the estimators of the model configuration.
+
+    Grid points are evaluated one at a time with the cross validation spec of the configured
+    grid search, and every result is memoized in a SearchResultStore. Repeated searches on
+    the same data only evaluate new or changed grid points. When a CVFoldCache is given, the
+    folds are materialised once and shared by every estimator and grid point.
+
+    Args:
+        model_config_path (str): The file path of the model configuration.
+        search_result_store (SearchResultStore, optional): The store memoizing search results.
+        cv_fold_cache (CVFoldCache, optional): The cache holding the folds shared by all estimators.
+
+    Raises:
+        CustomException: If an error occurs while reading the model configuration.
+    """
+    def __init__(
+        self,
+        model_config_path: str,
+        search_result_store: SearchResultStore=None,
+        cv_fold_cache: CVFoldCache=None
+    ) -> None:
+        try:
+            self.config = read_yaml_cached(file_path=model_config_path)
+            self.search_result_store = search_result_store
+            self.cv_fold_cache = cv_fold_cache
+
+            # Cross validation settings of the configured grid search
+            self.grid_search_params = thaw_yaml(self.config[GRID_SEARCH_KEY].get(PARAM_KEY)) or {}
+            self.models_initialization_config = dict(self.config[MODEL_SELECTION_KEY])
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def class_for_name(module_name: str, class_name: str):
+        """
+        Import a class from its module.
+
+        Args:
+            module_name (str): The name of the module.
+            class_name (str): The name of the class.
+
+        Returns:
+            type: The imported class.
+        """
+        try:
+            module = importlib.import_module(module_name)
+            logging.info(f'executing command: from {module_name} import {class_name}')
+            return getattr(module, class_name)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_initialized_model_list(self) -> list:
+        """
+        Initialize every estimator of the model configuration with its base parameters.
+
+        Returns:
+            list: The list of InitializedModelDetail.
+        """
+        try:
+            initialized_model_list = []
+            for model_serial_number, model_initialization_config in self.models_initialization_config.items():
+                model_class = ModelFactory.class_for_name(
+                    module_name=model_initialization_config[MODULE_KEY],
+                    class_name=model_initialization_config[CLASS_KEY]
+                )
+                model = model_class()
+                if model_initialization_config.get(PARAM_KEY) is not None:
+                    model.set_params(**thaw_yaml(model_initialization_config[PARAM_KEY]))
+
+                initialized_model_list.append(InitializedModelDetail(
+                    model_serial_number=model_serial_number,
+                    model=model,
+                    param_grid_search=thaw_yaml(model_initialization_config.get(SEARCH_PARAM_GRID_KEY)) or {},
+                    model_name=f'{model_initialization_config[MODULE_KEY]}.{model_initialization_config[CLASS_KEY]}'
+                ))
+            return initialized_model_list
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def execute_grid_search_operation(
+        self,
+        initialized_model: InitializedModelDetail,
+        input_feature,
+        output_feature,
+        data_fingerprint: str
+    ) -> GridSearchedBestModel:
+        """
+        Search the parameter grid of one estimator, reusing memoized grid points.
+
+        Args:
+            initialized_model (InitializedModelDetail): The estimator to search.
+            input_feature (np.array): The training input features.
+            output_feature (np.array): The training target feature.
+            data_fingerprint (str): The fingerprint of the training data.
+
+        Returns:
+            GridSearchedBestModel: The best grid point refitted on the complete training data.
+        """
+        try:
+            logging.info(f"{'>>' * 30} training {initialized_model.model_name} started {'<<' * 30}")
+            scoring = self.grid_search_params.get('scoring')
+            if self.cv_fold_cache is not None:
+                cv = self.cv_fold_cache
+                cv_spec = dict(self.cv_fold_cache.get_spec(), scoring=scoring)
+            else:
+                cv = check_cv(
+                    self.grid_search_params.get('cv', 5),
+                    output_feature,
+                    classifier=is_classifier(initialized_model.model)
+                )
+                cv_spec = {'cv': repr(cv), 'scoring': scoring}
+
+            best_key, best_result, best_parameters, best_score = None, None, None, None
+            evaluated_count = 0
+            for parameters in ParameterGrid(initialized_model.param_grid_search):
+                estimator = clone(initialized_model.model).set_params(**parameters)
+                key = SearchResultStore.make_key(
+                    data_fingerprint=data_fingerprint,
+                    estimator_class=initialized_model.model_name,
+                    params=estimator.get_params(deep=True),
+                    cv_spec=cv_spec
+                )
+
+                result = None if self.search_result_store is None else self.search_result_store.get(key)
+                if result is None:
+                    result = self.evaluate_grid_point(estimator, input_feature, output_feature, cv, scoring)
+                    evaluated_count += 1
+                    if self.search_result_store is not None:
+                        self.search_result_store.put(key, result)
+
+                logging.info(f'grid point: [{parameters}] mean test score: [{result["mean_test_score"]}]')
+                if best_score is None or result['mean_test_score'] > best_score:
+                    best_key, best_result, best_parameters, best_score = key, result, parameters, result['mean_test_score']
+
+            logging.info(f'evaluated [{evaluated_count}] new grid points for {initialized_model.model_name}')
+
+            # Refit the best grid point on the complete data unless its fitted model is stored
+            best_model = None if self.search_result_store is None else self.search_result_store.get_model(best_key)
+            if best_model is None:
+                best_model = clone(initialized_model.model).set_params(**best_parameters)
+                best_model.fit(input_feature, output_feature)
+                if self.search_result_store is not None:
+                    self.search_result_store.put(best_key, best_result, model=best_model)
+
+            logging.info(f"{'>>' * 30} training {initialized_model.model_name} completed {'<<' * 30}")
+            return GridSearchedBestModel(
+                model_serial_number=initialized_model.model_serial_number,
+                model=initialized_model.model,
+                best_model=best_model,
+                best_parameters=best_parameters,
+                best_score=best_score
+            )
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def evaluate_grid_point(self, estimator, input_feature, output_feature, cv, scoring) -> dict:
+        """
+        Cross validate a single grid point.
+
+        Args:
+            estimator (object): The estimator set to the grid point.
+            input_feature (np.array): The training input features.
+            output_feature (np.array): The training target feature.
+            cv (object): The cross validation splitter.
+            scoring (str): The scoring of the configured grid search, None for the estimator score.
+
+        Returns:
+            dict: The per fold test scores and fit times with their means.
+        """
+        try:
+            cv_results = cross_validate(
+                estimator,
+                input_feature,
+                output_feature,
+                cv=cv,
+                scoring=scoring,
+                n_jobs=self.grid_search_params.get('n_jobs')
+            )
+            return {
+                'test_scores': cv_results['test_score'].tolist(),
+                'fit_times': cv_results['fit_time'].tolist(),
+                'mean_test_score': float(np.mean(cv_results['test_score'])),
+                'std_test_score': float(np.std(cv_results['test_score'])),
+                'mean_fit_time': float(np.mean(cv_results['fit_time']))
+            }
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_best_model(self, X, y, base_accuracy: float=0.6) -> GridSearchedBestModel:
+        """
+        Search every estimator of the model configuration and return the best one.
+
+        Args:
+            X (np.array): The training input features.
+            y (np.array): The training target feature.
+            base_accuracy (float): The minimum mean cross validation score to accept a model.
+
+        Returns:
+            GridSearchedBestModel: The best model across all estimators.
+
+        Raises:
+            CustomException: If no estimator reaches the base accuracy.
+        """
+        try:
+            data_fingerprint = get_array_fingerprint(X, y)
+            initialized_model_list = self.get_initialized_model_list()
+
+            # Split the data once so that every estimator is compared on the same folds
+            if self.cv_fold_cache is not None:
+                cv = check_cv(
+                    self.grid_search_params.get('cv', 5),
+                    y,
+                    classifier=any(is_classifier(model.model) for model in initialized_model_list)
+                )
+                self.cv_fold_cache.materialise(cv=cv, X=X, y=y)
+
+            best_model = None
+            for initialized_model in initialized_model_list:
+                grid_searched_best_model = self.execute_grid_search_operation(
+                    initialized_model=initialized_model,
+                    input_feature=X,
+                    output_feature=y,
+                    data_fingerprint=data_fingerprint
+                )
+                if grid_searched_best_model.best_score < base_accuracy:
+                    continue
+                if best_model is None or grid_searched_best_model.best_score > best_model.best_score:
+                    best_model = grid_searched_best_model
+
+            if best_model is None:
+                raise Exception(f'none of the models has base accuracy: [{base_accuracy}]')
+
+            logging.info(f'best model: [{best_model}]')
+            return best_model
+        except Exception as e:
+            raise CustomException(e, sys) from e
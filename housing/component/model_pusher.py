@@ -0,0 +1,225 @@
+# housing/component/model_pusher.py
+
+# Import required libraries and packages
+import os
+import sys
+import stat
+import shutil
+import tempfile
+
+from housing.constant import *
+from housing.logger import logging
+from housing.exception import CustomException
+from housing.util import load_object
+from housing.entity.config_entity import ModelPusherConfig
+from housing.entity.artifact_entity import DataIngestionArtifact, ModelEvaluationArtifact, ModelPusherArtifact
+
+class ModelPusher:
+
+    def __init__(
+        self,
+        model_pusher_config: ModelPusherConfig,
+        model_evaluation_artifact: ModelEvaluationArtifact,
+        data_ingestion_artifact: DataIngestionArtifact=None
+    ) -> None:
+        """
+        Initializes a new instance of the ModelPusher class.
+
+        Parameters:
+        - model_pusher_config (ModelPusherConfig): The configuration object for model pushing.
+        - model_evaluation_artifact (ModelEvaluationArtifact): The artifact object for model evaluation.
+        - data_ingestion_artifact (DataIngestionArtifact, optional): The artifact object for data ingestion,
+          used to save a warm-up sample with the pushed model.
+
+        Raises:
+        - CustomException: If an error occurs during initialization.
+        """
+        try:
+            logging.info(f"{'>>' * 30} model pusher log started {'<<' * 30} ")
+            self.model_pusher_config = model_pusher_config
+            self.model_evaluation_artifact = model_evaluation_artifact
+            self.data_ingestion_artifact = data_ingestion_artifact
+        except Exception as e:
+            # Raise a custom exception if an error occurs during initialization
+            raise CustomException(e, sys) from e
+
+    def initiate_model_pusher(self) -> ModelPusherArtifact:
+        """
+        Publishes the accepted model as an immutable version and makes it the current model.
+
+        The version directory is assembled under a temporary name and renamed into place, then
+        the current model pointer file is replaced atomically. Serving processes therefore
+        only ever see complete versions, and a version is never modified once published.
+
+        Returns:
+            ModelPusherArtifact: An object containing the file path of the exported model.
+
+        Raises:
+            CustomException: If an error occurs during the model pushing process.
+        """
+        try:
+            if not self.model_evaluation_artifact.is_model_accepted:
+                logging.info('trained model is not accepted, nothing to push')
+                return ModelPusherArtifact(
+                    is_model_pusher=False,
+                    export_model_file_path=None,
+                    inference_bundle_file_path=None,
+                    inference_bundle_message=None
+                )
+
+            export_dir_path = self.model_pusher_config.export_dir_path
+            model_version = self.model_pusher_config.model_version
+            version_dir_path = os.path.join(export_dir_path, model_version)
+            export_model_file_path = os.path.join(version_dir_path, EXPORTED_MODEL_FILE_NAME)
+            bundle_file_path = os.path.join(version_dir_path, INFERENCE_BUNDLE_FILE_NAME)
+
+            if os.path.exists(version_dir_path):
+                logging.info(f'model version: [{model_version}] is already published')
+                inference_bundle_message = None
+                if not os.path.exists(bundle_file_path):
+                    inference_bundle_message = 'the published version has no inference bundle'
+            else:
+                inference_bundle_message = self.publish_version(version_dir_path)
+
+            self.set_current_version(export_dir_path, model_version)
+
+            model_pusher_artifact = ModelPusherArtifact(
+                is_model_pusher=True,
+                export_model_file_path=export_model_file_path,
+                inference_bundle_file_path=bundle_file_path if inference_bundle_message is None else None,
+                inference_bundle_message=inference_bundle_message
+            )
+            logging.info('model pusher artifact: [%s]', model_pusher_artifact)
+            return model_pusher_artifact
+        except Exception as e:
+            # Raise a custom exception if an error occurs during the model pushing process
+            raise CustomException(e, sys) from e
+
+    def publish_version(self, version_dir_path: str) -> str:
+        """
+        Copies the accepted model, its warm-up sample and its inference bundle into a new read-only version directory.
+
+        Parameters:
+        - version_dir_path (str): The directory of the new version.
+
+        Returns:
+        - str: Why the version was published without an inference bundle, None if it has one.
+        """
+        try:
+            export_dir_path = os.path.dirname(version_dir_path)
+            os.makedirs(export_dir_path, exist_ok=True)
+
+            # Assemble the version next to its final location so the rename stays on one file system
+            staging_dir_path = tempfile.mkdtemp(dir=export_dir_path, prefix='.staging-')
+            try:
+                shutil.copy2(
+                    self.model_evaluation_artifact.evaluated_model_path,
+                    os.path.join(staging_dir_path, EXPORTED_MODEL_FILE_NAME)
+                )
+                inference_bundle_message = 'no warm-up sample to check the inference bundle on'
+                if self.data_ingestion_artifact is not None:
+                    self.save_warmup_sample(os.path.join(staging_dir_path, WARMUP_SAMPLE_FILE_NAME))
+                    inference_bundle_message = self.save_inference_bundle(staging_dir_path)
+                if inference_bundle_message is not None:
+                    logging.warning(
+                        'publishing model version: [%s] without inference bundle: [%s]',
+                        os.path.basename(version_dir_path), inference_bundle_message
+                    )
+
+                for file_name in os.listdir(staging_dir_path):
+                    file_path = os.path.join(staging_dir_path, file_name)
+                    with open(file_path, 'rb') as file_obj:
+                        os.fsync(file_obj.fileno())
+                    os.chmod(file_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+                os.chmod(staging_dir_path, 0o755)
+
+                os.rename(staging_dir_path, version_dir_path)
+            except Exception:
+                shutil.rmtree(staging_dir_path, ignore_errors=True)
+                raise
+
+            logging.info(f'published model version: [{version_dir_path}]')
+            return inference_bundle_message
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def save_warmup_sample(self, file_path: str) -> None:
+        """
+        Saves the first testing rows for serving processes to warm up on.
+
+        Parameters:
+        - file_path (str): The file path of the warm-up sample.
+        """
+        try:
+            with open(self.data_ingestion_artifact.test_file_path) as test_file, open(file_path, 'w') as sample_file:
+                for line_number, line in enumerate(test_file):
+                    if line_number > self.model_pusher_config.warmup_sample_size:
+                        break
+                    sample_file.write(line)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def save_inference_bundle(self, staging_dir_path: str) -> str:
+        """
+        Exports the model as a NumPy-only inference bundle, checked against the estimator on the warm-up sample.
+
+        The bundle is optional: if the model cannot be flattened or its predictions differ from
+        the estimator, the version is published without it.
+
+        Parameters:
+        - staging_dir_path (str): The staging directory of the new version.
+
+        Returns:
+        - str: Why the bundle could not be exported, None if it was.
+        """
+        bundle_file_path = os.path.join(staging_dir_path, INFERENCE_BUNDLE_FILE_NAME)
+        try:
+            import pandas as pd
+            from housing.component.inference_bundle import InferenceBundleExporter
+
+            housing_model = load_object(file_path=os.path.join(staging_dir_path, EXPORTED_MODEL_FILE_NAME))
+            exporter = InferenceBundleExporter(housing_model)
+            exporter.export(bundle_file_path)
+            exporter.check_parity(
+                file_path=bundle_file_path,
+                dataframe=pd.read_csv(os.path.join(staging_dir_path, WARMUP_SAMPLE_FILE_NAME)),
+                tolerance=self.model_pusher_config.inference_bundle_tolerance
+            )
+            return None
+        except Exception as e:
+            if os.path.exists(bundle_file_path):
+                os.remove(bundle_file_path)
+
+            # The root cause tells why, the wrapping exceptions only where
+            cause = e
+            while cause.__cause__ is not None:
+                cause = cause.__cause__
+            return f'{type(cause).__name__}: {cause}'
+
+    @staticmethod
+    def set_current_version(export_dir_path: str, model_version: str) -> None:
+        """
+        Atomically points the current model pointer file at a published version.
+
+        Parameters:
+        - export_dir_path (str): The export directory holding the versions.
+        - model_version (str): The version to make current.
+        """
+        try:
+            file_descriptor, temp_file_path = tempfile.mkstemp(dir=export_dir_path, suffix='.tmp')
+            try:
+                with os.fdopen(file_descriptor, 'w') as pointer_file:
+                    pointer_file.write(model_version)
+                    pointer_file.flush()
+                    os.fsync(pointer_file.fileno())
+                os.chmod(temp_file_path, 0o644)
+                os.replace(temp_file_path, os.path.join(export_dir_path, CURRENT_MODEL_POINTER_FILE_NAME))
+            except Exception:
+                os.remove(temp_file_path)
+                raise
+            logging.info(f'current model version: [{model_version}]')
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def __del__(self):
+        logging.info(f"{'>>' * 30} model pusher log completed {'<<' * 30} \n\n")
@@ -0,0 +1,310 @@
+# housing/component/model_registry.py
+
+# Import required libraries and packages
+import os
+import sys
+import sqlite3
+import contextlib
+from collections import namedtuple
+
+from housing.constant import *
+from housing.logger import logging
+from housing.exception import CustomException
+from housing.util import read_yaml, write_yaml
+
+# A named tuple that represents a model recorded in the model registry.
+#
+# Attributes:
+#     model_id (int): The identifier of the model in the registry.
+#     time_stamp (str): The timestamp of the run that trained the model.
+#     model_path (str): The file path of the trained model.
+#     data_fingerprint (str): The fingerprint of the data the model was trained on.
+#     train_rmse (float): The root mean squared error for the training data.
+#     test_rmse (float): The root mean squared error for the testing data.
+#     train_accuracy (float): The accuracy score for the training data.
+#     test_accuracy (float): The accuracy score for the testing data.
+#     model_accuracy (float): The overall accuracy score for the model.
+#     is_champion (bool): Flag indicating whether the model is the current best model.
+RegisteredModel = namedtuple(
+    'RegisteredModel',
+    [
+        'model_id',
+        'time_stamp',
+        'model_path',
+        'data_fingerprint',
+        'train_rmse',
+        'test_rmse',
+        'train_accuracy',
+        'test_accuracy',
+        'model_accuracy',
+        'is_champion'
+    ]
+)
+
+# Tables and indexes of the registry
+REGISTRY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS model (
+    model_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    time_stamp TEXT NOT NULL,
+    model_path TEXT NOT NULL UNIQUE,
+    data_fingerprint TEXT,
+    train_rmse REAL,
+    test_rmse REAL,
+    train_accuracy REAL,
+    test_accuracy REAL,
+    model_accuracy REAL
+);
+CREATE INDEX IF NOT EXISTS model_time_stamp_index ON model (time_stamp);
+CREATE INDEX IF NOT EXISTS model_data_fingerprint_index ON model (data_fingerprint);
+CREATE INDEX IF NOT EXISTS model_test_accuracy_index ON model (test_accuracy);
+CREATE TABLE IF NOT EXISTS champion (
+    slot INTEGER PRIMARY KEY CHECK (slot = 0),
+    model_id INTEGER NOT NULL REFERENCES model (model_id),
+    promoted_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS promotion (
+    promotion_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    model_id INTEGER NOT NULL REFERENCES model (model_id),
+    promoted_at TEXT NOT NULL
+);
+"""
+
+MODEL_COLUMNS = (
+    'model.model_id, model.time_stamp, model.model_path, model.data_fingerprint, model.train_rmse, '
+    'model.test_rmse, model.train_accuracy, model.test_accuracy, model.model_accuracy, '
+    'champion.model_id IS NOT NULL'
+)
+
+class ModelRegistry:
+    """
+    Embedded SQLite registry of every trained model.
+
+    Models are indexed by timestamp, metrics, data fingerprint and file path. The current
+    best model is a single row pointer, so looking it up does not depend on the size of the
+    history. The database runs in WAL mode so readers are never blocked by a promotion, and
+    promotions run in immediate transactions so concurrent pipelines cannot interleave them.
+
+    Args:
+        registry_file_path (str): The file path of the SQLite database.
+        timeout (float): The number of seconds to wait for a concurrent writer.
+
+    Raises:
+        CustomException: If an error occurs while creating the registry.
+    """
+    def __init__(self, registry_file_path: str, timeout: float=30.0) -> None:
+        try:
+            self.registry_file_path = registry_file_path
+            self.timeout = timeout
+            os.makedirs(os.path.dirname(registry_file_path), exist_ok=True)
+
+            # The journal mode can only be changed outside of a transaction
+            connection = sqlite3.connect(self.registry_file_path, timeout=self.timeout, isolation_level=None)
+            try:
+                connection.execute('PRAGMA journal_mode=WAL')
+                connection.executescript(REGISTRY_SCHEMA)
+            finally:
+                connection.close()
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @contextlib.contextmanager
+    def __connect(self, immediate: bool=False):
+        # Transactions are managed explicitly, sqlite3 must not open them implicitly
+        connection = sqlite3.connect(self.registry_file_path, timeout=self.timeout, isolation_level=None)
+        try:
+            connection.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+            yield connection
+            connection.execute('COMMIT')
+        except Exception:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            raise
+        finally:
+            connection.close()
+
+    def register_model(
+        self,
+        time_stamp: str,
+        model_path: str,
+        data_fingerprint: str=None,
+        train_rmse: float=None,
+        test_rmse: float=None,
+        train_accuracy: float=None,
+        test_accuracy: float=None,
+        model_accuracy: float=None
+    ) -> RegisteredModel:
+        """
+        Record a trained model. Registering the same model file again updates its entry.
+
+        Returns:
+            RegisteredModel: The registered model.
+        """
+        try:
+            with self.__connect(immediate=True) as connection:
+                connection.execute(
+                    'INSERT INTO model (time_stamp, model_path, data_fingerprint, train_rmse, test_rmse, '
+                    'train_accuracy, test_accuracy, model_accuracy) VALUES (?, ?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (model_path) DO UPDATE SET time_stamp = excluded.time_stamp, '
+                    'data_fingerprint = excluded.data_fingerprint, train_rmse = excluded.train_rmse, '
+                    'test_rmse = excluded.test_rmse, train_accuracy = excluded.train_accuracy, '
+                    'test_accuracy = excluded.test_accuracy, model_accuracy = excluded.model_accuracy',
+                    (time_stamp, model_path, data_fingerprint, train_rmse, test_rmse,
+                     train_accuracy, test_accuracy, model_accuracy)
+                )
+            return self.get_model(model_path)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_model(self, model_path: str) -> RegisteredModel:
+        """
+        Look up a registered model by its file path.
+
+        Returns:
+            RegisteredModel: The registered model, or None if the model is not registered.
+        """
+        try:
+            with self.__connect() as connection:
+                row = connection.execute(
+                    f'SELECT {MODEL_COLUMNS} FROM model LEFT JOIN champion USING (model_id) WHERE model.model_path = ?',
+                    (model_path,)
+                ).fetchone()
+            return None if row is None else RegisteredModel(*row[:-1], bool(row[-1]))
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_champion(self) -> RegisteredModel:
+        """
+        Look up the current best model.
+
+        Returns:
+            RegisteredModel: The best model, or None if no model has been promoted yet.
+        """
+        try:
+            with self.__connect() as connection:
+                row = connection.execute(
+                    f'SELECT {MODEL_COLUMNS} FROM champion JOIN model USING (model_id) WHERE champion.slot = 0'
+                ).fetchone()
+            return None if row is None else RegisteredModel(*row[:-1], True)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_history(self, limit: int=None, data_fingerprint: str=None) -> list:
+        """
+        List registered models, newest first.
+
+        Args:
+            limit (int, optional): The maximum number of models to return.
+            data_fingerprint (str, optional): Only return models trained on this data.
+
+        Returns:
+            list: The list of RegisteredModel.
+        """
+        try:
+            query = f'SELECT {MODEL_COLUMNS} FROM model LEFT JOIN champion USING (model_id)'
+            parameters = []
+            if data_fingerprint is not None:
+                query += ' WHERE model.data_fingerprint = ?'
+                parameters.append(data_fingerprint)
+            query += ' ORDER BY model.time_stamp DESC, model.model_id DESC'
+            if limit is not None:
+                query += ' LIMIT ?'
+                parameters.append(limit)
+
+            with self.__connect() as connection:
+                rows = connection.execute(query, parameters).fetchall()
+            return [RegisteredModel(*row[:-1], bool(row[-1])) for row in rows]
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def promote(self, model_path: str, promoted_at: str, expected_champion_path: str=None) -> bool:
+        """
+        Atomically make a registered model the best model.
+
+        The promotion only happens if the best model is still the one the caller compared
+        against, so a pipeline cannot overwrite a promotion made concurrently by another one.
+
+        Args:
+            model_path (str): The file path of the registered model to promote.
+            promoted_at (str): The timestamp of the promotion.
+            expected_champion_path (str, optional): The file path of the best model the caller
+                evaluated against, None if the caller found no best model.
+
+        Returns:
+            bool: True if the model was promoted.
+        """
+        try:
+            with self.__connect(immediate=True) as connection:
+                row = connection.execute(
+                    'SELECT model.model_path FROM champion JOIN model USING (model_id) WHERE champion.slot = 0'
+                ).fetchone()
+                current_champion_path = None if row is None else row[0]
+                if current_champion_path != expected_champion_path:
+                    logging.info(
+                        f'best model changed from [{expected_champion_path}] to [{current_champion_path}], '
+                        f'not promoting [{model_path}]'
+                    )
+                    return False
+
+                model_id = connection.execute('SELECT model_id FROM model WHERE model_path = ?', (model_path,)).fetchone()[0]
+                connection.execute(
+                    'INSERT INTO champion (slot, model_id, promoted_at) VALUES (0, ?, ?) '
+                    'ON CONFLICT (slot) DO UPDATE SET model_id = excluded.model_id, promoted_at = excluded.promoted_at',
+                    (model_id, promoted_at)
+                )
+                connection.execute('INSERT INTO promotion (model_id, promoted_at) VALUES (?, ?)', (model_id, promoted_at))
+            logging.info(f'promoted model: [{model_path}]')
+            return True
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def import_yaml(self, file_path: str, time_stamp: str) -> None:
+        """
+        Seed an empty registry with the best model of a model evaluation file.
+
+        Args:
+            file_path (str): The file path of the model evaluation file.
+            time_stamp (str): The timestamp recorded for the imported model.
+        """
+        try:
+            if not os.path.exists(file_path) or self.get_champion() is not None:
+                return
+            model_eval_content = read_yaml(file_path=file_path) or dict()
+            if BEST_MODEL_KEY not in model_eval_content:
+                return
+            model_path = model_eval_content[BEST_MODEL_KEY][MODEL_PATH_KEY]
+            self.register_model(time_stamp=time_stamp, model_path=model_path)
+            self.promote(model_path=model_path, promoted_at=time_stamp)
+            logging.info(f'imported best model: [{model_path}] from: [{file_path}]')
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def export_yaml(self, file_path: str) -> None:
+        """
+        Write the best model and the promotion history in the model evaluation YAML format.
+
+        Args:
+            file_path (str): The file path of the model evaluation file.
+        """
+        try:
+            with self.__connect() as connection:
+                rows = connection.execute(
+                    'SELECT promotion.promoted_at, model.model_path, model.test_rmse, model.test_accuracy '
+                    'FROM promotion JOIN model USING (model_id) ORDER BY promotion.promotion_id'
+                ).fetchall()
+
+            model_eval_content = dict()
+            history = dict()
+            for promoted_at, model_path, test_rmse, test_accuracy in rows:
+                if BEST_MODEL_KEY in model_eval_content:
+                    history[promoted_at] = model_eval_content[BEST_MODEL_KEY]
+                model_eval_content[BEST_MODEL_KEY] = {
+                    MODEL_PATH_KEY: model_path,
+                    'test_rmse': test_rmse,
+                    'test_accuracy': test_accuracy
+                }
+            if len(history) > 0:
+                model_eval_content[HISTORY_KEY] = history
+
+            write_yaml(file_path=file_path, data=model_eval_content)
+        except Exception as e:
+            raise CustomException(e, sys) from e
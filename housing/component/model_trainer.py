@@ -0,0 +1,515 @@
+# housing/component/model_trainer.py
+
+# Import required libraries and packages
+import os
+import sys
+import json
+import copy
+import math
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import r2_score, mean_squared_error
+
+from housing.constant import *
+from housing.logger import logging
+from housing.exception import CustomException
+from housing.entity.config_entity import ModelTrainerConfig
+from housing.entity.artifact_entity import (
+    DataIngestionArtifact, DataValidationArtifact, DataTransformationArtifact, ModelTrainerArtifact
+)
+
+from housing.component.housing_estimator import HousingEstimatorModel
+from housing.component.model_factory import ModelFactory
+from housing.component.model_registry import ModelRegistry
+from housing.component.search_result_store import SearchResultStore
+from housing.component.cv_fold_cache import CVFoldCache
+from housing.util import load_dataset_schema, read_yaml, write_yaml, load_data, load_numpy_array_data, load_object, save_object
+
+class ModelTrainer:
+
+    def __init__(
+        self,
+        model_trainer_config: ModelTrainerConfig,
+        data_transformation_artifact: DataTransformationArtifact,
+        data_ingestion_artifact: DataIngestionArtifact=None,
+        data_validation_artifact: DataValidationArtifact=None
+    ) -> None:
+        """
+        Initializes a new instance of the ModelTrainer class.
+
+        Parameters:
+        - model_trainer_config (ModelTrainerConfig): The configuration object for model training.
+        - data_transformation_artifact (DataTransformationArtifact): The artifact object for data transformation.
+        - data_ingestion_artifact (DataIngestionArtifact, optional): The artifact object for data ingestion,
+          required to detect new rows in incremental training mode.
+        - data_validation_artifact (DataValidationArtifact, optional): The artifact object for data validation,
+          required to check the schema and the drift report in incremental training mode.
+
+        Raises:
+        - CustomException: If an error occurs during initialization.
+        """
+        try:
+            logging.info(f"{'>>' * 30} model trainer log started {'<<' * 30} ")
+            self.model_trainer_config = model_trainer_config
+            self.data_transformation_artifact = data_transformation_artifact
+            self.data_ingestion_artifact = data_ingestion_artifact
+            self.data_validation_artifact = data_validation_artifact
+        except Exception as e:
+            # Raise a custom exception if an error occurs during initialization
+            raise CustomException(e, sys) from e
+
+    def initiate_model_trainer(self) -> ModelTrainerArtifact:
+        """
+        Initiates the model training process.
+
+        In incremental training mode the best model recorded in the model registry is
+        updated with the new training rows only. The trainer falls back to a full refit when
+        there is no best model, the schema changed, data drift was found or too many rows are new.
+
+        Returns:
+            ModelTrainerArtifact: An object containing the file path of the trained model and
+            its train and test metrics.
+
+        Raises:
+            CustomException: If an error occurs during the model training process.
+        """
+        try:
+            trained = None
+            if self.model_trainer_config.training_mode == TRAINING_MODE_INCREMENTAL:
+                trained = self.train_incremental()
+
+            if trained is None:
+                trained = self.train_full()
+
+            housing_model, training_state, x_train, y_train, x_test, y_test = trained
+
+            # Evaluate the trained model on the training and testing data
+            trained_model = housing_model.trained_model_object
+            base_accuracy = self.model_trainer_config.base_accuracy
+            train_rmse, train_accuracy = self.evaluate_regression_model(trained_model, x_train, y_train)
+            test_rmse, test_accuracy = self.evaluate_regression_model(trained_model, x_test, y_test)
+            model_accuracy = (2 * train_accuracy * test_accuracy) / (train_accuracy + test_accuracy)
+            logging.info(f'train accuracy: [{train_accuracy}] test accuracy: [{test_accuracy}]')
+
+            if test_accuracy < base_accuracy:
+                raise Exception(f'best model test accuracy: [{test_accuracy}] is below base accuracy: [{base_accuracy}]')
+
+            # Save the housing estimator model along with the state needed to warm start from it
+            trained_model_file_path = self.model_trainer_config.trained_model_file_path
+            logging.info(f'saving model at path: [{trained_model_file_path}]')
+            save_object(file_path=trained_model_file_path, obj=housing_model)
+            np.savez(self.get_training_state_file_path(trained_model_file_path), **training_state)
+
+            # Compare reduced precision models against a float64 refit
+            precision_parity_report_file_path = None
+            if x_train.dtype != np.float64:
+                precision_parity_report_file_path = os.path.join(
+                    os.path.dirname(trained_model_file_path),
+                    PRECISION_PARITY_REPORT_FILE_NAME
+                )
+                precision_parity_report = self.get_precision_parity_report(trained_model, x_train, y_train, x_test, y_test)
+                write_yaml(file_path=precision_parity_report_file_path, data=precision_parity_report)
+                logging.info('precision parity report: [%s]', precision_parity_report)
+
+            model_trainer_artifact = ModelTrainerArtifact(
+                is_trained=True,
+                message='model trained successfully',
+                trained_model_file_path=trained_model_file_path,
+                train_rmse=train_rmse,
+                test_rmse=test_rmse,
+                train_accuracy=train_accuracy,
+                test_accuracy=test_accuracy,
+                model_accuracy=model_accuracy,
+                precision_parity_report_file_path=precision_parity_report_file_path
+            )
+
+            logging.info('model trainer artifact: [%s]', model_trainer_artifact)
+            return model_trainer_artifact
+        except Exception as e:
+            # Raise a custom exception if an error occurs during the model training process
+            raise CustomException(e, sys) from e
+
+    def train_full(self) -> tuple:
+        """
+        Searches the configured models from scratch on the complete transformed data.
+
+        Returns:
+        - tuple: The housing estimator model, its training state and the training and testing
+          input and target features.
+        """
+        try:
+            # Load the transformed training and testing arrays
+            logging.info('loading transformed training and testing array')
+            train_array = load_numpy_array_data(file_path=self.data_transformation_artifact.transformed_train_file_path)
+            test_array = load_numpy_array_data(file_path=self.data_transformation_artifact.transformed_test_file_path)
+
+            # Split the arrays into input and target features
+            logging.info('splitting training and testing input and target feature')
+            x_train, y_train = train_array[:, :-1], train_array[:, -1]
+            x_test, y_test = test_array[:, :-1], test_array[:, -1]
+
+            # Search the configured models on shared folds, reusing grid points memoized by earlier runs
+            search_result_store = SearchResultStore(
+                store_dir=self.model_trainer_config.search_result_store_dir,
+                max_size_mb=self.model_trainer_config.search_result_store_max_size_mb,
+                save_model=self.model_trainer_config.search_result_store_save_model
+            )
+            model_factory = ModelFactory(
+                model_config_path=self.model_trainer_config.model_config_file_path,
+                search_result_store=search_result_store,
+                cv_fold_cache=CVFoldCache(fold_cache_dir=self.model_trainer_config.cv_fold_dir)
+            )
+            base_accuracy = self.model_trainer_config.base_accuracy
+            logging.info(f'expected accuracy: [{base_accuracy}]')
+            best_model = model_factory.get_best_model(X=x_train, y=y_train, base_accuracy=base_accuracy)
+
+            # Combine the preprocessing object and the trained model into one estimator
+            preprocessing_obj = load_object(file_path=self.data_transformation_artifact.preprocessed_object_file_path)
+            housing_model = HousingEstimatorModel(
+                preprocessing_object=preprocessing_obj,
+                trained_model_object=best_model.best_model,
+                dtype=x_train.dtype.name
+            )
+
+            # Record the rows and, for linear models, the sufficient statistics of this fit
+            row_hashes = np.array([], dtype=np.uint64)
+            if self.data_ingestion_artifact is not None and self.data_validation_artifact is not None:
+                input_train_df, target_train_df = self.get_input_and_target_feature(self.data_ingestion_artifact.train_file_path)
+                row_hashes = self.get_row_hashes(pd.concat([input_train_df, target_train_df], axis=1))
+            training_state = {'row_hashes': row_hashes}
+            training_state.update(self.update_sufficient_statistics(best_model.best_model, {}, x_train, y_train))
+
+            return housing_model, training_state, x_train, y_train, x_test, y_test
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def train_incremental(self) -> tuple:
+        """
+        Warm starts the best model with the training rows it has not seen yet.
+
+        Forests get additional trees fitted on the new rows, estimators supporting partial_fit
+        are updated in place and linear regressions are solved again from their updated
+        sufficient statistics. The best model keeps its preprocessing object, so the new rows
+        are transformed into the feature space the model was trained on.
+
+        Returns:
+        - tuple: The same values as train_full, or None if a full refit is required.
+        """
+        try:
+            champion_model_path = self.get_champion_model_path()
+            if champion_model_path is None:
+                logging.info('no best model found, falling back to full training')
+                return None
+            champion_model_path = self.get_warm_start_model_path(champion_model_path)
+
+            if self.data_ingestion_artifact is None or self.data_validation_artifact is None:
+                logging.info('raw training data is not available, falling back to full training')
+                return None
+
+            if self.is_data_drift_found():
+                logging.info('data drift found, falling back to full training')
+                return None
+
+            training_state_file_path = self.get_training_state_file_path(champion_model_path)
+            if not os.path.exists(training_state_file_path):
+                logging.warning('training state: [%s] not found, falling back to full training', training_state_file_path)
+                return None
+
+            champion = load_object(file_path=champion_model_path)
+            with np.load(training_state_file_path) as training_state_file:
+                champion_state = dict(training_state_file)
+
+            input_train_df, y_train = self.get_input_and_target_feature(self.data_ingestion_artifact.train_file_path)
+            input_test_df, y_test = self.get_input_and_target_feature(self.data_ingestion_artifact.test_file_path)
+
+            # The best model only understands the columns its preprocessing object was fitted on
+            fitted_columns = getattr(champion.preprocessing_object, 'feature_names_in_', None)
+            if fitted_columns is None or list(fitted_columns) != list(input_train_df.columns):
+                logging.info('dataset schema changed, falling back to full training')
+                return None
+
+            # Rows are identified by the hash of their raw values
+            row_hashes = self.get_row_hashes(pd.concat([input_train_df, y_train], axis=1))
+            is_new_row = ~np.isin(row_hashes, champion_state['row_hashes'])
+            new_row_count = int(is_new_row.sum())
+            new_row_ratio = new_row_count / max(len(row_hashes), 1)
+            logging.info(f'new training rows: [{new_row_count}] ratio: [{new_row_ratio}]')
+
+            if new_row_ratio > self.model_trainer_config.incremental_max_new_row_ratio:
+                logging.info('too many new training rows, falling back to full training')
+                return None
+
+            dtype = champion.dtype or np.float64
+            x_train = champion.preprocessing_object.transform(input_train_df).astype(dtype, copy=False)
+            x_test = champion.preprocessing_object.transform(input_test_df).astype(dtype, copy=False)
+            y_train, y_test = np.array(y_train, dtype=dtype), np.array(y_test, dtype=dtype)
+
+            trained_model = copy.deepcopy(champion.trained_model_object)
+            x_new, y_new = x_train[is_new_row], y_train[is_new_row]
+            statistics = self.update_sufficient_statistics(trained_model, champion_state, x_new, y_new)
+            if new_row_count > 0:
+                trained_model = self.warm_start_model(trained_model, statistics, x_new, y_new, len(champion_state['row_hashes']))
+                if trained_model is None:
+                    logging.warning(
+                        'best model: [%s] of type [%s] does not support warm start, falling back to full training',
+                        champion_model_path, type(champion.trained_model_object).__name__
+                    )
+                    return None
+
+            training_state = {'row_hashes': np.union1d(champion_state['row_hashes'], row_hashes)}
+            training_state.update(statistics)
+
+            housing_model = HousingEstimatorModel(
+                preprocessing_object=champion.preprocessing_object,
+                trained_model_object=trained_model,
+                dtype=champion.dtype
+            )
+            return housing_model, training_state, x_train, y_train, x_test, y_test
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def warm_start_model(self, model, statistics: dict, x_new, y_new, seen_row_count: int):
+        """
+        Updates a fitted model with new rows.
+
+        Parameters:
+        - model (object): A copy of the fitted model of the best housing estimator.
+        - statistics (dict): The sufficient statistics updated with the new rows, empty if not tracked.
+        - x_new (np.array): The transformed input features of the new rows.
+        - y_new (np.array): The target feature of the new rows.
+        - seen_row_count (int): The number of rows the model was trained on.
+
+        Returns:
+        - object: The updated model, or None if the model cannot be warm started.
+        """
+        try:
+            params = model.get_params()
+
+            # Forests: grow trees fitted on the new rows in proportion to the new data
+            if 'warm_start' in params and hasattr(model, 'estimators_'):
+                added_estimators = max(1, math.ceil(params['n_estimators'] * len(x_new) / max(seen_row_count, 1)))
+                model.set_params(warm_start=True, n_estimators=params['n_estimators'] + added_estimators)
+                model.fit(x_new, y_new)
+                logging.info(f'added [{added_estimators}] estimators to [{type(model).__name__}]')
+                return model
+
+            # Online estimators
+            if hasattr(model, 'partial_fit'):
+                model.partial_fit(x_new, y_new)
+                return model
+
+            # Linear regression: solve the normal equations of the updated sufficient statistics
+            if isinstance(model, LinearRegression) and not params['positive'] and 'xtx' in statistics:
+                solution = np.linalg.lstsq(statistics['xtx'], statistics['xty'], rcond=None)[0]
+                if model.fit_intercept:
+                    model.coef_, model.intercept_ = solution[1:], solution[0]
+                else:
+                    model.coef_ = solution
+                return model
+
+            return None
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def update_sufficient_statistics(model, training_state: dict, X, y) -> dict:
+        """
+        Adds rows to the sufficient statistics of a linear regression.
+
+        Parameters:
+        - model (object): The fitted model.
+        - training_state (dict): The training state holding the current statistics, if any.
+        - X (np.array): The transformed input features of the rows to add.
+        - y (np.array): The target feature of the rows to add.
+
+        Returns:
+        - dict: The updated 'xtx' and 'xty' statistics, empty for models other than linear regression.
+        """
+        try:
+            if not isinstance(model, LinearRegression):
+                return {}
+
+            # Account for the intercept with a leading column of ones
+            X = np.asarray(X, dtype=np.float64)
+            design = np.c_[np.ones(len(X)), X] if model.fit_intercept else X
+            xtx = design.T @ design
+            xty = design.T @ np.asarray(y, dtype=np.float64)
+            if 'xtx' in training_state:
+                xtx = xtx + training_state['xtx']
+                xty = xty + training_state['xty']
+            return {'xtx': xtx, 'xty': xty}
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_champion_model_path(self) -> str:
+        """
+        Looks up the file path of the best model in the model registry.
+
+        Returns:
+        - str: The file path of the best model, or None if there is no best model yet.
+        """
+        try:
+            model_registry_file_path = self.model_trainer_config.model_registry_file_path
+            if not os.path.exists(model_registry_file_path):
+                return None
+            champion = ModelRegistry(registry_file_path=model_registry_file_path).get_champion()
+            return None if champion is None else champion.model_path
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def get_warm_start_model_path(champion_model_path: str) -> str:
+        """
+        Returns the file path of the model to warm start from the best model.
+
+        A compacted forest cannot grow trees, so a compacted best model is replaced by the
+        trained forest it was compacted from, whose training state is saved next to it.
+
+        Parameters:
+        - champion_model_path (str): The file path of the best model.
+
+        Returns:
+        - str: The file path of the trained model of the best model.
+        """
+        try:
+            source_file_path = os.path.join(os.path.dirname(champion_model_path), COMPACTED_MODEL_SOURCE_FILE_NAME)
+            if not os.path.exists(source_file_path):
+                return champion_model_path
+
+            trained_model_file_path = read_yaml(file_path=source_file_path)[SOURCE_MODEL_PATH_KEY]
+            if not os.path.exists(trained_model_file_path):
+                logging.warning('trained model: [%s] of the compacted best model was removed', trained_model_file_path)
+                return champion_model_path
+            logging.info('warm starting from the trained model: [%s] of the compacted best model', trained_model_file_path)
+            return trained_model_file_path
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def is_data_drift_found(self) -> bool:
+        """
+        Reads the dataset drift flag from the data validation report.
+
+        Returns:
+        - bool: True if the report flags dataset drift.
+        """
+        try:
+            report_file_path = self.data_validation_artifact.report_file_path
+            if not os.path.exists(report_file_path):
+                return False
+            with open(report_file_path) as report_file:
+                report = json.load(report_file)
+            metrics = report.get(DATA_DRIFT_KEY, {}).get(DATA_DRIFT_DATA_KEY, {}).get(DATA_DRIFT_METRICS_KEY, {})
+            return bool(metrics.get(DATASET_DRIFT_KEY, False))
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_input_and_target_feature(self, file_path: str) -> tuple:
+        """
+        Loads an ingested dataset and splits it into input and target features.
+
+        Parameters:
+        - file_path (str): The file path of the ingested dataset.
+
+        Returns:
+        - tuple: The input feature dataframe and the target feature series.
+        """
+        try:
+            schema_file_path = self.data_validation_artifact.schema_file_path
+            dataframe = load_data(file_path=file_path, schema_file_path=schema_file_path)
+            target_column_name = load_dataset_schema(schema_file_path).target_column
+            return dataframe.drop(columns=[target_column_name]), dataframe[target_column_name]
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def get_row_hashes(dataframe: pd.DataFrame) -> np.array:
+        """
+        Hashes every row of a dataframe from its values.
+
+        Parameters:
+        - dataframe (pd.DataFrame): The dataframe to hash.
+
+        Returns:
+        - np.array: One uint64 hash per row.
+        """
+        try:
+            return pd.util.hash_pandas_object(dataframe, index=False).to_numpy()
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def get_training_state_file_path(trained_model_file_path: str) -> str:
+        """
+        Returns the file path of the training state saved next to a trained model.
+        """
+        return os.path.join(os.path.dirname(trained_model_file_path), TRAINING_STATE_FILE_NAME)
+
+    def get_precision_parity_report(self, model, x_train, y_train, x_test, y_test) -> dict:
+        """
+        Compares a model trained in reduced precision against a float64 refit.
+
+        A clone of the model is fitted on the same rows upcast to float64, so the report
+        isolates the accuracy lost by training and predicting in the reduced precision.
+
+        Parameters:
+        - model (object): The model trained in reduced precision.
+        - x_train (np.array): The training input features.
+        - y_train (np.array): The training target feature.
+        - x_test (np.array): The testing input features.
+        - y_test (np.array): The testing target feature.
+
+        Returns:
+        - dict: The testing metrics of both models and the largest prediction difference.
+        """
+        try:
+            reference_model = clone(model)
+            reference_model.fit(x_train.astype(np.float64), y_train.astype(np.float64))
+
+            test_rmse, test_accuracy = self.evaluate_regression_model(model, x_test, y_test)
+            reference_test_rmse, reference_test_accuracy = self.evaluate_regression_model(
+                reference_model, x_test.astype(np.float64), y_test.astype(np.float64)
+            )
+            prediction_difference = np.abs(
+                model.predict(x_test).astype(np.float64) - reference_model.predict(x_test.astype(np.float64))
+            )
+
+            return {
+                'precision': x_train.dtype.name,
+                'test_rmse': test_rmse,
+                'test_accuracy': test_accuracy,
+                'float64_test_rmse': reference_test_rmse,
+                'float64_test_accuracy': reference_test_accuracy,
+                'test_accuracy_difference': test_accuracy - reference_test_accuracy,
+                'max_prediction_difference': float(prediction_difference.max()),
+                'mean_prediction_difference': float(prediction_difference.mean()),
+                'train_array_bytes': int(x_train.nbytes),
+                'float64_train_array_bytes': int(x_train.size * np.dtype(np.float64).itemsize)
+            }
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def evaluate_regression_model(model, X, y) -> tuple:
+        """
+        Computes the root mean squared error and the R2 score of a regression model.
+
+        Parameters:
+        - model (object): The fitted regression model.
+        - X (np.array): The input features.
+        - y (np.array): The target feature.
+
+        Returns:
+        - tuple: The root mean squared error and the R2 score.
+        """
+        try:
+            y_pred = model.predict(X)
+            rmse = float(np.sqrt(mean_squared_error(y, y_pred)))
+            accuracy = float(r2_score(y, y_pred))
+            return rmse, accuracy
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def __del__(self):
+        logging.info(f"{'>>' * 30} model trainer log completed {'<<' * 30} \n\n")
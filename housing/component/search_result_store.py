@@ -0,0 +1,220 @@
+# housing/component/search_result_store.py
+
+# Import required libraries and packages
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+
+from housing.logger import logging
+from housing.exception import CustomException
+from housing.util import read_yaml, write_yaml, save_object, load_object
+
+# File extensions of the two files that make up a store entry
+RESULT_FILE_EXTENSION = '.yaml'
+MODEL_FILE_EXTENSION = '.pkl'
+
+# Share of the disk budget an eviction pass shrinks the store to, so that a store at its
+# budget is not rescanned on every put
+EVICTION_LOW_WATER_RATIO = 0.9
+
+class SearchResultStore:
+    """
+    Persistent store of hyperparameter search results shared across training runs.
+
+    Every evaluated grid point is saved under a key built from the data fingerprint, the
+    estimator class, the estimator parameters and the cross validation spec. A retrain on
+    unchanged data only has to evaluate grid points that are not in the store yet. The
+    store is bounded by a disk budget and evicts the least recently used entries, the result
+    and the model of an entry together.
+
+    The size of the store is kept as a running total, the directory is only scanned once
+    when the store is opened and again when an eviction pass runs, which also picks up the
+    entries other processes wrote.
+
+    Args:
+        store_dir (str): The directory holding the store entries.
+        max_size_mb (float): The disk budget of the store in megabytes.
+        save_model (bool): Flag indicating whether fitted models are stored with their scores.
+
+    Raises:
+        CustomException: If an error occurs while initializing the store.
+    """
+    def __init__(self, store_dir: str, max_size_mb: float, save_model: bool=False) -> None:
+        try:
+            self.store_dir = store_dir
+            self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+            self.save_model = save_model
+            os.makedirs(self.store_dir, exist_ok=True)
+
+            # Last access time and size of every entry, by key
+            self.lock = threading.Lock()
+            self.entries = dict()
+            self.total_size = 0
+            self.__scan()
+        except Exception as e:
+            # Raise a custom exception if an error occurs during initialization
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def make_key(data_fingerprint: str, estimator_class: str, params: dict, cv_spec: dict) -> str:
+        """
+        Build the store key of a single grid point.
+
+        Args:
+            data_fingerprint (str): The fingerprint of the training data.
+            estimator_class (str): The fully qualified class name of the estimator.
+            params (dict): The complete parameters of the estimator.
+            cv_spec (dict): The cross validation splitter and scoring description.
+
+        Returns:
+            str: The hex encoded SHA-256 digest identifying the grid point.
+        """
+        try:
+            key_content = json.dumps(
+                {
+                    'data_fingerprint': data_fingerprint,
+                    'estimator_class': estimator_class,
+                    'params': params,
+                    'cv_spec': cv_spec
+                },
+                sort_keys=True,
+                default=repr
+            )
+            return hashlib.sha256(key_content.encode()).hexdigest()
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get(self, key: str) -> dict:
+        """
+        Look up the search result of a grid point.
+
+        Args:
+            key (str): The store key of the grid point.
+
+        Returns:
+            dict: The stored result, or None if the grid point has not been evaluated yet.
+        """
+        try:
+            result_file_path = self.__get_file_path(key, RESULT_FILE_EXTENSION)
+            if not os.path.exists(result_file_path):
+                return None
+
+            result = read_yaml(file_path=result_file_path)
+
+            # Refresh the access time so that the entry is evicted last
+            os.utime(result_file_path, None)
+            self.__touch(key)
+            return result
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_model(self, key: str):
+        """
+        Load the fitted model stored with a grid point.
+
+        Args:
+            key (str): The store key of the grid point.
+
+        Returns:
+            object: The fitted model, or None if no model is stored for the grid point.
+        """
+        try:
+            model_file_path = self.__get_file_path(key, MODEL_FILE_EXTENSION)
+            if not os.path.exists(model_file_path):
+                return None
+            os.utime(model_file_path, None)
+            self.__touch(key)
+            return load_object(file_path=model_file_path)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def put(self, key: str, result: dict, model=None) -> None:
+        """
+        Save the search result of a grid point and enforce the disk budget.
+
+        Args:
+            key (str): The store key of the grid point.
+            result (dict): The cross validation scores and fit times of the grid point.
+            model (object, optional): The fitted model, only saved if the store keeps models.
+        """
+        try:
+            if self.save_model and model is not None:
+                save_object(file_path=self.__get_file_path(key, MODEL_FILE_EXTENSION), obj=model)
+            write_yaml(file_path=self.__get_file_path(key, RESULT_FILE_EXTENSION), data=result)
+
+            # Update the running total with the new size of the entry
+            entry_size = self.__get_entry_size(key)
+            with self.lock:
+                _, previous_size = self.entries.get(key, (0.0, 0))
+                self.entries[key] = (time.time(), entry_size)
+                self.total_size += entry_size - previous_size
+                is_over_budget = self.total_size > self.max_size_bytes
+
+            if is_over_budget:
+                self.evict()
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries, each with both of its files, until the store
+        fits in its low water mark below the disk budget.
+        """
+        try:
+            with self.lock:
+                self.__scan()
+                if self.total_size <= self.max_size_bytes:
+                    return
+
+                # Oldest access first
+                low_water_size = self.max_size_bytes * EVICTION_LOW_WATER_RATIO
+                for key, (_, entry_size) in sorted(self.entries.items(), key=lambda item: item[1][0]):
+                    if self.total_size <= low_water_size:
+                        break
+                    # The result goes first, so an entry is never found without its model
+                    for extension in (RESULT_FILE_EXTENSION, MODEL_FILE_EXTENSION):
+                        try:
+                            os.remove(self.__get_file_path(key, extension))
+                        except FileNotFoundError:
+                            pass
+                    del self.entries[key]
+                    self.total_size -= entry_size
+                    logging.info('evicted search result store entry: [%s]', key)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def __scan(self) -> None:
+        # Group the files of the store directory by entry key
+        entries = dict()
+        for file_name in os.listdir(self.store_dir):
+            key, extension = os.path.splitext(file_name)
+            if extension not in (RESULT_FILE_EXTENSION, MODEL_FILE_EXTENSION):
+                continue
+            try:
+                file_stat = os.stat(os.path.join(self.store_dir, file_name))
+            except FileNotFoundError:
+                continue
+            last_access_time, entry_size = entries.get(key, (0.0, 0))
+            entries[key] = (max(last_access_time, file_stat.st_mtime), entry_size + file_stat.st_size)
+        self.entries = entries
+        self.total_size = sum(entry_size for _, entry_size in entries.values())
+
+    def __touch(self, key: str) -> None:
+        with self.lock:
+            if key in self.entries:
+                self.entries[key] = (time.time(), self.entries[key][1])
+
+    def __get_entry_size(self, key: str) -> int:
+        entry_size = 0
+        for extension in (RESULT_FILE_EXTENSION, MODEL_FILE_EXTENSION):
+            try:
+                entry_size += os.path.getsize(self.__get_file_path(key, extension))
+            except FileNotFoundError:
+                pass
+        return entry_size
+
+    def __get_file_path(self, key: str, extension: str) -> str:
+        return os.path.join(self.store_dir, f'{key}{extension}')
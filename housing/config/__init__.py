@@ -1,20 +1,28 @@
 # housing/config/__init__.py
+import re
 import sys
 
 from housing.constant import *
 from housing.exception import CustomException
 
-from housing.util import read_yaml
+from housing.util import read_yaml_cached, freeze_yaml, merge_yaml
 from housing.constant import *
 from housing.entity.config_entity import *
 
 class Configuration:
 
-    def __init__(self, config_file_path:str=CONFIG_FILE_PATH, current_timestamp:str=CURRENT_TIMESTAMP) -> None:
+    def __init__(self, config_file_path:str=CONFIG_FILE_PATH, current_timestamp:str=CURRENT_TIMESTAMP,
+                 root_dir:str=ROOT_DIR, config_overrides:dict=None) -> None:
         try:
-            self.config_info = read_yaml(file_path=config_file_path)
-            self.pipeline_config_training = self.training_pipeline_config()
+            self.config_file_path = config_file_path
+            self.config_info = read_yaml_cached(file_path=config_file_path)
+            # overrides apply to this configuration only, the cached file contents stay shared
+            if config_overrides:
+                self.config_info = freeze_yaml(merge_yaml(self.config_info, config_overrides))
             self.timestamp = current_timestamp
+            # runs write below the root directory, the schema and model configuration are read from the project
+            self.root_dir = root_dir
+            self.pipeline_config_training = self.training_pipeline_config()
         except Exception as e:
             raise CustomException(e, sys) from e
         
@@ -58,46 +66,344 @@ class Configuration:
                 data_ingestion_info[DATA_INGESTION_TEST_DIR_KEY]
             )
 
+            # the download cache is optional and shared by every run, so it is not timestamped
+            download_cache_dir = None
+            if data_ingestion_info.get(DATA_INGESTION_DOWNLOAD_CACHE_DIR_KEY):
+                download_cache_dir = os.path.join(
+                    self.root_dir,
+                    data_ingestion_info[DATA_INGESTION_DOWNLOAD_CACHE_DIR_KEY]
+                )
+
             return DataIngestionConfig(
                 dataset_download_url=dataset_download_url,
                 tgz_download_dir=tgz_download_dir,
                 raw_data_dir=raw_data_dir,
                 ingested_train_dir=ingested_train_dir,
-                ingested_test_dir=ingested_test_dir
+                ingested_test_dir=ingested_test_dir,
+                download_cache_dir=download_cache_dir,
+                download_cache_max_age_hours=float(data_ingestion_info.get(DATA_INGESTION_DOWNLOAD_CACHE_MAX_AGE_HOURS_KEY) or 0)
             )
         except Exception as e:
             raise CustomException(e, sys) from e
         
     def data_validation_config(self) -> DataValidationConfig:
         try:
-            pass
+            # artifact directory from training pipeline configuration
+            artifact_dir = self.pipeline_config_training.artifact_dir
+
+            data_validation_artifact_dir = os.path.join(
+                artifact_dir,
+                DATA_VALIDATION_ARTIFACT_DIR,
+                self.timestamp
+            )
+
+            data_validation_info = self.config_info[DATA_VALIDATION_CONFIG_KEY]
+
+            schema_file_path = os.path.join(
+                ROOT_DIR,
+                data_validation_info[DATA_VALIDATION_SCHEMA_DIR_KEY],
+                data_validation_info[DATA_VALIDATION_SCHEMA_FILE_NAME_KEY]
+            )
+
+            report_file_path = os.path.join(
+                data_validation_artifact_dir,
+                data_validation_info[DATA_VALIDATION_REPORT_FILE_NAME_KEY]
+            )
+
+            report_page_file_path = os.path.join(
+                data_validation_artifact_dir,
+                data_validation_info[DATA_VALIDATION_REPORT_PAGE_FILE_NAME_KEY]
+            )
+
+            return DataValidationConfig(
+                schema_file_path=schema_file_path,
+                report_file_path=report_file_path,
+                report_page_file_path=report_page_file_path
+            )
         except Exception as e:
             raise CustomException(e, sys) from e
         
     def data_transformation_config(self) -> DataTransformationConfig:
         try:
-            pass
+            # artifact directory from training pipeline configuration
+            artifact_dir = self.pipeline_config_training.artifact_dir
+
+            data_transformation_artifact_dir = os.path.join(
+                artifact_dir,
+                DATA_TRANSFORMATION_ARTIFACT_DIR,
+                self.timestamp
+            )
+
+            data_transformation_info = self.config_info[DATA_TRANSFORMATION_CONFIG_KEY]
+
+            transformed_dir = os.path.join(
+                data_transformation_artifact_dir,
+                data_transformation_info[DATA_TRANSFORMATION_DIR_NAME_KEY]
+            )
+
+            transformed_train_dir = os.path.join(
+                transformed_dir,
+                data_transformation_info[DATA_TRANSFORMATION_TRAIN_DIR_NAME_KEY]
+            )
+
+            transformed_test_dir = os.path.join(
+                transformed_dir,
+                data_transformation_info[DATA_TRANSFORMATION_TEST_DIR_NAME_KEY]
+            )
+
+            preprocessed_object_file_path = os.path.join(
+                data_transformation_artifact_dir,
+                data_transformation_info[DATA_TRANSFORMATION_PREPROCESSING_DIR_KEY],
+                data_transformation_info[DATA_TRANSFORMATION_PREPROCESSED_FILE_NAME_KEY]
+            )
+
+            return DataTransformationConfig(
+                add_bedroom_per_room=data_transformation_info[DATA_TRANSFORMATION_ADD_BEDROOM_PER_ROOM_KEY],
+                transformed_train_dir=transformed_train_dir,
+                transformed_test_dir=transformed_test_dir,
+                preprocessed_object_file_path=preprocessed_object_file_path,
+                precision=self.pipeline_config_training.precision
+            )
         except Exception as e:
             raise CustomException(e, sys) from e
         
     def model_trainer_config(self) -> ModelTrainerConfig:
         try:
-            pass
+            # artifact directory from training pipeline configuration
+            artifact_dir = self.pipeline_config_training.artifact_dir
+
+            model_trainer_artifact_dir = os.path.join(
+                artifact_dir,
+                MODEL_TRAINER_ARTIFACT_DIR,
+                self.timestamp
+            )
+
+            model_trainer_info = self.config_info[MODEL_TRAINER_CONFIG_KEY]
+
+            trained_model_file_path = os.path.join(
+                model_trainer_artifact_dir,
+                model_trainer_info[MODEL_TRAINER_TRAINED_MODEL_DIR_KEY],
+                model_trainer_info[MODEL_TRAINER_TRAINED_MODEL_FILE_NAME_KEY]
+            )
+
+            model_config_file_path = os.path.join(
+                ROOT_DIR,
+                model_trainer_info[MODEL_TRAINER_MODEL_CONFIG_DIR_KEY],
+                model_trainer_info[MODEL_TRAINER_MODEL_CONFIG_FILE_NAME_KEY]
+            )
+
+            # the search result store is shared by every run, so it is not timestamped
+            search_result_store_dir = os.path.join(
+                artifact_dir,
+                MODEL_TRAINER_ARTIFACT_DIR,
+                model_trainer_info[MODEL_TRAINER_SEARCH_RESULT_STORE_DIR_KEY]
+            )
+
+            cv_fold_dir = os.path.join(
+                model_trainer_artifact_dir,
+                model_trainer_info[MODEL_TRAINER_CV_FOLD_DIR_KEY]
+            )
+
+            return ModelTrainerConfig(
+                trained_model_file_path=trained_model_file_path,
+                base_accuracy=model_trainer_info[MODEL_TRAINER_BASE_ACCURACY_KEY],
+                model_config_file_path=model_config_file_path,
+                search_result_store_dir=search_result_store_dir,
+                search_result_store_max_size_mb=model_trainer_info[MODEL_TRAINER_SEARCH_RESULT_STORE_MAX_SIZE_MB_KEY],
+                search_result_store_save_model=model_trainer_info[MODEL_TRAINER_SEARCH_RESULT_STORE_SAVE_MODEL_KEY],
+                cv_fold_dir=cv_fold_dir,
+                training_mode=model_trainer_info[MODEL_TRAINER_TRAINING_MODE_KEY],
+                incremental_max_new_row_ratio=model_trainer_info[MODEL_TRAINER_INCREMENTAL_MAX_NEW_ROW_RATIO_KEY],
+                model_registry_file_path=self.model_evaluation_config().model_registry_file_path
+            )
         except Exception as e:
             raise CustomException(e, sys) from e
         
+    def model_compaction_config(self) -> ModelCompactionConfig:
+        try:
+            # artifact directory from training pipeline configuration
+            artifact_dir = self.pipeline_config_training.artifact_dir
+
+            model_compaction_artifact_dir = os.path.join(
+                artifact_dir,
+                MODEL_COMPACTION_ARTIFACT_DIR,
+                self.timestamp
+            )
+
+            model_compaction_info = self.config_info[MODEL_COMPACTION_CONFIG_KEY]
+
+            compacted_model_file_path = os.path.join(
+                model_compaction_artifact_dir,
+                model_compaction_info[MODEL_COMPACTION_COMPACTED_MODEL_DIR_KEY],
+                model_compaction_info[MODEL_COMPACTION_MODEL_FILE_NAME_KEY]
+            )
+
+            compaction_report_file_path = os.path.join(
+                model_compaction_artifact_dir,
+                model_compaction_info[MODEL_COMPACTION_REPORT_FILE_NAME_KEY]
+            )
+
+            leaf_quantization_bits = int(model_compaction_info[MODEL_COMPACTION_LEAF_QUANTIZATION_BITS_KEY] or 0)
+            if leaf_quantization_bits not in (0, 8, 16):
+                raise Exception(f'leaf quantization bits: [{leaf_quantization_bits}] must be 0, 8 or 16')
+
+            return ModelCompactionConfig(
+                compacted_model_file_path=compacted_model_file_path,
+                compaction_report_file_path=compaction_report_file_path,
+                leaf_quantization_bits=leaf_quantization_bits,
+                max_accuracy_loss=float(model_compaction_info[MODEL_COMPACTION_MAX_ACCURACY_LOSS_KEY]),
+                prune=bool(model_compaction_info[MODEL_COMPACTION_PRUNE_KEY])
+            )
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
     def model_evaluation_config(self) -> ModelEvaluationConfig:
         try:
-            pass
+            # artifact directory from training pipeline configuration
+            artifact_dir = self.pipeline_config_training.artifact_dir
+
+            model_evaluation_info = self.config_info[MODEL_EVALUATION_CONFIG_KEY]
+
+            # the evaluation file tracks the best model of every run, so it is not timestamped
+            model_evaluation_file_path = os.path.join(
+                artifact_dir,
+                MODEL_EVALUATION_ARTIFACT_DIR,
+                model_evaluation_info[MODEL_EVALUATION_FILE_NAME_KEY]
+            )
+
+            model_registry_file_path = os.path.join(
+                artifact_dir,
+                MODEL_EVALUATION_ARTIFACT_DIR,
+                model_evaluation_info[MODEL_EVALUATION_MODEL_REGISTRY_FILE_NAME_KEY]
+            )
+
+            prediction_cache_dir = os.path.join(
+                artifact_dir,
+                MODEL_EVALUATION_ARTIFACT_DIR,
+                model_evaluation_info[MODEL_EVALUATION_PREDICTION_CACHE_DIR_KEY]
+            )
+
+            evaluation_report_file_path = os.path.join(
+                artifact_dir,
+                MODEL_EVALUATION_ARTIFACT_DIR,
+                self.timestamp,
+                model_evaluation_info[MODEL_EVALUATION_REPORT_FILE_NAME_KEY]
+            )
+
+            return ModelEvaluationConfig(
+                model_evaluation_file_path=model_evaluation_file_path,
+                time_stamp=self.timestamp,
+                model_registry_file_path=model_registry_file_path,
+                prediction_cache_dir=prediction_cache_dir,
+                batch_size=model_evaluation_info[MODEL_EVALUATION_BATCH_SIZE_KEY],
+                evaluation_report_file_path=evaluation_report_file_path,
+                bootstrap_samples=model_evaluation_info[MODEL_EVALUATION_BOOTSTRAP_SAMPLES_KEY],
+                confidence_level=model_evaluation_info[MODEL_EVALUATION_CONFIDENCE_LEVEL_KEY],
+                bootstrap_random_state=model_evaluation_info[MODEL_EVALUATION_BOOTSTRAP_RANDOM_STATE_KEY]
+            )
         except Exception as e:
             raise CustomException(e, sys) from e
         
     def model_pusher_config(self) -> ModelPusherConfig:
         try:
-            pass
+            model_pusher_info = self.config_info[MODEL_PUSHER_CONFIG_KEY]
+
+            # every pushed model gets its own version directory below the export directory
+            export_dir_path = os.path.join(
+                self.root_dir,
+                model_pusher_info[MODEL_PUSHER_MODEL_EXPORT_DIR_KEY]
+            )
+
+            return ModelPusherConfig(
+                export_dir_path=export_dir_path,
+                model_version=self.timestamp,
+                warmup_sample_size=model_pusher_info[MODEL_PUSHER_WARMUP_SAMPLE_SIZE_KEY],
+                inference_bundle_tolerance=float(model_pusher_info[MODEL_PUSHER_INFERENCE_BUNDLE_TOLERANCE_KEY])
+            )
         except Exception as e:
             raise CustomException(e, sys) from e
         
+    def serving_config(self) -> ServingConfig:
+        try:
+            serving_info = self.config_info[SERVING_CONFIG_KEY]
+            data_validation_info = self.config_info[DATA_VALIDATION_CONFIG_KEY]
+
+            # inputs are validated against the same schema as the training data
+            schema_file_path = os.path.join(
+                ROOT_DIR,
+                data_validation_info[DATA_VALIDATION_SCHEMA_DIR_KEY],
+                data_validation_info[DATA_VALIDATION_SCHEMA_FILE_NAME_KEY]
+            )
+
+            # the shared prediction cache is optional
+            shared_prediction_cache_file_path = None
+            if serving_info.get(SERVING_SHARED_PREDICTION_CACHE_FILE_KEY):
+                shared_prediction_cache_file_path = os.path.join(
+                    self.root_dir,
+                    serving_info[SERVING_SHARED_PREDICTION_CACHE_FILE_KEY]
+                )
+
+            # the service loads the versions published by the model pusher
+            return ServingConfig(
+                export_dir_path=self.model_pusher_config().export_dir_path,
+                model_poll_interval=float(serving_info[SERVING_MODEL_POLL_INTERVAL_KEY]),
+                max_batch_size=int(serving_info[SERVING_MAX_BATCH_SIZE_KEY]),
+                max_wait_us=int(serving_info[SERVING_MAX_WAIT_US_KEY]),
+                schema_file_path=schema_file_path,
+                bulk_chunk_size=int(serving_info[SERVING_BULK_CHUNK_SIZE_KEY]),
+                bulk_workers=int(serving_info[SERVING_BULK_WORKERS_KEY]),
+                prediction_cache_size=int(serving_info[SERVING_PREDICTION_CACHE_SIZE_KEY]),
+                prediction_cache_ttl_seconds=float(serving_info[SERVING_PREDICTION_CACHE_TTL_SECONDS_KEY]),
+                shared_prediction_cache_file_path=shared_prediction_cache_file_path,
+                shared_prediction_cache_max_entries=int(serving_info.get(SERVING_SHARED_PREDICTION_CACHE_MAX_ENTRIES_KEY) or 1000000),
+                inference_workers=int(serving_info[SERVING_INFERENCE_WORKERS_KEY]),
+                max_queue_depth=int(serving_info[SERVING_MAX_QUEUE_DEPTH_KEY]),
+                request_deadline_ms=int(serving_info[SERVING_REQUEST_DEADLINE_MS_KEY]),
+                max_request_bytes=int(serving_info[SERVING_MAX_REQUEST_BYTES_KEY]),
+                metrics_enabled=bool(serving_info.get(SERVING_METRICS_ENABLED_KEY, False)),
+                use_flat_forest=bool(serving_info.get(SERVING_FLAT_FOREST_KEY, False)),
+                log_levels=dict(serving_info.get(SERVING_LOG_LEVELS_KEY) or dict())
+            )
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def artifact_retention_config(self) -> ArtifactRetentionConfig:
+        try:
+            # artifact directory from training pipeline configuration
+            artifact_dir = self.pipeline_config_training.artifact_dir
+
+            artifact_retention_info = self.config_info[ARTIFACT_RETENTION_CONFIG_KEY]
+
+            # the file index is shared by every run, so it is not timestamped
+            file_index_file_path = os.path.join(
+                artifact_dir,
+                ARTIFACT_RETENTION_ARTIFACT_DIR,
+                artifact_retention_info[ARTIFACT_RETENTION_FILE_INDEX_FILE_NAME_KEY]
+            )
+
+            # every policy is optional
+            keep_last_runs = artifact_retention_info.get(ARTIFACT_RETENTION_KEEP_LAST_RUNS_KEY)
+            max_age_days = artifact_retention_info.get(ARTIFACT_RETENTION_MAX_AGE_DAYS_KEY)
+            max_size_gb = artifact_retention_info.get(ARTIFACT_RETENTION_MAX_SIZE_GB_KEY)
+            if keep_last_runs is not None and int(keep_last_runs) < 1:
+                raise Exception(f'keep last runs: [{keep_last_runs}] must keep at least one run')
+
+            return ArtifactRetentionConfig(
+                artifact_dir=artifact_dir,
+                model_registry_file_path=self.model_evaluation_config().model_registry_file_path,
+                file_index_file_path=file_index_file_path,
+                stage_cache_file_path=self.pipeline_config_training.stage_cache_file_path,
+                keep_last_runs=None if keep_last_runs is None else int(keep_last_runs),
+                max_age_days=None if max_age_days is None else float(max_age_days),
+                max_size_gb=None if max_size_gb is None else float(max_size_gb),
+                min_age_hours=float(artifact_retention_info.get(ARTIFACT_RETENTION_MIN_AGE_HOURS_KEY) or 0),
+                deduplicate=bool(artifact_retention_info.get(ARTIFACT_RETENTION_DEDUPLICATE_KEY, False)),
+                deduplicate_max_mb_per_pass=float(artifact_retention_info[ARTIFACT_RETENTION_DEDUPLICATE_MAX_MB_PER_PASS_KEY]),
+                interval_seconds=float(artifact_retention_info[ARTIFACT_RETENTION_INTERVAL_SECONDS_KEY])
+            )
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
     def training_pipeline_config(self) -> TrainingPipelineConfig:
         try:
             # get training pipeline configuration
@@ -105,14 +411,106 @@ class Configuration:
             
             # create artifact directory
             artifact_dir = os.path.join(
-                ROOT_DIR,
+                self.root_dir,
                 training_pipeline_config[TRAINING_PIPELINE_NAME_KEY],
                 training_pipeline_config[TRAINING_PIPELINE_ARTIFACT_DIR_KEY]
             )
 
+            # the stage cache is shared by every run, so it is not timestamped
+            stage_cache_file_path = os.path.join(
+                artifact_dir,
+                PIPELINE_ARTIFACT_DIR,
+                training_pipeline_config.get(TRAINING_PIPELINE_STAGE_CACHE_FILE_NAME_KEY, 'stage_cache.db')
+            )
+
+            # every run records the stages it completed, so it can be resumed
+            checkpoint_manifest_file_path = os.path.join(
+                artifact_dir,
+                PIPELINE_ARTIFACT_DIR,
+                self.timestamp,
+                training_pipeline_config.get(TRAINING_PIPELINE_CHECKPOINT_MANIFEST_FILE_NAME_KEY, 'checkpoint_manifest.yaml')
+            )
+
             # return training pipeline configuration
             return TrainingPipelineConfig(
-                artifact_dir=artifact_dir
+                artifact_dir=artifact_dir,
+                precision=training_pipeline_config.get(TRAINING_PIPELINE_PRECISION_KEY, 'float64'),
+                max_workers=max(1, int(training_pipeline_config.get(TRAINING_PIPELINE_MAX_WORKERS_KEY) or 1)),
+                skip_unchanged_stages=bool(training_pipeline_config.get(TRAINING_PIPELINE_SKIP_UNCHANGED_STAGES_KEY, False)),
+                stage_cache_file_path=stage_cache_file_path,
+                checkpoint_manifest_file_path=checkpoint_manifest_file_path
             )
         except Exception as e:
-            raise CustomException(e, sys) from e
\ No newline at end of file
+            raise CustomException(e, sys) from e
+    def multi_region_config(self, markets_file_path: str=MARKETS_CONFIG_FILE_PATH) -> MultiRegionConfig:
+        try:
+            markets_info = read_yaml_cached(file_path=markets_file_path)
+            multi_region_info = markets_info[MULTI_REGION_CONFIG_KEY]
+
+            # every market writes below its own root directory
+            markets_dir = os.path.join(
+                self.root_dir,
+                multi_region_info[MULTI_REGION_MARKETS_DIR_KEY]
+            )
+
+            # the budget defaults to the whole machine
+            max_cpus = int(multi_region_info.get(MULTI_REGION_MAX_CPUS_KEY) or os.cpu_count() or 1)
+            max_memory_gb = multi_region_info.get(MULTI_REGION_MAX_MEMORY_GB_KEY)
+            if not max_memory_gb:
+                if not hasattr(os, 'sysconf'):
+                    raise Exception(f'max memory gb: the physical memory is unknown on this platform, set it in [{markets_file_path}]')
+                max_memory_gb = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / 1024 ** 3
+            max_memory_gb = float(max_memory_gb)
+            max_processes = int(multi_region_info.get(MULTI_REGION_MAX_PROCESSES_KEY) or max_cpus)
+
+            # the markets share one download cache, so a dataset several markets use is downloaded once
+            shared_overrides = dict()
+            if multi_region_info.get(MULTI_REGION_DOWNLOAD_CACHE_DIR_KEY):
+                shared_overrides[DATA_INGESTION_CONFIG_KEY] = {
+                    DATA_INGESTION_DOWNLOAD_CACHE_DIR_KEY: os.path.join(
+                        markets_dir,
+                        multi_region_info[MULTI_REGION_DOWNLOAD_CACHE_DIR_KEY]
+                    ),
+                    DATA_INGESTION_DOWNLOAD_CACHE_MAX_AGE_HOURS_KEY: float(
+                        multi_region_info.get(MULTI_REGION_DOWNLOAD_CACHE_MAX_AGE_HOURS_KEY) or 0
+                    )
+                }
+
+            markets = []
+            for name, market_info in (markets_info.get(MARKETS_KEY) or dict()).items():
+                name = str(name)
+                market_info = market_info or dict()
+                if re.fullmatch(r'[A-Za-z0-9_.-]+', name) is None or name in ('.', '..'):
+                    raise Exception(f'market: [{name}] is not a valid directory name')
+
+                # a market reserves its share of the budget for the whole run
+                cpus = int(market_info.get(MARKET_CPUS_KEY) or multi_region_info[MULTI_REGION_DEFAULT_CPUS_KEY])
+                memory_gb = float(market_info.get(MARKET_MEMORY_GB_KEY) or multi_region_info[MULTI_REGION_DEFAULT_MEMORY_GB_KEY])
+                if cpus > max_cpus or memory_gb > max_memory_gb:
+                    raise Exception(
+                        f'market: [{name}] reserves [{cpus}] cpus and [{memory_gb}] gb, '
+                        f'more than the budget of [{max_cpus}] cpus and [{max_memory_gb:.1f}] gb'
+                    )
+
+                config_file_path = self.config_file_path
+                if market_info.get(MARKET_CONFIG_FILE_KEY):
+                    config_file_path = os.path.join(ROOT_DIR, market_info[MARKET_CONFIG_FILE_KEY])
+
+                markets.append(MarketConfig(
+                    name=name,
+                    config_file_path=config_file_path,
+                    root_dir=os.path.join(markets_dir, name),
+                    cpus=cpus,
+                    memory_gb=memory_gb,
+                    config_overrides=merge_yaml(shared_overrides, market_info.get(MARKET_CONFIG_OVERRIDES_KEY) or dict())
+                ))
+
+            return MultiRegionConfig(
+                markets_dir=markets_dir,
+                max_cpus=max_cpus,
+                max_memory_gb=max_memory_gb,
+                max_processes=max(1, max_processes),
+                markets=markets
+            )
+        except Exception as e:
+            raise CustomException(e, sys) from e
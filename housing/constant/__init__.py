@@ -27,6 +27,12 @@ CURRENT_TIMESTAMP = f"{datetime.now().strftime('%Y-%m-%d-%H-%M-%S')}"
 TRAINING_PIPELINE_CONFIG_KEY = 'training_pipeline_config'
 TRAINING_PIPELINE_ARTIFACT_DIR_KEY = 'artifact_dir'
 TRAINING_PIPELINE_NAME_KEY = 'pipeline_name'
+TRAINING_PIPELINE_PRECISION_KEY = 'precision'
+TRAINING_PIPELINE_MAX_WORKERS_KEY = 'max_workers'
+TRAINING_PIPELINE_SKIP_UNCHANGED_STAGES_KEY = 'skip_unchanged_stages'
+TRAINING_PIPELINE_STAGE_CACHE_FILE_NAME_KEY = 'stage_cache_file_name'
+TRAINING_PIPELINE_CHECKPOINT_MANIFEST_FILE_NAME_KEY = 'checkpoint_manifest_file_name'
+PIPELINE_ARTIFACT_DIR = 'pipeline'
 
 # Data Ingestion 
 DATA_INGESTION_CONFIG_KEY = 'data_ingestion_config'
@@ -37,6 +43,17 @@ DATA_INGESTION_TGZ_DOWNLOAD_DIR_KEY = 'tgz_download_dir'
 DATA_INGESTION_INGESTED_DIR_NAME_KEY = 'ingested_dir'
 DATA_INGESTION_TRAIN_DIR_KEY = 'ingested_train_dir'
 DATA_INGESTION_TEST_DIR_KEY = 'ingested_test_dir'
+DATA_INGESTION_DOWNLOAD_CACHE_DIR_KEY = 'download_cache_dir'
+DATA_INGESTION_DOWNLOAD_CACHE_MAX_AGE_HOURS_KEY = 'download_cache_max_age_hours'
+
+# Data Validation
+DATA_VALIDATION_CONFIG_KEY = 'data_validation_config'
+DATA_VALIDATION_ARTIFACT_DIR = 'data_validation'
+DATA_VALIDATION_SCHEMA_DIR_KEY = 'schema_dir'
+DATA_VALIDATION_SCHEMA_FILE_NAME_KEY = 'schema_file_name'
+DATA_VALIDATION_REPORT_FILE_NAME_KEY = 'report_file_name'
+DATA_VALIDATION_REPORT_PAGE_FILE_NAME_KEY = 'report_page_file_name'
+DOMAIN_VALUE_KEY = 'domain_value'
 
 # Feature Generator
 COLUMN_TOTAL_ROOMS = 'total_rooms'
@@ -45,9 +62,137 @@ COLUMN_HOUSEHOLDS = 'households'
 COLUMN_TOTAL_BEDROOM = 'total_bedrooms'
 
 # Data Transformation
+DATA_TRANSFORMATION_ARTIFACT_DIR = 'data_transformation'
+DATA_TRANSFORMATION_CONFIG_KEY = 'data_transformation_config'
+DATA_TRANSFORMATION_ADD_BEDROOM_PER_ROOM_KEY = 'add_bedroom_per_room'
+DATA_TRANSFORMATION_DIR_NAME_KEY = 'transformed_dir'
+DATA_TRANSFORMATION_TRAIN_DIR_NAME_KEY = 'transformed_train_dir'
+DATA_TRANSFORMATION_TEST_DIR_NAME_KEY = 'transformed_test_dir'
+DATA_TRANSFORMATION_PREPROCESSING_DIR_KEY = 'preprocessing_dir'
+DATA_TRANSFORMATION_PREPROCESSED_FILE_NAME_KEY = 'preprocessed_object_file_name'
 NUMERICAL_COLUMN_KEY = 'numerical_columns'
 CATEGORICAL_COLUMN_KEY = 'categorical_columns'
 TARGET_COLUMN_KEY = 'target_column'
 
+# Model Trainer
+MODEL_TRAINER_ARTIFACT_DIR = 'model_trainer'
+MODEL_TRAINER_CONFIG_KEY = 'model_trainer_config'
+MODEL_TRAINER_TRAINED_MODEL_DIR_KEY = 'trained_model_dir'
+MODEL_TRAINER_TRAINED_MODEL_FILE_NAME_KEY = 'model_file_name'
+MODEL_TRAINER_BASE_ACCURACY_KEY = 'base_accuracy'
+MODEL_TRAINER_MODEL_CONFIG_DIR_KEY = 'model_config_dir'
+MODEL_TRAINER_MODEL_CONFIG_FILE_NAME_KEY = 'model_config_file_name'
+MODEL_TRAINER_SEARCH_RESULT_STORE_DIR_KEY = 'search_result_store_dir'
+MODEL_TRAINER_SEARCH_RESULT_STORE_MAX_SIZE_MB_KEY = 'search_result_store_max_size_mb'
+MODEL_TRAINER_SEARCH_RESULT_STORE_SAVE_MODEL_KEY = 'search_result_store_save_model'
+MODEL_TRAINER_CV_FOLD_DIR_KEY = 'cv_fold_dir'
+MODEL_TRAINER_TRAINING_MODE_KEY = 'training_mode'
+MODEL_TRAINER_INCREMENTAL_MAX_NEW_ROW_RATIO_KEY = 'incremental_max_new_row_ratio'
+TRAINING_MODE_FULL = 'full'
+TRAINING_MODE_INCREMENTAL = 'incremental'
+TRAINING_STATE_FILE_NAME = 'training_state.npz'
+PRECISION_PARITY_REPORT_FILE_NAME = 'precision_parity_report.yaml'
+
+# Model Compaction
+MODEL_COMPACTION_ARTIFACT_DIR = 'model_compaction'
+MODEL_COMPACTION_CONFIG_KEY = 'model_compaction_config'
+MODEL_COMPACTION_COMPACTED_MODEL_DIR_KEY = 'compacted_model_dir'
+MODEL_COMPACTION_MODEL_FILE_NAME_KEY = 'model_file_name'
+MODEL_COMPACTION_REPORT_FILE_NAME_KEY = 'report_file_name'
+MODEL_COMPACTION_LEAF_QUANTIZATION_BITS_KEY = 'leaf_quantization_bits'
+MODEL_COMPACTION_MAX_ACCURACY_LOSS_KEY = 'max_accuracy_loss'
+MODEL_COMPACTION_PRUNE_KEY = 'prune'
+COMPACTED_MODEL_SOURCE_FILE_NAME = 'source_model.yaml'
+SOURCE_MODEL_PATH_KEY = 'path'
+
+# Model Evaluation
+MODEL_EVALUATION_ARTIFACT_DIR = 'model_evaluation'
+MODEL_EVALUATION_CONFIG_KEY = 'model_evaluation_config'
+MODEL_EVALUATION_FILE_NAME_KEY = 'model_evaluation_file_name'
+MODEL_EVALUATION_MODEL_REGISTRY_FILE_NAME_KEY = 'model_registry_file_name'
+MODEL_EVALUATION_PREDICTION_CACHE_DIR_KEY = 'prediction_cache_dir'
+MODEL_EVALUATION_BATCH_SIZE_KEY = 'batch_size'
+MODEL_EVALUATION_REPORT_FILE_NAME_KEY = 'evaluation_report_file_name'
+MODEL_EVALUATION_BOOTSTRAP_SAMPLES_KEY = 'bootstrap_samples'
+MODEL_EVALUATION_CONFIDENCE_LEVEL_KEY = 'confidence_level'
+MODEL_EVALUATION_BOOTSTRAP_RANDOM_STATE_KEY = 'bootstrap_random_state'
+BEST_MODEL_KEY = 'best_model'
+HISTORY_KEY = 'history'
+MODEL_PATH_KEY = 'model_path'
+
+# Model Pusher
+MODEL_PUSHER_CONFIG_KEY = 'model_pusher_config'
+MODEL_PUSHER_MODEL_EXPORT_DIR_KEY = 'model_export_dir'
+MODEL_PUSHER_WARMUP_SAMPLE_SIZE_KEY = 'warmup_sample_size'
+MODEL_PUSHER_INFERENCE_BUNDLE_TOLERANCE_KEY = 'inference_bundle_tolerance'
+CURRENT_MODEL_POINTER_FILE_NAME = 'current'
+EXPORTED_MODEL_FILE_NAME = 'model.pkl'
+WARMUP_SAMPLE_FILE_NAME = 'warmup_sample.csv'
+INFERENCE_BUNDLE_FILE_NAME = 'inference_bundle.npz'
+
+# Artifact Retention
+ARTIFACT_RETENTION_ARTIFACT_DIR = 'artifact_retention'
+ARTIFACT_RETENTION_CONFIG_KEY = 'artifact_retention_config'
+ARTIFACT_RETENTION_FILE_INDEX_FILE_NAME_KEY = 'file_index_file_name'
+ARTIFACT_RETENTION_KEEP_LAST_RUNS_KEY = 'keep_last_runs'
+ARTIFACT_RETENTION_MAX_AGE_DAYS_KEY = 'max_age_days'
+ARTIFACT_RETENTION_MAX_SIZE_GB_KEY = 'max_size_gb'
+ARTIFACT_RETENTION_MIN_AGE_HOURS_KEY = 'min_age_hours'
+ARTIFACT_RETENTION_DEDUPLICATE_KEY = 'deduplicate'
+ARTIFACT_RETENTION_DEDUPLICATE_MAX_MB_PER_PASS_KEY = 'deduplicate_max_mb_per_pass'
+ARTIFACT_RETENTION_INTERVAL_SECONDS_KEY = 'interval_seconds'
+RUN_TIMESTAMP_FORMAT = '%Y-%m-%d-%H-%M-%S'
+
+# Multi-Region Runner
+MARKETS_FILE_NAME = 'markets.yaml'
+MARKETS_CONFIG_FILE_PATH = os.path.join(ROOT_DIR, CONFIG_DIR, MARKETS_FILE_NAME)
+MULTI_REGION_CONFIG_KEY = 'multi_region_config'
+MULTI_REGION_MARKETS_DIR_KEY = 'markets_dir'
+MULTI_REGION_MAX_CPUS_KEY = 'max_cpus'
+MULTI_REGION_MAX_MEMORY_GB_KEY = 'max_memory_gb'
+MULTI_REGION_MAX_PROCESSES_KEY = 'max_processes'
+MULTI_REGION_DOWNLOAD_CACHE_DIR_KEY = 'download_cache_dir'
+MULTI_REGION_DOWNLOAD_CACHE_MAX_AGE_HOURS_KEY = 'download_cache_max_age_hours'
+MULTI_REGION_DEFAULT_CPUS_KEY = 'default_cpus'
+MULTI_REGION_DEFAULT_MEMORY_GB_KEY = 'default_memory_gb'
+MARKETS_KEY = 'markets'
+MARKET_CONFIG_FILE_KEY = 'config_file'
+MARKET_CPUS_KEY = 'cpus'
+MARKET_MEMORY_GB_KEY = 'memory_gb'
+MARKET_CONFIG_OVERRIDES_KEY = 'config_overrides'
+
+# Serving
+SERVING_CONFIG_KEY = 'serving_config'
+SERVING_MODEL_POLL_INTERVAL_KEY = 'model_poll_interval'
+SERVING_MAX_BATCH_SIZE_KEY = 'max_batch_size'
+SERVING_MAX_WAIT_US_KEY = 'max_wait_us'
+SERVING_BULK_CHUNK_SIZE_KEY = 'bulk_chunk_size'
+SERVING_BULK_WORKERS_KEY = 'bulk_workers'
+SERVING_PREDICTION_CACHE_SIZE_KEY = 'prediction_cache_size'
+SERVING_PREDICTION_CACHE_TTL_SECONDS_KEY = 'prediction_cache_ttl_seconds'
+SERVING_SHARED_PREDICTION_CACHE_FILE_KEY = 'shared_prediction_cache_file'
+SERVING_SHARED_PREDICTION_CACHE_MAX_ENTRIES_KEY = 'shared_prediction_cache_max_entries'
+SERVING_INFERENCE_WORKERS_KEY = 'inference_workers'
+SERVING_MAX_QUEUE_DEPTH_KEY = 'max_queue_depth'
+SERVING_REQUEST_DEADLINE_MS_KEY = 'request_deadline_ms'
+SERVING_MAX_REQUEST_BYTES_KEY = 'max_request_bytes'
+SERVING_METRICS_ENABLED_KEY = 'metrics_enabled'
+SERVING_FLAT_FOREST_KEY = 'flat_forest'
+SERVING_LOG_LEVELS_KEY = 'log_levels'
+
+# Data Validation Report
+DATA_DRIFT_KEY = 'data_drift'
+DATA_DRIFT_DATA_KEY = 'data'
+DATA_DRIFT_METRICS_KEY = 'metrics'
+DATASET_DRIFT_KEY = 'dataset_drift'
+
+# Model Factory
+GRID_SEARCH_KEY = 'grid_search'
+MODULE_KEY = 'module'
+CLASS_KEY = 'class'
+PARAM_KEY = 'params'
+MODEL_SELECTION_KEY = 'model_selection'
+SEARCH_PARAM_GRID_KEY = 'search_param_grid'
+
 # Util
 DATASET_SCHEMA_COLUMNS_KEY=  'columns'
\ No newline at end of file
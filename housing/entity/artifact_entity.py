@@ -69,6 +69,7 @@ DataTransformationArtifact = namedtuple(
 #     train_accuracy (float): The accuracy score for the training data.
 #     test_accuracy (float): The accuracy score for the testing data.
 #     model_accuracy (float): The overall accuracy score for the model.
+#     precision_parity_report_file_path (str): The file path of the accuracy comparison against float64, None for float64 runs.
 ModelTrainerArtifact = namedtuple(
     'ModelTrainerArtifact',
     [
@@ -79,7 +80,37 @@ ModelTrainerArtifact = namedtuple(
         'test_rmse',
         'train_accuracy',
         'test_accuracy',
-        'model_accuracy'
+        'model_accuracy',
+        'precision_parity_report_file_path'
+    ]
+)
+
+# A named tuple that represents the model compaction artifact.
+#
+# Attributes:
+#     is_compacted (bool): Flag indicating whether the model is compacted.
+#     message (str): Additional message related to the model compaction.
+#     compacted_model_file_path (str): The file path of the compacted model, the trained model if it is not compacted.
+#     compaction_report_file_path (str): The file path of the compaction report, None if the model is not compacted.
+#     original_size (int): The size in bytes of the trained model file.
+#     compacted_size (int): The size in bytes of the compacted model file.
+#     original_test_rmse (float): The root mean squared error of the trained model on the testing data.
+#     compacted_test_rmse (float): The root mean squared error of the compacted model on the testing data.
+#     original_test_accuracy (float): The accuracy score of the trained model on the testing data.
+#     compacted_test_accuracy (float): The accuracy score of the compacted model on the testing data.
+ModelCompactionArtifact = namedtuple(
+    'ModelCompactionArtifact',
+    [
+        'is_compacted',
+        'message',
+        'compacted_model_file_path',
+        'compaction_report_file_path',
+        'original_size',
+        'compacted_size',
+        'original_test_rmse',
+        'compacted_test_rmse',
+        'original_test_accuracy',
+        'compacted_test_accuracy'
     ]
 )
 
@@ -88,11 +119,13 @@ ModelTrainerArtifact = namedtuple(
 # Attributes:
 #     is_model_accepted (bool): Flag indicating whether the model is accepted.
 #     evaluated_model_path (str): The file path of the evaluated model.
+#     evaluation_report_file_path (str): The file path of the metric confidence intervals.
 ModelEvaluationArtifact = namedtuple(
     'ModelEvaluationArtifact',
     [
         'is_model_accepted',
-        'evaluated_model_path'
+        'evaluated_model_path',
+        'evaluation_report_file_path'
     ]
 )
 
@@ -101,10 +134,75 @@ ModelEvaluationArtifact = namedtuple(
 # Attributes:
 #     is_model_pusher (bool): Flag indicating whether the model is pushed.
 #     export_model_file_path (str): The file path of the exported model.
+#     inference_bundle_file_path (str): The file path of the inference bundle published with the model,
+#         None if the version was published without one.
+#     inference_bundle_message (str): Why the version has no inference bundle, None if it has one.
 ModelPusherArtifact = namedtuple(
     'ModelPusherArtifact',
     [
         'is_model_pusher',
-        'export_model_file_path'
+        'export_model_file_path',
+        'inference_bundle_file_path',
+        'inference_bundle_message'
     ]
-)
\ No newline at end of file
+)
+# A named tuple that represents the artifact retention artifact.
+#
+# Attributes:
+#     removed_runs (list): The timestamps of the removed runs.
+#     freed_bytes (int): The disk space freed by removing the runs.
+#     deduplicated_files (int): The number of files replaced by a hardlink to an identical file.
+#     deduplicated_bytes (int): The disk space freed by the hardlinks.
+#     artifact_size (int): The disk space taken by the artifacts after the pass.
+ArtifactRetentionArtifact = namedtuple(
+    'ArtifactRetentionArtifact',
+    [
+        'removed_runs',
+        'freed_bytes',
+        'deduplicated_files',
+        'deduplicated_bytes',
+        'artifact_size'
+    ]
+)
+
+# A named tuple that represents the outcome of the pipeline run of one market.
+#
+# Attributes:
+#     market (str): The name of the market.
+#     run_id (str): The timestamp of the run.
+#     root_dir (str): The directory the run wrote its artifacts and models to.
+#     is_completed (bool): Flag indicating whether every stage of the run completed.
+#     message (str): The outcome of the run, or the error it failed with.
+#     duration (float): The number of seconds the run took.
+#     worker_pid (int): The process id of the worker that ran it.
+#     skipped_stages (list): The stages whose artifact of an earlier run or of the checkpoint was reused.
+MarketRunArtifact = namedtuple(
+    'MarketRunArtifact',
+    [
+        'market',
+        'run_id',
+        'root_dir',
+        'is_completed',
+        'message',
+        'duration',
+        'worker_pid',
+        'skipped_stages'
+    ]
+)
+
+# A named tuple that represents the data drift report artifact.
+#
+# Attributes:
+#     report_file_path (str): The file path of the data drift report.
+#     report_page_file_path (str): The file path of the data drift report page.
+#     is_reported (bool): Flag indicating whether the report and its page are saved.
+#     message (str): Additional message related to the data drift report.
+DataDriftReportArtifact = namedtuple(
+    'DataDriftReportArtifact',
+    [
+        'report_file_path',
+        'report_page_file_path',
+        'is_reported',
+        'message'
+    ]
+)
@@ -11,6 +11,8 @@ from collections import namedtuple
 #     raw_data_dir (str): The directory to store the raw data.
 #     ingested_train_dir (str): The directory to store the ingested training data.
 #     ingested_test_dir (str): The directory to store the ingested testing data.
+#     download_cache_dir (str): The directory of the downloads shared by runs, None to download on every run.
+#     download_cache_max_age_hours (float): The number of hours a cached download is reused.
 DataIngestionConfig = namedtuple(
     'DataIngestionConfig',
     [
@@ -18,7 +20,9 @@ DataIngestionConfig = namedtuple(
         'tgz_download_dir',
         'raw_data_dir',
         'ingested_train_dir',
-        'ingested_test_dir'
+        'ingested_test_dir',
+        'download_cache_dir',
+        'download_cache_max_age_hours'
     ]
 )
 
@@ -44,13 +48,15 @@ DataValidationConfig = namedtuple(
 #     transformed_train_dir (str): The directory to store the transformed training data.
 #     transformed_test_dir (str): The directory to store the transformed testing data.
 #     preprocessed_object_file_path (str): The file path to store the preprocessed object.
+#     precision (str): The floating point dtype of the transformed features, 'float64' or 'float32'.
 DataTransformationConfig = namedtuple(
     'DataTransformationConfig',
     [
         'add_bedroom_per_room',
         'transformed_train_dir',
         'transformed_test_dir',
-        'preprocessed_object_file_path'
+        'preprocessed_object_file_path',
+        'precision'
     ]
 )
 
@@ -60,12 +66,45 @@ DataTransformationConfig = namedtuple(
 #     trained_model_file_path (str): The file path to store the trained model.
 #     base_accuracy (float): The base accuracy for the model.
 #     model_config_file_path (str): The file path to the model configuration.
+#     search_result_store_dir (str): The directory shared across runs that memoizes grid search results.
+#     search_result_store_max_size_mb (float): The disk budget of the search result store.
+#     search_result_store_save_model (bool): Flag indicating whether fitted models are stored with their scores.
+#     cv_fold_dir (str): The directory of the cross validation folds shared by every candidate model of the run.
+#     training_mode (str): 'full' to refit from scratch, 'incremental' to warm start from the best model.
+#     incremental_max_new_row_ratio (float): The share of new rows above which an incremental run refits from scratch.
+#     model_registry_file_path (str): The file path of the registry holding the best model.
 ModelTrainerConfig = namedtuple(
     'ModelTrainerConfig',
     [
         'trained_model_file_path',
         'base_accuracy',
-        'model_config_file_path'
+        'model_config_file_path',
+        'search_result_store_dir',
+        'search_result_store_max_size_mb',
+        'search_result_store_save_model',
+        'cv_fold_dir',
+        'training_mode',
+        'incremental_max_new_row_ratio',
+        'model_registry_file_path'
+    ]
+)
+
+# A named tuple that represents the configuration for model compaction.
+#
+# Attributes:
+#     compacted_model_file_path (str): The file path to store the compacted model.
+#     compaction_report_file_path (str): The file path to store the size and accuracy of the model before and after compaction.
+#     leaf_quantization_bits (int): The number of bits leaf values are quantized to, 8 or 16, 0 to keep float32 values.
+#     max_accuracy_loss (float): The largest drop of the testing R2 accepted from quantization and pruning.
+#     prune (bool): Flag indicating whether subtrees with close leaf values are collapsed.
+ModelCompactionConfig = namedtuple(
+    'ModelCompactionConfig',
+    [
+        'compacted_model_file_path',
+        'compaction_report_file_path',
+        'leaf_quantization_bits',
+        'max_accuracy_loss',
+        'prune'
     ]
 )
 
@@ -74,11 +113,25 @@ ModelTrainerConfig = namedtuple(
 # Attributes:
 #     model_evaluation_file_path (str): The file path to store the model evaluation data.
 #     time_stamp (int): The timestamp for the model evaluation.
+#     model_registry_file_path (str): The file path of the registry indexing every trained model.
+#     prediction_cache_dir (str): The directory caching the best model's predictions per testing dataset.
+#     batch_size (int): The number of rows predicted per vectorized call.
+#     evaluation_report_file_path (str): The file path to store the metric confidence intervals of the run.
+#     bootstrap_samples (int): The number of bootstrap resamples of the testing data.
+#     confidence_level (float): The confidence level of the metric intervals.
+#     bootstrap_random_state (int): The seed of the bootstrap resampling.
 ModelEvaluationConfig = namedtuple(
     'ModelEvaluationConfig',
     [
         'model_evaluation_file_path',
-        'time_stamp'
+        'time_stamp',
+        'model_registry_file_path',
+        'prediction_cache_dir',
+        'batch_size',
+        'evaluation_report_file_path',
+        'bootstrap_samples',
+        'confidence_level',
+        'bootstrap_random_state'
     ]
 )
 
@@ -86,10 +139,63 @@ ModelEvaluationConfig = namedtuple(
 #
 # Attributes:
 #     export_dir_path (str): The directory path to export the model.
+#     model_version (str): The name of the immutable version directory of the pushed model.
+#     warmup_sample_size (int): The number of testing rows saved to warm the model up before serving it.
+#     inference_bundle_tolerance (float): The maximum difference, relative to the largest prediction, allowed
+#         between the inference bundle and the original estimator.
 ModelPusherConfig = namedtuple(
     'ModelPusherConfig',
     [
-        'export_dir_path'
+        'export_dir_path',
+        'model_version',
+        'warmup_sample_size',
+        'inference_bundle_tolerance'
+    ]
+)
+
+# A named tuple that represents the configuration for the prediction service.
+#
+# Attributes:
+#     export_dir_path (str): The directory the model pusher publishes model versions into.
+#     model_poll_interval (float): The number of seconds between checks for a new model version.
+#     max_batch_size (int): The maximum number of rows predicted in one micro-batch.
+#     max_wait_us (int): The maximum number of microseconds a request waits for its micro-batch to fill.
+#     schema_file_path (str): The file path of the dataset schema inputs are validated against.
+#     bulk_chunk_size (int): The number of rows read and predicted at a time by bulk scoring.
+#     bulk_workers (int): The number of chunks bulk scoring predicts in parallel, 0 for one per CPU.
+#     prediction_cache_size (int): The maximum number of predictions cached in memory, 0 to disable the cache.
+#     prediction_cache_ttl_seconds (float): The number of seconds a cached prediction stays valid.
+#     shared_prediction_cache_file_path (str): The SQLite file sharing cached predictions between worker
+#         processes, None to keep the cache per process.
+#     shared_prediction_cache_max_entries (int): The maximum number of predictions kept in the shared SQLite file.
+#     inference_workers (int): The number of model calls the async service runs in parallel, 0 for one per CPU.
+#     max_queue_depth (int): The number of model calls the async service lets wait before refusing requests.
+#     request_deadline_ms (int): The number of milliseconds the async service gives a request before timing out.
+#     max_request_bytes (int): The maximum size of a request body accepted by the async service.
+#     metrics_enabled (bool): Whether the services record latency and throughput metrics and expose /metrics.
+#     use_flat_forest (bool): Whether served forests predict with the vectorized flat forest engine.
+#     log_levels (dict): The level of named loggers of the services, e.g. {'housing.serving': 'WARNING'}.
+ServingConfig = namedtuple(
+    'ServingConfig',
+    [
+        'export_dir_path',
+        'model_poll_interval',
+        'max_batch_size',
+        'max_wait_us',
+        'schema_file_path',
+        'bulk_chunk_size',
+        'bulk_workers',
+        'prediction_cache_size',
+        'prediction_cache_ttl_seconds',
+        'shared_prediction_cache_file_path',
+        'shared_prediction_cache_max_entries',
+        'inference_workers',
+        'max_queue_depth',
+        'request_deadline_ms',
+        'max_request_bytes',
+        'metrics_enabled',
+        'use_flat_forest',
+        'log_levels'
     ]
 )
 
@@ -97,9 +203,112 @@ ModelPusherConfig = namedtuple(
 #
 # Attributes:
 #     artifact_dir (str): The directory path to store the training artifacts.
+#     precision (str): The floating point dtype used from transformation to inference, 'float64' or 'float32'.
+#     max_workers (int): The number of stages the pipeline runs concurrently.
+#     skip_unchanged_stages (bool): Whether a stage whose inputs are unchanged reuses the artifact of an earlier run.
+#     stage_cache_file_path (str): The file path of the stage artifacts recorded by input fingerprint.
+#     checkpoint_manifest_file_path (str): The file path of the artifacts of the stages the run completed.
 TrainingPipelineConfig = namedtuple(
     'TrainingPipelineConfig',
     [
-        'artifact_dir'
+        'artifact_dir',
+        'precision',
+        'max_workers',
+        'skip_unchanged_stages',
+        'stage_cache_file_path',
+        'checkpoint_manifest_file_path'
     ]
-)
\ No newline at end of file
+)
+# A named tuple that represents a parsed and validated dataset schema.
+#
+# Attributes:
+#     columns (Mapping): The type of every column of the dataset, in schema order.
+#     numerical_columns (tuple): The numerical input columns.
+#     categorical_columns (tuple): The categorical input columns.
+#     target_column (str): The target column.
+#     input_columns (tuple): The numerical followed by the categorical input columns.
+#     column_positions (Mapping): The position of every input column in input_columns.
+#     domain_values (Mapping): The frozenset of allowed values of every categorical column with a domain.
+DatasetSchema = namedtuple(
+    'DatasetSchema',
+    [
+        'columns',
+        'numerical_columns',
+        'categorical_columns',
+        'target_column',
+        'input_columns',
+        'column_positions',
+        'domain_values'
+    ]
+)
+
+# A named tuple that represents the configuration for the artifact retention.
+#
+# Attributes:
+#     artifact_dir (str): The directory path of the training artifacts.
+#     model_registry_file_path (str): The file path of the model registry, whose models are never removed.
+#     file_index_file_path (str): The file path of the index of the file digests used for deduplication.
+#     stage_cache_file_path (str): The file path of the stage cache, whose recently reused runs are never removed.
+#     keep_last_runs (int): The number of most recent runs kept, None to keep every run.
+#     max_age_days (float): The number of days a run is kept, None to keep runs regardless of their age.
+#     max_size_gb (float): The disk budget of the artifacts in gigabytes, None for no budget.
+#     min_age_hours (float): The number of hours during which a run is never removed nor deduplicated.
+#     deduplicate (bool): Whether identical files of different runs are replaced by hardlinks.
+#     deduplicate_max_mb_per_pass (float): The number of megabytes hashed by one retention pass.
+#     interval_seconds (float): The number of seconds between two passes of the background retention.
+ArtifactRetentionConfig = namedtuple(
+    'ArtifactRetentionConfig',
+    [
+        'artifact_dir',
+        'model_registry_file_path',
+        'file_index_file_path',
+        'stage_cache_file_path',
+        'keep_last_runs',
+        'max_age_days',
+        'max_size_gb',
+        'min_age_hours',
+        'deduplicate',
+        'deduplicate_max_mb_per_pass',
+        'interval_seconds'
+    ]
+)
+
+# A named tuple that represents the configuration of the pipeline run of one market.
+#
+# Attributes:
+#     name (str): The name of the market.
+#     config_file_path (str): The file path of the pipeline configuration of the market.
+#     root_dir (str): The directory the runs of the market write their artifacts and models to.
+#     cpus (int): The number of CPUs reserved for a run of the market.
+#     memory_gb (float): The memory in gigabytes reserved for a run of the market.
+#     config_overrides (dict): The values of the pipeline configuration the market overrides, by section.
+MarketConfig = namedtuple(
+    'MarketConfig',
+    [
+        'name',
+        'config_file_path',
+        'root_dir',
+        'cpus',
+        'memory_gb',
+        'config_overrides'
+    ]
+)
+
+# A named tuple that represents the configuration of the multi-region runner.
+#
+# Attributes:
+#     markets_dir (str): The directory holding the root directory of every market.
+#     max_cpus (int): The number of CPUs shared by the concurrent runs.
+#     max_memory_gb (float): The memory in gigabytes shared by the concurrent runs.
+#     max_processes (int): The number of worker processes of the pool.
+#     markets (list): The MarketConfig of every market, in the order of the markets file.
+MultiRegionConfig = namedtuple(
+    'MultiRegionConfig',
+    [
+        'markets_dir',
+        'max_cpus',
+        'max_memory_gb',
+        'max_processes',
+        'markets'
+    ]
+)
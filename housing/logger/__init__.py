@@ -1,22 +1,165 @@
 # housing/logger/__init__.py
 
 # Import required libraries and packages
+import sys
+import json
+import queue
+import atexit
 import logging
+import logging.handlers
 from housing.constant import *
 
 # Define the log file name using the current timestamp
 LOG_FILE_NAME = f'log_{CURRENT_TIMESTAMP}.log'
 
-# Create the log folder if it doesn't exist
-os.makedirs(LOG_FOLDER_NAME, exist_ok=True)
-
 # Define the log file path by joining the log folder and log file name
 LOG_FILE_PATH = os.path.join(LOG_FOLDER_NAME, LOG_FILE_NAME)
 
-# Configure the logging module with the log file path and other settings
-logging.basicConfig(
-    filename=LOG_FILE_PATH,
-    filemode='w',
-    format='[%(asctime)s]^;%(levelname)s^;%(lineno)d^;%(filename)s^;%(funcName)s()^;%(message)s',
-    level=logging.INFO
+# Format of the plain text log lines
+LOG_FORMAT = '[%(asctime)s]^;%(levelname)s^;%(lineno)d^;%(filename)s^;%(funcName)s()^;%(message)s'
+
+# Environment variables overriding the log settings:
+#     HOUSING_LOG_LEVEL: the level of the root logger, INFO by default.
+#     HOUSING_LOG_FORMAT: 'text' for the plain text lines, 'json' for one JSON object per line.
+#     HOUSING_LOG_LEVELS: levels of named loggers, e.g. 'housing.serving=WARNING,housing.component=INFO'.
+LOG_LEVEL_ENV_KEY = 'HOUSING_LOG_LEVEL'
+LOG_FORMAT_ENV_KEY = 'HOUSING_LOG_FORMAT'
+LOG_LEVELS_ENV_KEY = 'HOUSING_LOG_LEVELS'
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats every record as one JSON object per line.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        log_entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'file': record.filename,
+            'line': record.lineno,
+            'function': record.funcName,
+            'process': record.process,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        if record.exc_info:
+            log_entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(log_entry, default=str)
+
+class LazyFileHandler(logging.FileHandler):
+    """
+    Opens the log file, creating the log folder if it doesn't exist, when the first record is written.
+
+    Importing the package therefore leaves no empty log folder or file behind.
+    """
+    def __init__(self, file_path: str) -> None:
+        super().__init__(file_path, mode='a', delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queues records without formatting them.
+
+    The standard QueueHandler merges the arguments into the message on the calling thread.
+    Records stay in this process, so they are queued as they are and the message is built by
+    the writer thread, only for records that pass the level of their logger.
+    """
+    # Handler writing records directly once the writer thread is stopped
+    fallback_handler = None
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.fallback_handler is not None:
+            self.fallback_handler.handle(record)
+        else:
+            self.queue.put_nowait(record)
+
+class QueuedLogWriter:
+    """
+    Writes the records of the process to the log file on a background thread.
+
+    Loggers only put records on a queue, so a slow disk never blocks the caller. The writer
+    thread is started again in every forked child, with its own queue, since a thread does
+    not survive a fork. Records still queued are written when the process, or a
+    multiprocessing child, exits, and records logged after that are written directly.
+
+    Args:
+        file_path (str): The file path of the log file.
+        json_format (bool): Whether to write JSON lines instead of plain text lines.
+    """
+    def __init__(self, file_path: str, json_format: bool=False) -> None:
+        # Appending lets processes forked from one another share the log file line by line
+        self.file_handler = LazyFileHandler(file_path)
+        self.file_handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(LOG_FORMAT))
+        self.queue_handler = LazyQueueHandler(queue.SimpleQueue())
+        self.listener = None
+        self.is_multiprocessing_hook_registered = False
+        self.start()
+
+    def start(self) -> None:
+        self.listener = logging.handlers.QueueListener(self.queue_handler.queue, self.file_handler, respect_handler_level=True)
+        self.listener.start()
+
+    def restart_in_child(self) -> None:
+        # The parent's writer thread is gone, records queued before the fork belong to the parent
+        self.queue_handler.queue = queue.SimpleQueue()
+        self.queue_handler.fallback_handler = None
+        self.start()
+
+    def register_multiprocessing_hook(self) -> None:
+        # multiprocessing children leave with os._exit, which skips the atexit hook. The hook is
+        # registered once multiprocessing is in use, so other processes never import it.
+        multiprocessing_util = sys.modules.get('multiprocessing.util')
+        if multiprocessing_util is not None and not self.is_multiprocessing_hook_registered:
+            multiprocessing_util.register_after_fork(self, QueuedLogWriter.register_process_finalizer)
+            self.is_multiprocessing_hook_registered = True
+
+    def register_process_finalizer(self) -> None:
+        sys.modules['multiprocessing.util'].Finalize(None, self.stop, exitpriority=0)
+
+    def stop(self) -> None:
+        # Write what is queued, then write later records, such as shutdown banners, directly
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        self.queue_handler.fallback_handler = self.file_handler
+
+def get_log_levels(log_levels) -> dict:
+    """
+    Parses logger levels given as a dict or as 'name=LEVEL,name=LEVEL'.
+    """
+    if isinstance(log_levels, str):
+        log_levels = dict(
+            item.split('=', 1) for item in log_levels.replace(' ', '').split(',') if '=' in item
+        )
+    return {name: str(level).upper() for name, level in (log_levels or dict()).items()}
+
+def set_log_levels(log_levels) -> None:
+    """
+    Sets the level of named loggers, so noisy paths such as the serving hot path can be
+    silenced without losing the logs of the training pipeline.
+
+    Args:
+        log_levels (dict or str): The level of every logger name, e.g. {'housing.serving': 'WARNING'}.
+    """
+    for name, level in get_log_levels(log_levels).items():
+        logging.getLogger(name).setLevel(level)
+
+# Route the records of every logger through the queue to the writer thread
+log_writer = QueuedLogWriter(
+    file_path=LOG_FILE_PATH,
+    json_format=os.environ.get(LOG_FORMAT_ENV_KEY, 'text').lower() == 'json'
 )
+root_logger = logging.getLogger()
+root_logger.addHandler(log_writer.queue_handler)
+root_logger.setLevel(os.environ.get(LOG_LEVEL_ENV_KEY, 'INFO').upper())
+set_log_levels(os.environ.get(LOG_LEVELS_ENV_KEY, ''))
+
+log_writer.register_multiprocessing_hook()
+os.register_at_fork(before=log_writer.register_multiprocessing_hook, after_in_child=log_writer.restart_in_child)
+atexit.register(log_writer.stop)
@@ -0,0 +1,308 @@
+# housing/pipeline/multi_region_runner.py
+
+# Import required libraries and packages
+import os
+import sys
+import time
+import argparse
+import importlib
+import contextlib
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from housing.constant import *
+from housing.logger import logging
+from housing.exception import CustomException
+from housing.util import read_yaml_cached, load_dataset_schema
+from housing.config import Configuration
+from housing.pipeline.pipeline import Pipeline
+from housing.entity.config_entity import MarketConfig, MultiRegionConfig
+from housing.entity.artifact_entity import MarketRunArtifact
+
+# Modules every run needs, imported once per worker process instead of once per run
+WARM_UP_MODULES = (
+    'pandas',
+    'sklearn.model_selection',
+    'sklearn.ensemble',
+    'sklearn.linear_model'
+)
+
+# Environment variable joblib reads to size its process pools
+LOKY_MAX_CPU_COUNT_ENV_KEY = 'LOKY_MAX_CPU_COUNT'
+
+def warm_up(schema_file_paths: tuple=(), model_config_file_paths: tuple=()) -> None:
+    """
+    Imports the modules every run needs and parses the read-only configuration files the
+    markets share.
+
+    Called in the parent before the worker pool starts, so forked workers inherit the
+    imported modules and parsed files, and in every worker, where it only checks the files
+    for changes. Workers started without fork pay for it once, not once per run.
+
+    Args:
+        schema_file_paths (tuple): The dataset schemas of the markets.
+        model_config_file_paths (tuple): The model configurations of the markets.
+    """
+    for module_name in WARM_UP_MODULES:
+        importlib.import_module(module_name)
+    for schema_file_path in schema_file_paths:
+        load_dataset_schema(schema_file_path)
+    for model_config_file_path in model_config_file_paths:
+        read_yaml_cached(model_config_file_path)
+
+@contextlib.contextmanager
+def limit_cpus(cpus: int):
+    """
+    Limits the native thread pools and the joblib process pools of a run to the CPUs it
+    reserved, so concurrent runs do not each use every CPU of the machine.
+    """
+    previous_loky_max_cpu_count = os.environ.get(LOKY_MAX_CPU_COUNT_ENV_KEY)
+    os.environ[LOKY_MAX_CPU_COUNT_ENV_KEY] = str(cpus)
+    try:
+        # threadpoolctl is installed with scikit-learn, the limit is skipped without it
+        try:
+            from threadpoolctl import threadpool_limits
+        except ImportError:
+            threadpool_limits = None
+        with threadpool_limits(limits=cpus) if threadpool_limits is not None else contextlib.nullcontext():
+            yield
+    finally:
+        if previous_loky_max_cpu_count is None:
+            os.environ.pop(LOKY_MAX_CPU_COUNT_ENV_KEY, None)
+        else:
+            os.environ[LOKY_MAX_CPU_COUNT_ENV_KEY] = previous_loky_max_cpu_count
+
+def run_market(market_config: MarketConfig, run_id: str, resume: bool=False) -> MarketRunArtifact:
+    """
+    Runs the training pipeline of one market in a worker process.
+
+    The run writes below the root directory of the market under its own run id, so runs of
+    different markets never share an artifact, a stage cache or a model registry. A failure
+    is returned rather than raised, so it does not stop the runs of the other markets.
+
+    Args:
+        market_config (MarketConfig): The configuration of the market.
+        run_id (str): The timestamp of the run.
+        resume (bool): Whether to resume the run from its checkpoint manifest.
+
+    Returns:
+        MarketRunArtifact: The outcome of the run.
+    """
+    started_at = time.perf_counter()
+    try:
+        logging.info('market: [%s] run: [%s] started in worker: [%s]', market_config.name, run_id, os.getpid())
+        with limit_cpus(market_config.cpus):
+            config = Configuration(
+                config_file_path=market_config.config_file_path,
+                current_timestamp=run_id,
+                root_dir=market_config.root_dir,
+                config_overrides=market_config.config_overrides
+            )
+            results = Pipeline(config=config).run_pipeline(resume=resume)
+
+        duration = time.perf_counter() - started_at
+        logging.info('market: [%s] run: [%s] completed in [%.3f] seconds', market_config.name, run_id, duration)
+        return MarketRunArtifact(
+            market=market_config.name,
+            run_id=run_id,
+            root_dir=market_config.root_dir,
+            is_completed=True,
+            message='pipeline run completed successfully',
+            duration=duration,
+            worker_pid=os.getpid(),
+            skipped_stages=[name for name, result in results.items() if result.is_skipped]
+        )
+    except Exception as e:
+        logging.exception('market: [%s] run: [%s] failed', market_config.name, run_id)
+        return MarketRunArtifact(
+            market=market_config.name,
+            run_id=run_id,
+            root_dir=market_config.root_dir,
+            is_completed=False,
+            message=str(e),
+            duration=time.perf_counter() - started_at,
+            worker_pid=os.getpid(),
+            skipped_stages=[]
+        )
+
+class MultiRegionRunner:
+    """
+    Runs the training pipelines of many markets concurrently in one pool of warm worker
+    processes.
+
+    Every market has its own root directory and every run its own run id, so the artifacts,
+    stage caches, model registries and exported models of the markets stay apart. What is
+    read-only is shared: the modules and the parsed schemas and model configurations are
+    loaded once before the workers start, and the markets download their datasets through
+    one download cache.
+
+    A run reserves the CPUs and memory its market declares. Runs start in the order of the
+    markets file as long as the budget allows; a market that does not fit lets smaller ones
+    behind it start first, and starts itself as soon as enough of the budget is released.
+
+    Args:
+        multi_region_config (MultiRegionConfig): The configuration of the runner.
+
+    Raises:
+        CustomException: If an error occurs while initializing the runner.
+    """
+    def __init__(self, multi_region_config: MultiRegionConfig) -> None:
+        try:
+            self.multi_region_config = multi_region_config
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_shared_file_paths(self, markets: list) -> tuple:
+        """
+        The schemas and model configurations of the markets, parsed once and shared by every run.
+
+        Returns:
+            tuple: The schema file paths and the model configuration file paths.
+        """
+        try:
+            schema_file_paths, model_config_file_paths = set(), set()
+            for market_config in markets:
+                config = Configuration(
+                    config_file_path=market_config.config_file_path,
+                    root_dir=market_config.root_dir,
+                    config_overrides=market_config.config_overrides
+                )
+                schema_file_paths.add(config.data_validation_config().schema_file_path)
+                model_config_file_paths.add(config.model_trainer_config().model_config_file_path)
+            return tuple(sorted(schema_file_paths)), tuple(sorted(model_config_file_paths))
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def get_mp_context():
+        # Forked workers inherit the warm parent, other platforms start fresh interpreters
+        if 'fork' in multiprocessing.get_all_start_methods():
+            return multiprocessing.get_context('fork')
+        return multiprocessing.get_context('spawn')
+
+    def run(self, market_names: list=None, resume_run_ids: dict=None) -> list:
+        """
+        Run the pipelines of the markets within the CPU and memory budget.
+
+        Args:
+            market_names (list): The markets to run, every market by default.
+            resume_run_ids (dict): The run id to resume, by market name; the other markets
+                start a new run.
+
+        Returns:
+            list: The MarketRunArtifact of every market, in the order the runs finished.
+
+        Raises:
+            CustomException: If a market is unknown or the runner fails; a failed run is
+            reported in its artifact instead.
+        """
+        try:
+            resume_run_ids = dict(resume_run_ids or dict())
+            markets = list(self.multi_region_config.markets)
+            if market_names:
+                unknown_market_names = set(market_names) - set(market_config.name for market_config in markets)
+                if unknown_market_names:
+                    raise Exception(f'markets: {sorted(unknown_market_names)} are not in the markets file')
+                markets = [market_config for market_config in markets if market_config.name in market_names]
+
+            max_cpus = self.multi_region_config.max_cpus
+            max_memory_gb = self.multi_region_config.max_memory_gb
+            max_processes = min(self.multi_region_config.max_processes, max(1, len(markets)))
+            logging.info(
+                'multi-region run of [%s] markets on [%s] worker processes, budget: [%s] cpus and [%.1f] gb',
+                len(markets), max_processes, max_cpus, max_memory_gb
+            )
+
+            # Parse the shared files before forking, so every worker starts with them
+            shared_file_paths = self.get_shared_file_paths(markets)
+            warm_up(*shared_file_paths)
+
+            market_run_artifacts = []
+            pending_markets = list(markets)
+            running_markets = dict()
+            free_cpus, free_memory_gb = max_cpus, max_memory_gb
+            started_at = time.perf_counter()
+
+            with ProcessPoolExecutor(
+                max_workers=max_processes,
+                mp_context=self.get_mp_context(),
+                initializer=warm_up,
+                initargs=shared_file_paths
+            ) as executor:
+                while len(pending_markets) > 0 or len(running_markets) > 0:
+                    # Start every pending run that fits in what is left of the budget
+                    for market_config in list(pending_markets):
+                        if len(running_markets) >= max_processes:
+                            break
+                        if market_config.cpus > free_cpus or market_config.memory_gb > free_memory_gb:
+                            continue
+                        pending_markets.remove(market_config)
+                        free_cpus -= market_config.cpus
+                        free_memory_gb -= market_config.memory_gb
+
+                        resume = market_config.name in resume_run_ids
+                        run_id = resume_run_ids.get(market_config.name) or datetime.now().strftime(RUN_TIMESTAMP_FORMAT)
+                        logging.info(
+                            'market: [%s] run: [%s] scheduled with [%s] cpus and [%.1f] gb, free: [%s] cpus and [%.1f] gb',
+                            market_config.name, run_id, market_config.cpus, market_config.memory_gb, free_cpus, free_memory_gb
+                        )
+                        running_markets[executor.submit(run_market, market_config, run_id, resume)] = market_config
+
+                    done, _ = wait(running_markets, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        market_config = running_markets.pop(future)
+                        free_cpus += market_config.cpus
+                        free_memory_gb += market_config.memory_gb
+                        market_run_artifacts.append(future.result())
+
+            failed_markets = [artifact.market for artifact in market_run_artifacts if not artifact.is_completed]
+            logging.info(
+                'multi-region run of [%s] markets completed in [%.3f] seconds, sum of the runs: [%.3f] seconds, failed markets: %s',
+                len(market_run_artifacts),
+                time.perf_counter() - started_at,
+                sum(artifact.duration for artifact in market_run_artifacts),
+                failed_markets
+            )
+            return market_run_artifacts
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+def main(args=None) -> None:
+    """
+    Command line entry point: runs the pipelines of every market, or of the given ones, or
+    resumes a failed run of one market with `resume <market> <run-id>`.
+    """
+    parser = argparse.ArgumentParser(description='Run the training pipelines of many markets concurrently.')
+    parser.add_argument('--config', default=CONFIG_FILE_PATH, help='the default pipeline configuration file')
+    parser.add_argument('--markets-file', default=MARKETS_CONFIG_FILE_PATH, help='the markets and the budget of the runs')
+    subparsers = parser.add_subparsers(dest='command')
+    run_parser = subparsers.add_parser('run', help='start a new run of the markets')
+    run_parser.add_argument('markets', nargs='*', help='markets to run, all by default')
+    resume_parser = subparsers.add_parser('resume', help='resume a run of one market from its checkpoint manifest')
+    resume_parser.add_argument('market', help='the name of the market')
+    resume_parser.add_argument('run_id', help='the timestamp of the run')
+    arguments = parser.parse_args(args)
+
+    multi_region_config = Configuration(config_file_path=arguments.config).multi_region_config(
+        markets_file_path=arguments.markets_file
+    )
+    runner = MultiRegionRunner(multi_region_config=multi_region_config)
+    if arguments.command == 'resume':
+        market_run_artifacts = runner.run(
+            market_names=[arguments.market],
+            resume_run_ids={arguments.market: arguments.run_id}
+        )
+    else:
+        market_run_artifacts = runner.run(market_names=getattr(arguments, 'markets', None))
+
+    for artifact in market_run_artifacts:
+        status = 'completed' if artifact.is_completed else f'failed: {artifact.message}'
+        print(f'{artifact.market:<20} {artifact.run_id:<20} {artifact.duration:9.3f} s  {status}')
+
+    failed_markets = [artifact.market for artifact in market_run_artifacts if not artifact.is_completed]
+    if failed_markets:
+        sys.exit(f'{len(failed_markets)} market run(s) failed: {", ".join(failed_markets)}')
+
+if __name__ == '__main__':
+    main()
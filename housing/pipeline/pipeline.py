@@ -0,0 +1,599 @@
+# housing/pipeline/pipeline.py
+
+# Import required libraries and packages
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+from datetime import datetime
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from housing.constant import *
+from housing.logger import logging
+from housing.exception import CustomException
+from housing.util import get_file_fingerprint, get_source_file_paths, read_yaml, write_yaml
+from housing.config import Configuration
+from housing.entity.artifact_entity import *
+from housing.component.data_ingestion import DataIngestion
+from housing.component.data_validation import DataValidation
+from housing.component.data_transformation import DataTransformation
+from housing.component.model_trainer import ModelTrainer
+from housing.component.model_compaction import ModelCompaction
+from housing.component.model_evaluation import ModelEvaluation
+from housing.component.model_pusher import ModelPusher
+from housing.pipeline.stage_cache import StageCache, get_artifact_file_paths, artifact_to_dict, artifact_from_dict
+
+# Status of a run in its checkpoint manifest
+RUN_STATUS_RUNNING = 'running'
+RUN_STATUS_COMPLETED = 'completed'
+RUN_STATUS_FAILED = 'failed'
+
+# A named tuple that represents one stage of the pipeline DAG.
+#
+# Attributes:
+#     name (str): The name of the stage.
+#     artifact_type (type): The artifact named tuple the stage produces.
+#     dependencies (tuple): The names of the stages whose artifacts the stage consumes.
+#     run (callable): Runs the stage from the artifacts of its dependencies, by stage name.
+#     config (namedtuple): The configuration of the stage.
+#     component (type): The component class of the stage, whose code is part of its fingerprint.
+#     cacheable (bool): Whether the artifact only depends on the inputs, so that it can be reused.
+PipelineStage = namedtuple(
+    'PipelineStage',
+    [
+        'name',
+        'artifact_type',
+        'dependencies',
+        'run',
+        'config',
+        'component',
+        'cacheable'
+    ]
+)
+
+# A named tuple that represents the outcome of one stage of a pipeline run.
+#
+# Attributes:
+#     artifact (namedtuple): The artifact of the stage.
+#     input_fingerprint (str): The fingerprint of the inputs of the stage.
+#     fingerprint (str): The fingerprint of the artifact, which downstream stages build on.
+#     time_stamp (str): The timestamp of the run that produced the artifact.
+#     is_skipped (bool): Flag indicating whether the artifact of an earlier run or of the checkpoint was reused.
+#     started_at (float): The time the stage started, relative to the start of the run.
+#     duration (float): The number of seconds the stage took.
+#     file_fingerprints (dict): The content fingerprint of every file of the artifact, by file path.
+StageResult = namedtuple(
+    'StageResult',
+    [
+        'artifact',
+        'input_fingerprint',
+        'fingerprint',
+        'time_stamp',
+        'is_skipped',
+        'started_at',
+        'duration',
+        'file_fingerprints'
+    ]
+)
+
+class Pipeline:
+    """
+    Runs the training pipeline as a DAG of stages exchanging typed artifacts.
+
+    A stage starts as soon as the stages it depends on are done, so independent work runs
+    concurrently: the data drift report and its HTML page are rendered while the data is
+    transformed and the model trained, and the wall clock time of a run follows its critical
+    path rather than the sum of its stages.
+
+    Every stage gets an input fingerprint built from its configuration, with the run
+    timestamp taken out and the input files outside the artifact directory hashed, the code of
+    its component and the fingerprints of its dependencies. A cacheable stage whose input
+    fingerprint was seen before reuses the artifact of that earlier run. Ingestion, whose
+    source is remote, evaluation and pushing, which depend on the model registry, and
+    incremental training always run; their artifacts are fingerprinted by content, so the
+    stages downstream of an unchanged ingestion are still skipped.
+
+    After every stage, the artifacts of the completed stages are written to the checkpoint
+    manifest of the run, with the fingerprints of their inputs and of their files. A failed
+    run resumed under the same run id restores the stages whose inputs are unchanged and
+    whose files still match their fingerprints, and only runs the stages after them.
+
+    Args:
+        config (Configuration): The configuration of the run.
+
+    Raises:
+        CustomException: If an error occurs while initializing the pipeline.
+    """
+    def __init__(self, config: Configuration=None) -> None:
+        try:
+            self.config = config if config is not None else Configuration()
+            self.training_pipeline_config = self.config.training_pipeline_config()
+            self.time_stamp = self.config.timestamp
+            self.stage_cache = StageCache(stage_cache_file_path=self.training_pipeline_config.stage_cache_file_path)
+            self.file_fingerprints = dict()
+            self.checkpoint_stages = dict()
+            self.stage_run_dir_paths = dict()
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_stages(self) -> dict:
+        """
+        Build the stages of the pipeline DAG.
+
+        Returns:
+            dict: The stages by name, in a topological order.
+        """
+        try:
+            model_trainer_config = self.config.model_trainer_config()
+            is_incremental = model_trainer_config.training_mode == TRAINING_MODE_INCREMENTAL
+
+            # Incremental training reads the drift report, full training does not wait for it
+            model_trainer_dependencies = ('data_ingestion', 'data_validation', 'data_transformation')
+            if is_incremental:
+                model_trainer_dependencies += ('data_drift_report',)
+
+            stages = [
+                PipelineStage('data_ingestion', DataIngestionArtifact, (),
+                              self.run_data_ingestion, self.config.data_ingestion_config(), DataIngestion, False),
+                PipelineStage('data_validation', DataValidationArtifact, ('data_ingestion',),
+                              self.run_data_validation, self.config.data_validation_config(), DataValidation, True),
+                PipelineStage('data_drift_report', DataDriftReportArtifact, ('data_ingestion', 'data_validation'),
+                              self.run_data_drift_report, self.config.data_validation_config(), DataValidation, True),
+                PipelineStage('data_transformation', DataTransformationArtifact, ('data_ingestion', 'data_validation'),
+                              self.run_data_transformation, self.config.data_transformation_config(), DataTransformation, True),
+                PipelineStage('model_trainer', ModelTrainerArtifact, model_trainer_dependencies,
+                              self.run_model_trainer, model_trainer_config, ModelTrainer, not is_incremental),
+                PipelineStage('model_compaction', ModelCompactionArtifact, ('data_transformation', 'model_trainer'),
+                              self.run_model_compaction, self.config.model_compaction_config(), ModelCompaction, True),
+                PipelineStage('model_evaluation', ModelEvaluationArtifact,
+                              ('data_ingestion', 'data_validation', 'model_trainer', 'model_compaction'),
+                              self.run_model_evaluation, self.config.model_evaluation_config(), ModelEvaluation, False),
+                PipelineStage('model_pusher', ModelPusherArtifact, ('data_ingestion', 'model_evaluation'),
+                              self.run_model_pusher, self.config.model_pusher_config(), ModelPusher, False)
+            ]
+            return {stage.name: stage for stage in stages}
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def run_data_ingestion(self, artifacts: dict) -> DataIngestionArtifact:
+        return DataIngestion(data_ingestion_config=self.config.data_ingestion_config()).initiate_data_ingestion()
+
+    def run_data_validation(self, artifacts: dict) -> DataValidationArtifact:
+        # The drift report is rendered by its own stage, concurrently with the transformation
+        return DataValidation(
+            data_validation_config=self.config.data_validation_config(),
+            data_ingestion_artifact=artifacts['data_ingestion']
+        ).initiate_data_validation(save_drift_report=False)
+
+    def run_data_drift_report(self, artifacts: dict) -> DataDriftReportArtifact:
+        data_validation_config = self.config.data_validation_config()
+        DataValidation(
+            data_validation_config=data_validation_config,
+            data_ingestion_artifact=artifacts['data_ingestion']
+        ).is_data_drift_found()
+        return DataDriftReportArtifact(
+            report_file_path=data_validation_config.report_file_path,
+            report_page_file_path=data_validation_config.report_page_file_path,
+            is_reported=True,
+            message='data drift report saved successfully'
+        )
+
+    def run_data_transformation(self, artifacts: dict) -> DataTransformationArtifact:
+        return DataTransformation(
+            data_transformation_config=self.config.data_transformation_config(),
+            data_ingestion_artifact=artifacts['data_ingestion'],
+            data_validation_artifact=artifacts['data_validation']
+        ).initiate_data_transformation()
+
+    def run_model_trainer(self, artifacts: dict) -> ModelTrainerArtifact:
+        # The drift report may come from another run than the validation artifact
+        data_validation_artifact = artifacts['data_validation']
+        if 'data_drift_report' in artifacts:
+            data_validation_artifact = data_validation_artifact._replace(
+                report_file_path=artifacts['data_drift_report'].report_file_path,
+                report_page_file_path=artifacts['data_drift_report'].report_page_file_path
+            )
+        return ModelTrainer(
+            model_trainer_config=self.config.model_trainer_config(),
+            data_transformation_artifact=artifacts['data_transformation'],
+            data_ingestion_artifact=artifacts['data_ingestion'],
+            data_validation_artifact=data_validation_artifact
+        ).initiate_model_trainer()
+
+    def run_model_compaction(self, artifacts: dict) -> ModelCompactionArtifact:
+        return ModelCompaction(
+            model_compaction_config=self.config.model_compaction_config(),
+            data_transformation_artifact=artifacts['data_transformation'],
+            model_trainer_artifact=artifacts['model_trainer']
+        ).initiate_model_compaction()
+
+    def run_model_evaluation(self, artifacts: dict) -> ModelEvaluationArtifact:
+        return ModelEvaluation(
+            model_evaluation_config=self.config.model_evaluation_config(),
+            data_ingestion_artifact=artifacts['data_ingestion'],
+            data_validation_artifact=artifacts['data_validation'],
+            model_trainer_artifact=artifacts['model_trainer'],
+            model_compaction_artifact=artifacts['model_compaction']
+        ).initiate_model_evaluation()
+
+    def run_model_pusher(self, artifacts: dict) -> ModelPusherArtifact:
+        return ModelPusher(
+            model_pusher_config=self.config.model_pusher_config(),
+            model_evaluation_artifact=artifacts['model_evaluation'],
+            data_ingestion_artifact=artifacts['data_ingestion']
+        ).initiate_model_pusher()
+
+    def get_file_fingerprint(self, file_path: str) -> str:
+        """
+        The content fingerprint of a file, hashed once per file version.
+        """
+        file_stat = os.stat(file_path)
+        stat_key = (file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino)
+        cached = self.file_fingerprints.get(file_path)
+        if cached is None or cached[0] != stat_key:
+            cached = (stat_key, get_file_fingerprint(file_path=file_path))
+            self.file_fingerprints[file_path] = cached
+        return cached[1]
+
+    def get_input_fingerprint(self, stage: PipelineStage, dependency_fingerprints: dict) -> str:
+        """
+        Fingerprint the configuration, the code and the dependencies of a stage.
+
+        The code is the module of the component and every housing module it imports,
+        directly or indirectly, such as the estimators and the utilities it runs.
+
+        Args:
+            stage (PipelineStage): The stage.
+            dependency_fingerprints (dict): The fingerprints of the artifacts of its dependencies.
+
+        Returns:
+            str: The hex encoded SHA-256 digest of the inputs of the stage.
+        """
+        try:
+            artifact_dir = self.training_pipeline_config.artifact_dir
+            config_content = dict()
+            for name, value in stage.config._asdict().items():
+                if isinstance(value, str):
+                    # Input files, such as the schema, are fingerprinted by content, the
+                    # files of the artifact directory are state or outputs
+                    if os.path.isabs(value) and os.path.isfile(value) and not value.startswith(artifact_dir + os.sep):
+                        value = self.get_file_fingerprint(value)
+                    else:
+                        value = value.replace(self.time_stamp, '{time_stamp}')
+                config_content[name] = value
+
+            fingerprint_content = json.dumps(
+                {
+                    'stage': stage.name,
+                    'config': config_content,
+                    'code': {
+                        module_name: self.get_file_fingerprint(file_path)
+                        for module_name, file_path in get_source_file_paths(stage.component.__module__).items()
+                    },
+                    'dependencies': dependency_fingerprints
+                },
+                sort_keys=True,
+                default=repr
+            )
+            return hashlib.sha256(fingerprint_content.encode()).hexdigest()
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_output_fingerprint(self, artifact, input_fingerprint: str) -> str:
+        """
+        Fingerprint an artifact by the content of its files.
+        """
+        try:
+            digest = hashlib.sha256(input_fingerprint.encode())
+            digest.update(json.dumps([value for value in artifact if not isinstance(value, str)], default=repr).encode())
+            for file_path in get_artifact_file_paths(artifact):
+                if os.path.isfile(file_path):
+                    digest.update(self.get_file_fingerprint(file_path).encode())
+            return digest.hexdigest()
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_file_fingerprints(self, artifact) -> dict:
+        """
+        The content fingerprint of every existing file of an artifact.
+        """
+        return {
+            file_path: self.get_file_fingerprint(file_path)
+            for file_path in get_artifact_file_paths(artifact) if os.path.isfile(file_path)
+        }
+
+    def get_stage_run_dir_paths(self, stages: dict) -> dict:
+        """
+        Find the artifact/<stage>/<time_stamp> directories of the run that each stage writes to
+        alone. Directories shared by several stages, such as the one of the data validation
+        and the drift report, are left out.
+
+        Returns:
+            dict: The run directories of every stage, by stage name.
+        """
+        try:
+            artifact_dir = self.training_pipeline_config.artifact_dir
+            dir_owners = dict()
+            for stage in stages.values():
+                for value in stage.config:
+                    if not isinstance(value, str) or not value.startswith(artifact_dir + os.sep):
+                        continue
+                    parts = os.path.relpath(value, artifact_dir).split(os.sep)
+                    if len(parts) >= 2 and parts[1] == self.time_stamp:
+                        dir_owners.setdefault(os.path.join(artifact_dir, *parts[:2]), set()).add(stage.name)
+
+            stage_run_dir_paths = {name: [] for name in stages}
+            for dir_path, owners in dir_owners.items():
+                if len(owners) == 1:
+                    stage_run_dir_paths[owners.pop()].append(dir_path)
+            return stage_run_dir_paths
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def clear_stage_run_dirs(self, stage: PipelineStage) -> None:
+        """
+        Remove what an earlier attempt of the run left in the run directories of a stage,
+        changed or partial outputs included, before the stage runs again.
+        """
+        for dir_path in self.stage_run_dir_paths.get(stage.name, []):
+            if os.path.exists(dir_path):
+                logging.info('stage: [%s] clearing the outputs of an earlier attempt: [%s]', stage.name, dir_path)
+                shutil.rmtree(dir_path)
+
+    def restore_stage(self, stage: PipelineStage, input_fingerprint: str):
+        """
+        Restore a stage from the checkpoint manifest of the resumed run.
+
+        Args:
+            stage (PipelineStage): The stage.
+            input_fingerprint (str): The fingerprint of the current inputs of the stage.
+
+        Returns:
+            tuple: The checkpointed artifact, its fingerprint, the timestamp of the run that
+            produced it and its file fingerprints, or None if the stage has to run again.
+        """
+        try:
+            checkpoint = self.checkpoint_stages.get(stage.name)
+            if checkpoint is None:
+                return None
+            if checkpoint['input_fingerprint'] != input_fingerprint:
+                logging.info('stage: [%s] inputs changed since the checkpoint', stage.name)
+                return None
+
+            # Upstream outputs must still exist, unchanged
+            file_fingerprints = dict(checkpoint['file_fingerprints'])
+            for file_path, fingerprint in file_fingerprints.items():
+                if not os.path.isfile(file_path) or self.get_file_fingerprint(file_path) != fingerprint:
+                    logging.info('stage: [%s] file: [%s] is missing or changed since the checkpoint', stage.name, file_path)
+                    return None
+
+            artifact = artifact_from_dict(checkpoint['artifact_type'], dict(checkpoint['artifact']))
+            return artifact, checkpoint['fingerprint'], checkpoint['time_stamp'], file_fingerprints
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def run_stage(self, stage: PipelineStage, results: dict, run_started_at: float) -> StageResult:
+        """
+        Run a stage, or reuse its artifact from the checkpoint or from an earlier run with the
+        same inputs.
+
+        Args:
+            stage (PipelineStage): The stage.
+            results (dict): The results of its dependencies, by stage name.
+            run_started_at (float): The start time of the run.
+
+        Returns:
+            StageResult: The outcome of the stage.
+        """
+        try:
+            started_at = time.perf_counter()
+            input_fingerprint = self.get_input_fingerprint(
+                stage, {name: results[name].fingerprint for name in stage.dependencies}
+            )
+
+            restored = self.restore_stage(stage, input_fingerprint)
+            if restored is not None:
+                artifact, fingerprint, time_stamp, file_fingerprints = restored
+                logging.info('stage: [%s] restored from the checkpoint of run: [%s]', stage.name, self.time_stamp)
+                return StageResult(
+                    artifact, input_fingerprint, fingerprint, time_stamp, True,
+                    started_at - run_started_at, time.perf_counter() - started_at, file_fingerprints
+                )
+
+            if stage.cacheable and self.training_pipeline_config.skip_unchanged_stages:
+                cached = self.stage_cache.get(stage.name, input_fingerprint)
+                if cached is not None:
+                    artifact, time_stamp = cached
+                    logging.info('stage: [%s] is unchanged, reusing the artifact of run: [%s]', stage.name, time_stamp)
+                    return StageResult(
+                        artifact, input_fingerprint, input_fingerprint, time_stamp, True,
+                        started_at - run_started_at, time.perf_counter() - started_at,
+                        self.get_file_fingerprints(artifact)
+                    )
+
+            logging.info('stage: [%s] started', stage.name)
+            self.clear_stage_run_dirs(stage)
+            artifact = stage.run({name: results[name].artifact for name in stage.dependencies})
+            if not isinstance(artifact, stage.artifact_type):
+                raise Exception(
+                    f'stage: [{stage.name}] returned a [{type(artifact).__name__}] '
+                    f'instead of a [{stage.artifact_type.__name__}]'
+                )
+
+            if stage.cacheable:
+                fingerprint = input_fingerprint
+                self.stage_cache.put(stage.name, input_fingerprint, self.time_stamp, artifact)
+            else:
+                fingerprint = self.get_output_fingerprint(artifact, input_fingerprint)
+
+            duration = time.perf_counter() - started_at
+            logging.info('stage: [%s] completed in [%.3f] seconds', stage.name, duration)
+            return StageResult(
+                artifact, input_fingerprint, fingerprint, self.time_stamp, False,
+                started_at - run_started_at, duration, self.get_file_fingerprints(artifact)
+            )
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def load_checkpoint_manifest(self) -> dict:
+        """
+        Read the checkpoint manifest of the run.
+
+        Returns:
+            dict: The manifest.
+
+        Raises:
+            CustomException: If the run has no checkpoint manifest.
+        """
+        try:
+            checkpoint_manifest_file_path = self.training_pipeline_config.checkpoint_manifest_file_path
+            if not os.path.exists(checkpoint_manifest_file_path):
+                raise Exception(f'run: [{self.time_stamp}] has no checkpoint manifest: [{checkpoint_manifest_file_path}]')
+            return read_yaml(file_path=checkpoint_manifest_file_path)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def write_checkpoint_manifest(self, results: dict, status: str, failed_stage: str=None, error: str=None) -> None:
+        """
+        Write the artifacts of the completed stages to the checkpoint manifest of the run.
+        """
+        try:
+            write_yaml(
+                file_path=self.training_pipeline_config.checkpoint_manifest_file_path,
+                data={
+                    'run_id': self.time_stamp,
+                    'config_file_path': self.config.config_file_path,
+                    'status': status,
+                    'failed_stage': failed_stage,
+                    'error': error,
+                    'updated_at': datetime.now().isoformat(timespec='seconds'),
+                    'stages': {
+                        name: {
+                            'artifact_type': type(result.artifact).__name__,
+                            'artifact': artifact_to_dict(result.artifact),
+                            'input_fingerprint': result.input_fingerprint,
+                            'fingerprint': result.fingerprint,
+                            'time_stamp': result.time_stamp,
+                            'is_skipped': result.is_skipped,
+                            'duration': result.duration,
+                            'file_fingerprints': result.file_fingerprints
+                        }
+                        for name, result in results.items()
+                    }
+                }
+            )
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def get_critical_path_duration(stages: dict, results: dict) -> float:
+        """
+        The duration of the longest chain of dependent stages.
+        """
+        path_durations = dict()
+        for name, stage in stages.items():
+            path_durations[name] = results[name].duration + max(
+                [path_durations[dependency] for dependency in stage.dependencies], default=0.0
+            )
+        return max(path_durations.values(), default=0.0)
+
+    def run_pipeline(self, resume: bool=False) -> dict:
+        """
+        Run every stage of the pipeline, each one as soon as its dependencies are done.
+
+        Args:
+            resume (bool): Whether to resume the run from its checkpoint manifest, restoring
+                the stages it already completed.
+
+        Returns:
+            dict: The StageResult of every stage, by stage name.
+
+        Raises:
+            CustomException: If a stage fails; the stages already running are completed first
+            and the failure is recorded in the checkpoint manifest.
+        """
+        try:
+            logging.info('pipeline run: [%s] %s', self.time_stamp, 'resumed' if resume else 'started')
+            if resume:
+                self.checkpoint_stages = dict(self.load_checkpoint_manifest().get('stages') or dict())
+
+            stages = self.get_stages()
+            self.stage_run_dir_paths = self.get_stage_run_dir_paths(stages)
+            results = dict()
+            pending_stages = dict(stages)
+            running_stages = dict()
+            run_started_at = time.perf_counter()
+
+            max_workers = self.training_pipeline_config.max_workers
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pipeline') as executor:
+                while len(pending_stages) > 0 or len(running_stages) > 0:
+                    # Start every stage whose dependencies are done
+                    for name, stage in list(pending_stages.items()):
+                        if all(dependency in results for dependency in stage.dependencies):
+                            del pending_stages[name]
+                            running_stages[executor.submit(self.run_stage, stage, results, run_started_at)] = name
+
+                    if len(running_stages) == 0:
+                        raise Exception(f'stages: {list(pending_stages)} depend on stages that do not exist')
+
+                    done, _ = wait(running_stages, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = running_stages.pop(future)
+                        try:
+                            results[name] = future.result()
+                        except Exception as e:
+                            # Keep what completed, so the run can be resumed from there
+                            for running_future in running_stages:
+                                running_future.cancel()
+                            executor.shutdown(wait=True)
+                            for running_future, running_name in running_stages.items():
+                                if not running_future.cancelled() and running_future.exception() is None:
+                                    results[running_name] = running_future.result()
+                            self.write_checkpoint_manifest(results, RUN_STATUS_FAILED, failed_stage=name, error=str(e))
+                            raise
+                        self.write_checkpoint_manifest(results, RUN_STATUS_RUNNING)
+
+            self.write_checkpoint_manifest(results, RUN_STATUS_COMPLETED)
+            wall_clock_duration = time.perf_counter() - run_started_at
+            logging.info(
+                'pipeline run: [%s] completed in [%.3f] seconds, critical path: [%.3f] seconds, '
+                'sum of the stages: [%.3f] seconds, skipped stages: %s',
+                self.time_stamp,
+                wall_clock_duration,
+                self.get_critical_path_duration(stages, results),
+                sum(result.duration for result in results.values()),
+                [name for name, result in results.items() if result.is_skipped]
+            )
+            return results
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+def main(args=None) -> None:
+    """
+    Command line entry point: runs the training pipeline, or resumes a failed run with
+    `resume <run-id>`.
+    """
+    parser = argparse.ArgumentParser(description='Run the training pipeline.')
+    parser.add_argument('--config', default=CONFIG_FILE_PATH, help='the pipeline configuration file')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('run', help='start a new run')
+    resume_parser = subparsers.add_parser('resume', help='resume a run from its checkpoint manifest')
+    resume_parser.add_argument('run_id', help='the timestamp of the run')
+    arguments = parser.parse_args(args)
+
+    if arguments.command == 'resume':
+        config = Configuration(config_file_path=arguments.config, current_timestamp=arguments.run_id)
+    else:
+        config = Configuration(config_file_path=arguments.config)
+
+    results = Pipeline(config=config).run_pipeline(resume=arguments.command == 'resume')
+    for name, result in results.items():
+        status = f'reused from run {result.time_stamp}' if result.is_skipped else f'{result.duration:.3f} s'
+        print(f'{name:<20} {status}')
+
+if __name__ == '__main__':
+    main()
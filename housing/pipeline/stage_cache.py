@@ -0,0 +1,228 @@
+# housing/pipeline/stage_cache.py
+
+# Import required libraries and packages
+import os
+import sys
+import json
+import time
+import sqlite3
+import contextlib
+
+from housing.exception import CustomException
+from housing.entity import artifact_entity
+
+# Tables of the stage cache
+STAGE_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stage (
+    stage_name TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    time_stamp TEXT NOT NULL,
+    artifact_type TEXT NOT NULL,
+    artifact TEXT NOT NULL,
+    used_at REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (stage_name, fingerprint)
+);
+"""
+
+def artifact_to_dict(artifact) -> dict:
+    """
+    Convert an artifact named tuple to a dict of plain JSON and YAML values, NumPy scalars
+    included.
+    """
+    return json.loads(json.dumps(
+        artifact._asdict(), default=lambda value: value.item() if hasattr(value, 'item') else repr(value)
+    ))
+
+def artifact_to_json(artifact) -> tuple:
+    """
+    Serialize an artifact named tuple to its type name and a JSON document.
+    """
+    return type(artifact).__name__, json.dumps(artifact_to_dict(artifact), sort_keys=True)
+
+def artifact_from_dict(artifact_type: str, artifact: dict):
+    """
+    Rebuild an artifact named tuple of housing.entity.artifact_entity from its fields.
+    """
+    return getattr(artifact_entity, artifact_type)(**artifact)
+
+def artifact_from_json(artifact_type: str, artifact: str):
+    """
+    Rebuild an artifact named tuple of housing.entity.artifact_entity from its JSON document.
+    """
+    return artifact_from_dict(artifact_type, json.loads(artifact))
+
+def get_artifact_file_paths(artifact) -> list:
+    """
+    The absolute file paths an artifact refers to.
+    """
+    return sorted(
+        value for value in artifact if isinstance(value, str) and os.path.isabs(value)
+    )
+
+class StageCache:
+    """
+    Embedded SQLite store of the artifacts of pipeline stages by input fingerprint.
+
+    A stage whose configuration, code and upstream artifacts have the fingerprint of an
+    earlier run reuses the artifact of that run, as long as every file the artifact refers
+    to still exists.
+
+    Every entry records when it was last produced or reused, so the artifact retention
+    keeps the runs a pipeline may still be reading, see release_entries.
+
+    Args:
+        stage_cache_file_path (str): The file path of the SQLite database.
+        timeout (float): The number of seconds to wait for a concurrent writer.
+
+    Raises:
+        CustomException: If an error occurs while creating the cache.
+    """
+    def __init__(self, stage_cache_file_path: str, timeout: float=30.0) -> None:
+        try:
+            self.stage_cache_file_path = stage_cache_file_path
+            self.timeout = timeout
+            os.makedirs(os.path.dirname(stage_cache_file_path), exist_ok=True)
+
+            # The journal mode can only be changed outside of a transaction
+            connection = sqlite3.connect(self.stage_cache_file_path, timeout=self.timeout, isolation_level=None)
+            try:
+                connection.execute('PRAGMA journal_mode=WAL')
+                connection.executescript(STAGE_CACHE_SCHEMA)
+
+                # Caches created before entries recorded their last use
+                columns = [row[1] for row in connection.execute('PRAGMA table_info(stage)')]
+                if 'used_at' not in columns:
+                    connection.execute('ALTER TABLE stage ADD COLUMN used_at REAL NOT NULL DEFAULT 0')
+            finally:
+                connection.close()
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @contextlib.contextmanager
+    def __connect(self):
+        connection = sqlite3.connect(self.stage_cache_file_path, timeout=self.timeout)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def get(self, stage_name: str, fingerprint: str):
+        """
+        Look up the artifact a stage produced from the same inputs.
+
+        Args:
+            stage_name (str): The name of the stage.
+            fingerprint (str): The input fingerprint of the stage.
+
+        Returns:
+            tuple: The artifact and the timestamp of the run that produced it, or None if no
+            run produced it or one of its files was removed since.
+        """
+        try:
+            with self.__connect() as connection:
+                # Recording the use first makes a concurrent release_entries keep the run
+                cursor = connection.execute(
+                    'UPDATE stage SET used_at = ? WHERE stage_name = ? AND fingerprint = ?',
+                    (time.time(), stage_name, fingerprint)
+                )
+                if cursor.rowcount == 0:
+                    return None
+                row = connection.execute(
+                    'SELECT time_stamp, artifact_type, artifact FROM stage WHERE stage_name = ? AND fingerprint = ?',
+                    (stage_name, fingerprint)
+                ).fetchone()
+
+            artifact = artifact_from_json(row[1], row[2])
+            if not all(os.path.exists(file_path) for file_path in get_artifact_file_paths(artifact)):
+                return None
+            return artifact, row[0]
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def put(self, stage_name: str, fingerprint: str, time_stamp: str, artifact) -> None:
+        """
+        Record the artifact a stage produced from inputs with the given fingerprint.
+        """
+        try:
+            artifact_type, artifact_json = artifact_to_json(artifact)
+            with self.__connect() as connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO stage (stage_name, fingerprint, time_stamp, artifact_type, artifact, used_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (stage_name, fingerprint, time_stamp, artifact_type, artifact_json, time.time())
+                )
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_used_file_paths(self, used_since: float) -> set:
+        """
+        The files of the entries produced or reused since the given time.
+
+        Args:
+            used_since (float): The time, in seconds since the epoch.
+
+        Returns:
+            set: The absolute file paths the recently used artifacts refer to.
+        """
+        try:
+            with self.__connect() as connection:
+                rows = connection.execute(
+                    'SELECT artifact_type, artifact FROM stage WHERE used_at >= ?', (used_since,)
+                ).fetchall()
+            return set(
+                file_path for artifact_type, artifact in rows
+                for file_path in get_artifact_file_paths(artifact_from_json(artifact_type, artifact))
+            )
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def release_entries(self, dir_paths: list, used_before: float) -> bool:
+        """
+        Remove the entries whose artifacts refer to files below the given directories, before
+        the directories are removed, unless one of them was used since the given time.
+
+        The check and the removal happen in one write transaction, which get also takes to
+        record a use: a pipeline either reuses an entry before, and the directories are kept,
+        or does not find it after, and runs the stage again.
+
+        Args:
+            dir_paths (list): The directories about to be removed.
+            used_before (float): The time, in seconds since the epoch, an entry must not have
+                been used since.
+
+        Returns:
+            bool: Whether the directories can be removed.
+        """
+        try:
+            def is_below(file_path: str) -> bool:
+                return any(file_path.startswith(dir_path + os.sep) for dir_path in dir_paths)
+
+            connection = sqlite3.connect(self.stage_cache_file_path, timeout=self.timeout, isolation_level=None)
+            try:
+                connection.execute('BEGIN IMMEDIATE')
+                try:
+                    released_keys = []
+                    rows = connection.execute(
+                        'SELECT stage_name, fingerprint, artifact_type, artifact, used_at FROM stage'
+                    ).fetchall()
+                    for stage_name, fingerprint, artifact_type, artifact, used_at in rows:
+                        file_paths = get_artifact_file_paths(artifact_from_json(artifact_type, artifact))
+                        if not any(is_below(file_path) for file_path in file_paths):
+                            continue
+                        if used_at >= used_before:
+                            connection.execute('ROLLBACK')
+                            return False
+                        released_keys.append((stage_name, fingerprint))
+
+                    connection.executemany('DELETE FROM stage WHERE stage_name = ? AND fingerprint = ?', released_keys)
+                    connection.execute('COMMIT')
+                    return True
+                except BaseException:
+                    if connection.in_transaction:
+                        connection.execute('ROLLBACK')
+                    raise
+            finally:
+                connection.close()
+        except Exception as e:
+            raise CustomException(e, sys) from e
@@ -0,0 +1 @@
+# housing/serving/__init__.py
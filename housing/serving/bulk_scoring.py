@@ -0,0 +1,278 @@
+# housing/serving/bulk_scoring.py
+
+# Import required libraries and packages
+import os
+import sys
+import time
+import argparse
+import tempfile
+import collections
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+from housing.constant import *
+from housing.logger import logging
+from housing.exception import CustomException
+from housing.util import load_dataset_schema, get_new_file_mode
+from housing.serving.input_validation import InvalidInputError
+from housing.serving.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Name of the column holding the predictions in the scored output
+PREDICTION_COLUMN = 'prediction'
+
+# A named tuple that represents the outcome of a bulk scoring run.
+#
+# Attributes:
+#     row_count (int): The number of scored rows.
+#     invalid_row_count (int): The number of rows that failed validation and got no prediction.
+#     model_version (str): The version of the model that scored the rows.
+BulkScoringSummary = namedtuple('BulkScoringSummary', ['row_count', 'invalid_row_count', 'model_version'])
+
+class BulkScorer:
+    """
+    Scores CSV inputs of any size in fixed-size chunks.
+
+    Chunks are read one after the other and predicted in parallel, with at most twice the
+    number of workers chunks in flight, so memory stays bounded by the chunk size whatever the
+    size of the input. Predictions are produced in input order. Rows with a value outside the
+    schema, an unparsable number or a category outside its domain, get an empty prediction
+    instead of failing the run.
+
+    Args:
+        housing_model (HousingEstimatorModel): The model to score with.
+        schema_file_path (str): The file path of the dataset schema.
+        chunk_size (int): The number of rows per chunk.
+        workers (int): The number of chunks predicted in parallel, 0 for one per CPU.
+        model_version (str, optional): The version of the model, reported in the summary.
+        include_input (bool): Whether to write the input columns next to the predictions.
+
+    Raises:
+        CustomException: If an error occurs while initializing the scorer.
+    """
+    def __init__(
+        self,
+        housing_model,
+        schema_file_path: str,
+        chunk_size: int=100000,
+        workers: int=0,
+        model_version: str=None,
+        include_input: bool=False
+    ) -> None:
+        try:
+            self.housing_model = housing_model
+            self.chunk_size = chunk_size
+            self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+            self.model_version = model_version
+            self.include_input = include_input
+
+            dataset_schema = load_dataset_schema(schema_file_path)
+            self.numerical_columns = list(dataset_schema.numerical_columns)
+            self.categorical_columns = list(dataset_schema.categorical_columns)
+            self.input_columns = list(dataset_schema.input_columns)
+            self.domain_values = dataset_schema.domain_values
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def read_chunks(self, input_file):
+        """
+        Reads the input CSV in chunks of chunk_size rows.
+
+        Args:
+            input_file (str or file-like): The input CSV.
+
+        Yields:
+            pd.DataFrame: The next chunk.
+        """
+        try:
+            dtype = {column: 'object' for column in self.categorical_columns}
+            with pd.read_csv(input_file, chunksize=self.chunk_size, dtype=dtype) as reader:
+                for chunk in reader:
+                    yield chunk
+        except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+            raise InvalidInputError(f'malformed CSV input: {e}') from e
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def validate_chunk(self, chunk: pd.DataFrame) -> tuple:
+        """
+        Validates a chunk against the schema.
+
+        Returns:
+            tuple: The chunk with numerical columns parsed and the boolean mask of its valid rows.
+
+        Raises:
+            CustomException: If a column of the schema is missing, raised from an InvalidInputError.
+        """
+        try:
+            missing_columns = [column for column in self.input_columns if column not in chunk.columns]
+            if len(missing_columns) > 0:
+                raise InvalidInputError(f'columns: {missing_columns} of the schema are missing from the input')
+
+            is_valid = np.ones(len(chunk), dtype=bool)
+            chunk = chunk.copy()
+            for column in self.numerical_columns:
+                if not pd.api.types.is_numeric_dtype(chunk[column]):
+                    parsed = pd.to_numeric(chunk[column], errors='coerce')
+                    is_valid &= ~(parsed.isna() & chunk[column].notna()).to_numpy()
+                    chunk[column] = parsed
+            for column, domain in self.domain_values.items():
+                if column in chunk.columns:
+                    is_valid &= (chunk[column].isin(domain) | chunk[column].isna()).to_numpy()
+            return chunk, is_valid
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def score_chunk(self, chunk: pd.DataFrame) -> tuple:
+        """
+        Validates and predicts a chunk.
+
+        Returns:
+            tuple: The scored chunk and its number of invalid rows.
+        """
+        try:
+            timed = metrics.enabled
+            if timed:
+                start_time = time.perf_counter()
+            chunk, is_valid = self.validate_chunk(chunk)
+            if timed:
+                metrics.observe_stage('validate', time.perf_counter() - start_time)
+
+            predictions = np.full(len(chunk), np.nan)
+            if is_valid.any():
+                predictions[is_valid] = self.housing_model.predict(chunk.loc[is_valid, self.input_columns])
+
+            scored_chunk = chunk.copy() if self.include_input else pd.DataFrame(index=chunk.index)
+            scored_chunk[PREDICTION_COLUMN] = predictions
+            return scored_chunk, int((~is_valid).sum())
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def score(self, input_file):
+        """
+        Scores the input chunk by chunk, predicting several chunks in parallel.
+
+        Args:
+            input_file (str or file-like): The input CSV.
+
+        Yields:
+            tuple: The next scored chunk, in input order, and its number of invalid rows.
+        """
+        try:
+            max_in_flight = 2 * self.workers
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='bulk-scoring') as executor:
+                in_flight = collections.deque()
+                for chunk in self.read_chunks(input_file):
+                    in_flight.append(executor.submit(self.score_chunk, chunk))
+                    if len(in_flight) >= max_in_flight:
+                        yield in_flight.popleft().result()
+                while len(in_flight) > 0:
+                    yield in_flight.popleft().result()
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def iter_csv(self, input_file, summary: dict=None):
+        """
+        Scores the input and produces the output CSV as a stream of text blocks.
+
+        Args:
+            input_file (str or file-like): The input CSV.
+            summary (dict, optional): Filled with the fields of BulkScoringSummary while scoring.
+
+        Yields:
+            str: The next block of the output CSV, the first one starting with the header.
+        """
+        try:
+            summary = summary if summary is not None else dict()
+            summary.update(row_count=0, invalid_row_count=0, model_version=self.model_version)
+            is_first_chunk = True
+            for scored_chunk, invalid_row_count in self.score(input_file):
+                summary['row_count'] += len(scored_chunk)
+                summary['invalid_row_count'] += invalid_row_count
+                yield scored_chunk.to_csv(index=False, header=is_first_chunk)
+                is_first_chunk = False
+            if is_first_chunk:
+                yield f'{PREDICTION_COLUMN}\n'
+            logger.info('bulk scoring summary: [%s]', BulkScoringSummary(**summary))
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def score_file(self, input_file, output_file_path: str) -> BulkScoringSummary:
+        """
+        Scores the input into an output CSV file, which only appears once it is complete.
+
+        Args:
+            input_file (str or file-like): The input CSV.
+            output_file_path (str): The file path of the output CSV.
+
+        Returns:
+            BulkScoringSummary: The outcome of the run.
+        """
+        try:
+            summary = dict()
+            output_dir_path = os.path.dirname(os.path.abspath(output_file_path))
+            os.makedirs(output_dir_path, exist_ok=True)
+            file_descriptor, temp_file_path = tempfile.mkstemp(dir=output_dir_path, suffix='.tmp')
+            try:
+                with os.fdopen(file_descriptor, 'w', newline='') as output_file:
+                    for block in self.iter_csv(input_file, summary=summary):
+                        output_file.write(block)
+                os.chmod(temp_file_path, get_new_file_mode(output_file_path))
+                os.replace(temp_file_path, output_file_path)
+            except Exception:
+                os.remove(temp_file_path)
+                raise
+            return BulkScoringSummary(**summary)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+def main(args=None) -> None:
+    """
+    Command line entry point: scores a CSV file with the current pushed model or a given model file.
+    """
+    from housing.config import Configuration
+    from housing.util import load_object
+    from housing.serving.model_loader import HotReloadingModel
+
+    serving_config = Configuration().serving_config()
+    parser = argparse.ArgumentParser(description='Score a CSV file of housing records in bulk.')
+    parser.add_argument('input_file', help="input CSV file, '-' for standard input")
+    parser.add_argument('output_file', help="output CSV file, '-' for standard output")
+    parser.add_argument('--model-file', help='model file to score with, defaults to the current pushed model')
+    parser.add_argument('--chunk-size', type=int, default=serving_config.bulk_chunk_size)
+    parser.add_argument('--workers', type=int, default=serving_config.bulk_workers)
+    parser.add_argument('--include-input', action='store_true', help='write the input columns next to the predictions')
+    arguments = parser.parse_args(args)
+
+    if arguments.model_file is not None:
+        model_version, housing_model = arguments.model_file, load_object(file_path=arguments.model_file)
+    else:
+        model_loader = HotReloadingModel(
+            export_dir_path=serving_config.export_dir_path,
+            use_flat_forest=serving_config.use_flat_forest
+        )
+        model_loader.reload()
+        model_version, housing_model = model_loader.get_model()
+        if housing_model is None:
+            parser.error(f'no model is published in: [{serving_config.export_dir_path}]')
+
+    bulk_scorer = BulkScorer(
+        housing_model=housing_model,
+        schema_file_path=serving_config.schema_file_path,
+        chunk_size=arguments.chunk_size,
+        workers=arguments.workers,
+        model_version=model_version,
+        include_input=arguments.include_input
+    )
+    input_file = sys.stdin if arguments.input_file == '-' else arguments.input_file
+    if arguments.output_file == '-':
+        for block in bulk_scorer.iter_csv(input_file):
+            sys.stdout.write(block)
+    else:
+        print(bulk_scorer.score_file(input_file, arguments.output_file), file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+# housing/serving/bundle_runtime.py
+
+# Import required libraries and packages
+import sys
+import numpy as np
+
+from housing.exception import CustomException
+from housing.serving.flat_forest import FlatForest
+
+class InferenceBundle:
+    """
+    NumPy-only runtime of a compact inference bundle.
+
+    A bundle holds the fitted preprocessing constants and the model parameters as flat arrays
+    in one .npz file, so predicting needs neither sklearn, pandas nor dill. The runtime
+    reproduces the transformation of the housing preprocessing pipeline: median imputation,
+    generated ratio features and standard scaling of numerical columns, most frequent
+    imputation, one-hot encoding and scaling of categorical columns.
+
+    Args:
+        arrays (dict): The arrays of the bundle.
+
+    Raises:
+        CustomException: If the bundle is malformed.
+    """
+    def __init__(self, arrays: dict) -> None:
+        try:
+            self.arrays = arrays
+            self.dtype = np.dtype(str(arrays['dtype']))
+            self.model_type = str(arrays['model_type'])
+            self.numerical_columns = [str(column) for column in arrays['num_columns']]
+            self.categorical_columns = [str(column) for column in arrays['cat_columns']]
+            self.categories = [arrays[f'cat_categories_{index}'] for index in range(len(self.categorical_columns))]
+            self.columns = self.numerical_columns + self.categorical_columns
+
+            self.flat_forest = None
+            if self.model_type == 'forest':
+                self.flat_forest = FlatForest.from_arrays(
+                    feature=arrays['tree_feature'],
+                    threshold=arrays['tree_threshold'],
+                    children_left=arrays['tree_children_left'],
+                    children_right=arrays['tree_children_right'],
+                    value=arrays['tree_value'],
+                    offsets=arrays['tree_offsets']
+                )
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @classmethod
+    def load(cls, file_path: str) -> 'InferenceBundle':
+        """
+        Load a bundle from an .npz file.
+
+        Args:
+            file_path (str): The file path of the bundle.
+
+        Returns:
+            InferenceBundle: The loaded bundle.
+        """
+        try:
+            with np.load(file_path, allow_pickle=False) as bundle_file:
+                return cls(dict(bundle_file))
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def predict_records(self, records: list) -> np.array:
+        """
+        Predict a list of records, each a dict mapping column names to values.
+        """
+        try:
+            return self.predict_columns({column: [record.get(column) for record in records] for column in self.columns})
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def predict_columns(self, columns: dict) -> np.array:
+        """
+        Predict a batch given as a dict mapping column names to sequences of values.
+
+        Args:
+            columns (dict): The input values of every column of the schema.
+
+        Returns:
+            np.array: The predicted values.
+        """
+        try:
+            return self.predict_transformed(self.transform(columns))
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def transform(self, columns: dict) -> np.array:
+        """
+        Apply the bundled preprocessing to a batch of input columns.
+        """
+        try:
+            arrays = self.arrays
+
+            # Numerical block
+            X = np.column_stack([
+                np.asarray(columns[column], dtype=np.float64) for column in self.numerical_columns
+            ])
+            missing = np.isnan(X)
+            if missing.any():
+                X[missing] = np.take(arrays['num_impute'], np.nonzero(missing)[1])
+            if bool(arrays['num_generate_features']):
+                total_rooms_ix, population_ix, households_ix, total_bedrooms_ix = arrays['num_generator_ix']
+                generated = [
+                    X[:, total_rooms_ix] / X[:, households_ix],
+                    X[:, population_ix] / X[:, households_ix]
+                ]
+                if bool(arrays['num_add_bedrooms_per_room']):
+                    generated.append(X[:, total_bedrooms_ix] / X[:, total_rooms_ix])
+                X = np.column_stack([X] + generated)
+            X -= arrays['num_mean']
+            X /= arrays['num_scale']
+
+            # Categorical block
+            encoded_blocks = []
+            for index, column in enumerate(self.categorical_columns):
+                values = np.asarray(columns[column], dtype=object)
+                missing = np.array([value is None or value != value for value in values], dtype=bool)
+                if missing.any():
+                    values = values.copy()
+                    values[missing] = arrays['cat_impute'][index]
+                values = values.astype(str)
+                categories = self.categories[index]
+                positions = np.searchsorted(categories, values)
+                positions = np.minimum(positions, len(categories) - 1)
+                unknown = categories[positions] != values
+                if unknown.any():
+                    raise Exception(f'unknown categories: {sorted(set(values[unknown]))} in column: [{column}]')
+                one_hot = np.zeros((len(values), len(categories)), dtype=self.dtype)
+                one_hot[np.arange(len(values)), positions] = 1
+                encoded_blocks.append(one_hot)
+            if len(encoded_blocks) > 0:
+                encoded = np.hstack(encoded_blocks) / arrays['cat_scale']
+                X = np.hstack([X, encoded])
+
+            return X.astype(self.dtype, copy=False)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def predict_transformed(self, X) -> np.array:
+        """
+        Apply the bundled model to transformed features.
+        """
+        try:
+            arrays = self.arrays
+            if self.model_type == 'linear':
+                return X @ arrays['coef'] + arrays['intercept']
+
+            if self.model_type == 'forest':
+                return self.flat_forest.predict(X)
+
+            raise Exception(f'unsupported model type: [{self.model_type}]')
+        except Exception as e:
+            raise CustomException(e, sys) from e
@@ -0,0 +1,125 @@
+# housing/serving/compact_forest.py
+
+# Import required libraries and packages
+import sys
+import numpy as np
+
+from housing.exception import CustomException
+from housing.serving.flat_forest import FlatForest
+
+class CompactForestRegressor:
+    """
+    Compact, prediction-only replacement of a fitted regression forest.
+
+    The nodes of all trees are kept in the concatenated sklearn layout, but with narrow types:
+    int16 split features, float32 thresholds, int32 children and float32 values, or leaf values
+    quantized to 8 or 16 bit codes of a uniform grid. Predictions run on the flat forest engine,
+    which is built on first use and not pickled.
+
+    Args:
+        feature (np.array): The split feature of every node.
+        threshold (np.array): The float32 split threshold of every node.
+        children_left (np.array): The left child of every node, -1 for leaves.
+        children_right (np.array): The right child of every node, -1 for leaves.
+        offsets (np.array): The first node of every tree, followed by the total number of nodes.
+        value (np.array): The float32 value of every node, or its quantization code.
+        value_offset (float): The value of code 0 for quantized values.
+        value_scale (float): The step between two codes for quantized values, None if values are not quantized.
+        n_features_in_ (int): The number of features the forest was trained on.
+
+    Raises:
+        CustomException: If an error occurs while initializing the forest.
+    """
+    def __init__(
+        self,
+        feature,
+        threshold,
+        children_left,
+        children_right,
+        offsets,
+        value,
+        value_offset: float=0.0,
+        value_scale: float=None,
+        n_features_in_: int=None
+    ) -> None:
+        try:
+            feature_dtype = np.int16 if n_features_in_ is not None and n_features_in_ <= np.iinfo(np.int16).max else np.int32
+            self.feature = np.ascontiguousarray(feature, dtype=feature_dtype)
+            self.threshold = np.ascontiguousarray(threshold, dtype=np.float32)
+            self.children_left = np.ascontiguousarray(children_left, dtype=np.int32)
+            self.children_right = np.ascontiguousarray(children_right, dtype=np.int32)
+            self.offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+            self.value = np.ascontiguousarray(value) if value_scale is not None else np.ascontiguousarray(value, dtype=np.float32)
+            self.value_offset = float(value_offset)
+            self.value_scale = None if value_scale is None else float(value_scale)
+            self.n_features_in_ = n_features_in_
+            self._flat_forest = None
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @property
+    def node_count(self) -> int:
+        return len(self.feature)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The memory taken by the node arrays.
+        """
+        return sum(array.nbytes for array in (
+            self.feature, self.threshold, self.children_left, self.children_right, self.offsets, self.value
+        ))
+
+    def get_node_values(self) -> np.array:
+        """
+        The value of every node, decoded from its quantization code if values are quantized.
+        """
+        if self.value_scale is None:
+            return self.value.astype(np.float64)
+        return self.value_offset + self.value_scale * self.value.astype(np.float64)
+
+    def get_node_arrays(self) -> dict:
+        """
+        The node arrays in the layout of FlatForest.flatten_trees.
+        """
+        return {
+            'feature': self.feature.astype(np.int64),
+            'threshold': self.threshold,
+            'children_left': self.children_left.astype(np.int64),
+            'children_right': self.children_right.astype(np.int64),
+            'value': self.get_node_values(),
+            'offsets': self.offsets
+        }
+
+    def get_params(self, deep: bool=True) -> dict:
+        # A compacted forest cannot be refitted or warm started
+        return {}
+
+    def predict(self, X) -> np.array:
+        """
+        Predict with all trees, averaging their predictions.
+
+        Args:
+            X (array-like): The transformed features.
+
+        Returns:
+            np.array: The predicted values.
+        """
+        try:
+            if self._flat_forest is None:
+                self._flat_forest = FlatForest.from_arrays(**self.get_node_arrays())
+            return self._flat_forest.predict(X)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def __getstate__(self) -> dict:
+        # The engine is rebuilt from the node arrays after unpickling
+        state = self.__dict__.copy()
+        state['_flat_forest'] = None
+        return state
+
+    def __repr__(self) -> str:
+        return (
+            f'CompactForestRegressor(n_trees={len(self.offsets) - 1}, node_count={self.node_count}, '
+            f'quantized={self.value_scale is not None})'
+        )
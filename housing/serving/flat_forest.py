@@ -0,0 +1,285 @@
+# housing/serving/flat_forest.py
+
+# Import required libraries and packages
+import sys
+import time
+import argparse
+import numpy as np
+
+from housing.exception import CustomException
+
+# Marker of leaf nodes in the child arrays of sklearn trees
+TREE_LEAF = -1
+
+# Number of levels descended between checks whether every row has reached a leaf
+LEAF_CHECK_INTERVAL = 4
+
+class FlatForest:
+    """
+    Vectorized inference engine for fitted random forests, extra trees and decision trees.
+
+    All trees are flattened into contiguous node arrays: feature, threshold, left and right
+    child, and leaf value. Leaves point to themselves, so every (tree, row) pair can descend
+    one level per step with the same gather and compare, and all trees are evaluated over the
+    whole batch at once. Features are compared in float32 against float64 thresholds and tree
+    predictions are summed in tree order before dividing by the number of trees, exactly as
+    sklearn does, so predictions are bit-identical to the estimator.
+
+    Args:
+        feature (np.array): The split feature of every node.
+        threshold (np.array): The split threshold of every node.
+        children_left (np.array): The left child of every node, the node itself for leaves.
+        children_right (np.array): The right child of every node, the node itself for leaves.
+        value (np.array): The prediction of every node.
+        roots (np.array): The root node of every tree.
+        max_depth (int): The depth of the deepest tree.
+
+    Raises:
+        CustomException: If the arrays are inconsistent.
+    """
+    def __init__(self, feature, threshold, children_left, children_right, value, roots, max_depth: int) -> None:
+        try:
+            self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+            self.threshold = np.ascontiguousarray(threshold)
+            self.children_left = np.ascontiguousarray(children_left, dtype=np.int32)
+            self.children_right = np.ascontiguousarray(children_right, dtype=np.int32)
+            self.value = np.ascontiguousarray(value)
+            self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+            self.max_depth = int(max_depth)
+            self.is_leaf = self.children_left == np.arange(len(self.children_left))
+            if not (len(self.feature) == len(self.threshold) == len(self.children_left)
+                    == len(self.children_right) == len(self.value)):
+                raise Exception('node arrays of the flat forest have different lengths')
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @classmethod
+    def from_arrays(cls, feature, threshold, children_left, children_right, value, offsets) -> 'FlatForest':
+        """
+        Build the engine from concatenated sklearn node arrays.
+
+        Args:
+            children_left (np.array): The left child of every node, offset into the concatenated arrays, -1 for leaves.
+            children_right (np.array): The right child of every node, offset into the concatenated arrays, -1 for leaves.
+            offsets (np.array): The first node of every tree, followed by the total number of nodes.
+
+        Returns:
+            FlatForest: The engine.
+        """
+        try:
+            children_left = np.asarray(children_left)
+            children_right = np.asarray(children_right)
+            node_index = np.arange(len(children_left))
+            is_leaf = children_left == TREE_LEAF
+
+            # Depth of the deepest tree, walking all trees one level at a time
+            max_depth = 0
+            frontier = np.asarray(offsets)[:-1]
+            while True:
+                frontier = frontier[~is_leaf[frontier]]
+                if len(frontier) == 0:
+                    break
+                frontier = np.concatenate([children_left[frontier], children_right[frontier]])
+                max_depth += 1
+
+            return cls(
+                feature=np.where(is_leaf, 0, feature),
+                threshold=np.where(is_leaf, 0, threshold),
+                children_left=np.where(is_leaf, node_index, children_left),
+                children_right=np.where(is_leaf, node_index, children_right),
+                value=value,
+                roots=np.asarray(offsets)[:-1],
+                max_depth=max_depth
+            )
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def flatten_trees(model) -> dict:
+        """
+        Concatenate the node arrays of a fitted RandomForestRegressor, ExtraTreesRegressor,
+        DecisionTreeRegressor or CompactForestRegressor, keeping the sklearn layout: children are offset into the
+        concatenated arrays and leaves have -1 children.
+
+        Returns:
+            dict: The feature, threshold, children_left, children_right, value and offsets arrays.
+
+        Raises:
+            CustomException: If the model is not a single output regression forest or tree.
+        """
+        try:
+            # Compacted forests already hold their concatenated node arrays
+            if type(model).__name__ == 'CompactForestRegressor':
+                return model.get_node_arrays()
+
+            if hasattr(model, 'estimators_') and type(model).__name__ in ('RandomForestRegressor', 'ExtraTreesRegressor'):
+                trees = [estimator.tree_ for estimator in model.estimators_]
+            elif hasattr(model, 'tree_') and type(model).__name__ in ('DecisionTreeRegressor', 'ExtraTreeRegressor'):
+                trees = [model.tree_]
+            else:
+                raise Exception(f'unsupported model: [{type(model).__name__}]')
+            if any(tree.n_outputs != 1 for tree in trees):
+                raise Exception('only single output trees are supported')
+
+            offsets = np.cumsum([0] + [tree.node_count for tree in trees]).astype(np.int64)
+            children_left, children_right = [], []
+            for offset, tree in zip(offsets, trees):
+                # Child indexes are shifted to address the concatenated node arrays
+                is_leaf = tree.children_left == TREE_LEAF
+                children_left.append(np.where(is_leaf, TREE_LEAF, tree.children_left + offset))
+                children_right.append(np.where(is_leaf, TREE_LEAF, tree.children_right + offset))
+
+            return {
+                'feature': np.concatenate([tree.feature for tree in trees]).astype(np.int64),
+                'threshold': np.concatenate([tree.threshold for tree in trees]),
+                'children_left': np.concatenate(children_left).astype(np.int64),
+                'children_right': np.concatenate(children_right).astype(np.int64),
+                'value': np.concatenate([tree.value[:, 0, 0] for tree in trees]).astype(np.float64),
+                'offsets': offsets
+            }
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @classmethod
+    def from_estimator(cls, model) -> 'FlatForest':
+        """
+        Flatten a fitted RandomForestRegressor, ExtraTreesRegressor or DecisionTreeRegressor.
+
+        Returns:
+            FlatForest: The engine.
+        """
+        try:
+            return cls.from_arrays(**cls.flatten_trees(model))
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The memory taken by the node arrays.
+        """
+        return sum(array.nbytes for array in (
+            self.feature, self.threshold, self.children_left, self.children_right, self.value, self.roots, self.is_leaf
+        ))
+
+    def apply(self, X) -> np.array:
+        """
+        Find the leaf every tree assigns to every row.
+
+        Args:
+            X (array-like): The transformed features.
+
+        Returns:
+            np.array: The leaf node of every tree and row, of shape (n_trees, n_rows).
+        """
+        try:
+            # Trees split on float32 features, as sklearn does
+            X = np.ascontiguousarray(X, dtype=np.float32)
+            n_rows, n_features = X.shape
+            row_offsets = np.arange(n_rows, dtype=np.intp) * n_features
+            flat_X = X.ravel()
+
+            node = np.repeat(self.roots[:, np.newaxis], n_rows, axis=1)
+            for level in range(self.max_depth):
+                if level % LEAF_CHECK_INTERVAL == 0 and self.is_leaf[node].all():
+                    break
+                go_left = flat_X[row_offsets + self.feature[node]] <= self.threshold[node]
+                node = np.where(go_left, self.children_left[node], self.children_right[node])
+            return node
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def predict(self, X) -> np.array:
+        """
+        Predict with all trees, averaging their predictions like sklearn.
+
+        Args:
+            X (array-like): The transformed features.
+
+        Returns:
+            np.array: The predicted values.
+        """
+        try:
+            leaf_value = self.value[self.apply(X)]
+
+            # Tree predictions are accumulated one tree after the other, in the order sklearn uses
+            prediction = np.zeros(leaf_value.shape[1], dtype=np.float64)
+            for tree_value in leaf_value:
+                prediction += tree_value
+            prediction /= self.n_trees
+            return prediction
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def check_parity(self, model, X) -> None:
+        """
+        Verify that the engine predicts exactly what the estimator predicts.
+
+        A forest predicting with several jobs sums its trees in the order the threads finish,
+        so only for those the predictions may differ by the rounding of the summation order.
+
+        Args:
+            model (object): The estimator the engine was built from.
+            X (array-like): The transformed features to compare on.
+
+        Raises:
+            CustomException: If any prediction differs.
+        """
+        try:
+            expected = np.asarray(model.predict(X), dtype=np.float64)
+            predicted = self.predict(X)
+            allowed_difference = 0.0
+            if getattr(model, 'n_jobs', None) not in (None, 1):
+                allowed_difference = np.finfo(np.float64).eps * self.n_trees * np.abs(self.value).max()
+            mismatch_count = int(np.sum(np.abs(expected - predicted) > allowed_difference))
+            if mismatch_count > 0:
+                raise Exception(
+                    f'flat forest differs from [{type(model).__name__}] on [{mismatch_count}] of [{len(expected)}] rows, '
+                    f'max difference: [{np.max(np.abs(expected - predicted))}]'
+                )
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+def main(args=None) -> None:
+    """
+    Command line entry point: checks the parity of the flat forest with a saved model on a CSV
+    file and compares their latency per batch size.
+    """
+    import pandas as pd
+    from housing.util import load_object
+
+    parser = argparse.ArgumentParser(description='Check and benchmark the flat forest engine against a saved model.')
+    parser.add_argument('model_file', help='dill-pickled HousingEstimatorModel')
+    parser.add_argument('input_file', help='CSV file of input records')
+    parser.add_argument('--batch-sizes', default='1,10,100,1000')
+    parser.add_argument('--repeat', type=int, default=20)
+    arguments = parser.parse_args(args)
+
+    housing_model = load_object(file_path=arguments.model_file)
+    dataframe = pd.read_csv(arguments.input_file)
+    X = housing_model.preprocessing_object.transform(dataframe)
+    if housing_model.dtype is not None:
+        X = X.astype(housing_model.dtype, copy=False)
+
+    model = housing_model.trained_model_object
+    flat_forest = FlatForest.from_estimator(model)
+    flat_forest.check_parity(model, X)
+    print(f'parity: {len(X)} rows match, {flat_forest.n_trees} trees, '
+          f'max depth {flat_forest.max_depth}, {flat_forest.nbytes / 2 ** 20:.1f} MiB of node arrays')
+
+    for batch_size in [int(size) for size in arguments.batch_sizes.split(',')]:
+        batch = X[:batch_size]
+        timings = []
+        for predict in (model.predict, flat_forest.predict):
+            start_time = time.perf_counter()
+            for _ in range(arguments.repeat):
+                predict(batch)
+            timings.append((time.perf_counter() - start_time) / arguments.repeat * 1000)
+        print(f'batch {len(batch):>6}: sklearn {timings[0]:8.3f} ms, flat forest {timings[1]:8.3f} ms')
+
+if __name__ == '__main__':
+    main()
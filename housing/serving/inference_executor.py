@@ -0,0 +1,96 @@
+# housing/serving/inference_executor.py
+
+# Import required libraries and packages
+import os
+import sys
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from housing.exception import CustomException
+
+class QueueFullError(Exception):
+    """
+    Raised when a call is refused because too many calls are already waiting for a worker.
+    """
+
+class InferenceExecutor:
+    """
+    Bounded thread pool that runs model calls on behalf of an event loop, with backpressure.
+
+    At most `workers` calls run at a time. Calls beyond that wait for a worker, and once
+    max_queue_depth calls are waiting, new ones are refused right away with QueueFullError
+    instead of piling up. Every call has a deadline: if it has not completed by then, the
+    caller gets asyncio.TimeoutError, while a call already running on a worker finishes in
+    the background and only then frees its worker.
+
+    Args:
+        workers (int): The number of model calls run in parallel, 0 for one per CPU.
+        max_queue_depth (int): The maximum number of calls waiting for a worker.
+
+    Raises:
+        CustomException: If an error occurs while initializing the executor.
+    """
+    def __init__(self, workers: int=0, max_queue_depth: int=1024) -> None:
+        try:
+            self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+            self.max_queue_depth = max_queue_depth
+            self.waiting = 0
+            self.running = 0
+            self.__executor = None
+            self.__semaphore = None
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def start(self) -> None:
+        """
+        Creates the thread pool, from the event loop that will submit to it.
+        """
+        self.__executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='inference')
+        self.__semaphore = asyncio.Semaphore(self.workers)
+
+    def shutdown(self) -> None:
+        """
+        Waits for the running calls and stops the thread pool.
+        """
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True)
+            self.__executor = None
+
+    async def run(self, function, *args, deadline: float):
+        """
+        Runs function(*args) on a worker and waits for its result until the deadline.
+
+        Args:
+            function (callable): The function to run.
+            deadline (float): The time of the event loop clock by which the result is needed.
+
+        Returns:
+            The result of the function.
+
+        Raises:
+            QueueFullError: If max_queue_depth calls are already waiting for a worker.
+            asyncio.TimeoutError: If the result is not available by the deadline.
+        """
+        loop = asyncio.get_running_loop()
+        if self.waiting >= self.max_queue_depth:
+            raise QueueFullError(f'{self.waiting} calls are waiting for an inference worker')
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self.__semaphore.acquire(), timeout=max(deadline - loop.time(), 0))
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        future = loop.run_in_executor(self.__executor, function, *args)
+        future.add_done_callback(self.__release)
+
+        # The worker cannot be interrupted, a call past its deadline keeps its worker until it returns
+        return await asyncio.wait_for(asyncio.shield(future), timeout=max(deadline - loop.time(), 0))
+
+    def __release(self, future) -> None:
+        # Retrieve the outcome so a call abandoned at its deadline does not log an unretrieved exception
+        if not future.cancelled():
+            future.exception()
+        self.running -= 1
+        self.__semaphore.release()
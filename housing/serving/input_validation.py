@@ -0,0 +1,83 @@
+# housing/serving/input_validation.py
+
+# Import required libraries and packages
+import sys
+import numbers
+
+from housing.exception import CustomException
+from housing.util import load_dataset_schema
+
+class InvalidInputError(ValueError):
+    """
+    Raised when the input of a request does not match the dataset schema.
+
+    Its message only describes the input, so it is safe to return to the client.
+    """
+
+def find_invalid_input_error(error: BaseException) -> InvalidInputError:
+    """
+    Finds the InvalidInputError an error was raised from, through the CustomException wrappers.
+
+    Args:
+        error (BaseException): The error raised while serving a request.
+
+    Returns:
+        InvalidInputError: The input error, or None if the error is an internal failure.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, InvalidInputError):
+            return error
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return None
+
+class RecordValidator:
+    """
+    Validates the records of a prediction request against the dataset schema.
+
+    Missing fields are imputed by the model like missing values, so only the values given
+    are checked: numerical fields must be numbers or null, categorical fields must be null or
+    one of the values of their domain.
+
+    Args:
+        schema_file_path (str): The file path of the dataset schema.
+
+    Raises:
+        CustomException: If the schema cannot be loaded.
+    """
+    def __init__(self, schema_file_path: str) -> None:
+        try:
+            dataset_schema = load_dataset_schema(schema_file_path)
+            self.numerical_columns = tuple(dataset_schema.numerical_columns)
+            self.categorical_columns = tuple(dataset_schema.categorical_columns)
+            self.domain_values = dataset_schema.domain_values
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def validate(self, records: list) -> None:
+        """
+        Checks every record of a request.
+
+        Args:
+            records (list): The records, each a dict mapping column names to values.
+
+        Raises:
+            InvalidInputError: Describing the first invalid value, by record index.
+        """
+        for index, record in enumerate(records):
+            for column in self.numerical_columns:
+                value = record.get(column)
+                if value is not None and (isinstance(value, bool) or not isinstance(value, numbers.Real)):
+                    raise InvalidInputError(f'record [{index}]: column [{column}] expects a number, got: {value!r}')
+            for column in self.categorical_columns:
+                value = record.get(column)
+                if value is None:
+                    continue
+                if not isinstance(value, str):
+                    raise InvalidInputError(f'record [{index}]: column [{column}] expects a string, got: {value!r}')
+                domain = self.domain_values.get(column)
+                if domain is not None and value not in domain:
+                    raise InvalidInputError(
+                        f'record [{index}]: column [{column}] expects one of {sorted(domain)}, got: {value!r}'
+                    )
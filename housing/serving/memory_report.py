@@ -0,0 +1,46 @@
+# housing/serving/memory_report.py
+
+# Import required libraries and packages
+import os
+import sys
+
+from housing.exception import CustomException
+
+# Fields of /proc/<pid>/smaps_rollup summed into the report, in kB
+SHARED_MEMORY_FIELDS = ('Shared_Clean', 'Shared_Dirty')
+PRIVATE_MEMORY_FIELDS = ('Private_Clean', 'Private_Dirty')
+
+def get_memory_usage(pid: str='self') -> dict:
+    """
+    Read how much of the memory of a process is shared with other processes and how much is private.
+
+    After a fork, pages of the parent stay shared until either process writes to them, so the
+    private memory of a worker is what the worker really costs on top of the master.
+
+    Parameters:
+        pid (str): The process id, 'self' for the current process.
+
+    Returns:
+        dict: The rss, pss, shared and private memory in MiB, or None where /proc/<pid>/smaps_rollup
+        is not available.
+    """
+    try:
+        smaps_file_path = os.path.join('/proc', str(pid), 'smaps_rollup')
+        if not os.path.exists(smaps_file_path):
+            return None
+
+        fields = dict()
+        with open(smaps_file_path) as smaps_file:
+            for line in smaps_file:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == 'kB':
+                    fields[parts[0].rstrip(':')] = int(parts[1])
+
+        return {
+            'rss_mb': round(fields.get('Rss', 0) / 1024, 1),
+            'pss_mb': round(fields.get('Pss', 0) / 1024, 1),
+            'shared_mb': round(sum(fields.get(field, 0) for field in SHARED_MEMORY_FIELDS) / 1024, 1),
+            'private_mb': round(sum(fields.get(field, 0) for field in PRIVATE_MEMORY_FIELDS) / 1024, 1)
+        }
+    except Exception as e:
+        raise CustomException(e, sys) from e
@@ -0,0 +1,244 @@
+# housing/serving/metrics.py
+
+# Import required libraries and packages
+import sys
+import bisect
+import threading
+
+from housing.exception import CustomException
+from housing.serving.memory_report import get_memory_usage
+
+# Default histogram buckets, in seconds, for stage latencies from microseconds to seconds
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Default histogram buckets for batch sizes
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536)
+
+class Counter:
+    """
+    Monotonic counter of one label set.
+    """
+    __slots__ = ('value', 'lock')
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float=1.0) -> None:
+        with self.lock:
+            self.value += amount
+
+    def get_samples(self, name: str, labels: str) -> list:
+        return [(f'{name}{labels}', self.value)]
+
+class Gauge:
+    """
+    Value of one label set that can go up and down.
+    """
+    __slots__ = ('value',)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def get_samples(self, name: str, labels: str) -> list:
+        return [(f'{name}{labels}', self.value)]
+
+class Histogram:
+    """
+    Histogram of one label set, with a count per bucket plus the sum and count of all observations.
+    """
+    __slots__ = ('buckets', 'counts', 'sum', 'count', 'lock')
+
+    def __init__(self, buckets: tuple) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        # A value equal to a bucket bound belongs to that bucket
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def get_samples(self, name: str, labels: str) -> list:
+        with self.lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        samples = []
+        cumulative = 0
+        prefix = labels[1:-1] + ',' if labels else ''
+        for bound, bucket_count in zip(list(self.buckets) + ['+Inf'], counts):
+            cumulative += bucket_count
+            samples.append((f'{name}_bucket{{{prefix}le="{bound}"}}', cumulative))
+        samples.append((f'{name}_sum{labels}', total))
+        samples.append((f'{name}_count{labels}', count))
+        return samples
+
+class MetricFamily:
+    """
+    A named metric and its children, one per label set.
+    """
+    def __init__(self, name: str, help_text: str, metric_type: str, buckets: tuple=None) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.metric_type = metric_type
+        self.buckets = buckets
+        self.children = dict()
+        self.lock = threading.Lock()
+
+    def labels(self, **labels):
+        """
+        Returns the child of a label set, creating it on first use.
+        """
+        key = tuple(sorted(labels.items()))
+        child = self.children.get(key)
+        if child is None:
+            with self.lock:
+                child = self.children.get(key)
+                if child is None:
+                    if self.metric_type == 'histogram':
+                        child = Histogram(self.buckets)
+                    elif self.metric_type == 'counter':
+                        child = Counter()
+                    else:
+                        child = Gauge()
+                    self.children[key] = child
+        return child
+
+class MetricsRegistry:
+    """
+    In-process registry of serving metrics, rendered in the Prometheus text format.
+
+    Instrumented code checks `enabled` before taking any timestamp, so a disabled registry
+    costs one attribute lookup per instrumented block. Metrics are kept per process: with
+    several server workers, each worker reports its own.
+
+    Args:
+        enabled (bool): Whether metrics are recorded.
+    """
+    def __init__(self, enabled: bool=False) -> None:
+        self.enabled = enabled
+        self.families = dict()
+        self.collectors = []
+        self.lock = threading.Lock()
+
+        self.stage_seconds = self.histogram(
+            'housing_stage_seconds', 'Time spent in each serving stage.', LATENCY_BUCKETS
+        )
+        self.predict_rows = self.histogram(
+            'housing_predict_rows', 'Number of rows per model call.', SIZE_BUCKETS
+        )
+
+    def __get_family(self, name: str, help_text: str, metric_type: str, buckets: tuple=None) -> MetricFamily:
+        with self.lock:
+            family = self.families.get(name)
+            if family is None:
+                family = self.families[name] = MetricFamily(name, help_text, metric_type, buckets)
+            return family
+
+    def histogram(self, name: str, help_text: str, buckets: tuple=LATENCY_BUCKETS) -> MetricFamily:
+        return self.__get_family(name, help_text, 'histogram', tuple(buckets))
+
+    def counter(self, name: str, help_text: str) -> MetricFamily:
+        return self.__get_family(name, help_text, 'counter')
+
+    def gauge(self, name: str, help_text: str) -> MetricFamily:
+        return self.__get_family(name, help_text, 'gauge')
+
+    def observe_stage(self, stage: str, seconds: float) -> None:
+        """
+        Record the duration of a serving stage such as parse, transform or predict.
+        """
+        self.stage_seconds.labels(stage=stage).observe(seconds)
+
+    def register_collector(self, collector) -> None:
+        """
+        Register a function called before every snapshot, to update metrics kept elsewhere.
+        """
+        self.collectors.append(collector)
+
+    def get_snapshot(self) -> dict:
+        """
+        Returns every sample, keyed by its name and labels in the Prometheus notation.
+        """
+        try:
+            for collector in self.collectors:
+                collector(self)
+            snapshot = dict()
+            for family in list(self.families.values()):
+                for key, child in list(family.children.items()):
+                    labels = '{' + ','.join(f'{label}="{value}"' for label, value in key) + '}' if key else ''
+                    snapshot.update(child.get_samples(family.name, labels))
+            return snapshot
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def render_prometheus(self) -> str:
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        try:
+            for collector in self.collectors:
+                collector(self)
+            lines = []
+            for family in list(self.families.values()):
+                lines.append(f'# HELP {family.name} {family.help_text}')
+                lines.append(f'# TYPE {family.name} {family.metric_type}')
+                for key, child in list(family.children.items()):
+                    labels = '{' + ','.join(f'{label}="{value}"' for label, value in key) + '}' if key else ''
+                    lines.extend(f'{sample_name} {value}' for sample_name, value in child.get_samples(family.name, labels))
+            return '\n'.join(lines) + '\n'
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+# Registry shared by the model and the serving apps, disabled until a service enables it
+metrics = MetricsRegistry(enabled=False)
+
+def register_serving_collector(registry: MetricsRegistry, model_loader, prediction_cache=None) -> None:
+    """
+    Report the served model version, the prediction cache counters and the memory of the
+    process with every snapshot.
+
+    Parameters:
+        registry (MetricsRegistry): The registry to report into.
+        model_loader (HotReloadingModel): The loader of the served model.
+        prediction_cache (PredictionCache, optional): The prediction cache of the service.
+    """
+    model_info = registry.gauge('housing_model_info', 'Version of the served model.')
+    cache_hits = registry.counter('housing_prediction_cache_hits_total', 'Predictions served from the cache.')
+    cache_misses = registry.counter('housing_prediction_cache_misses_total', 'Predictions computed on a cache miss.')
+    cache_entries = registry.gauge('housing_prediction_cache_entries', 'Predictions held in the in-memory cache.')
+    process_memory = registry.gauge(
+        'housing_process_memory_mb',
+        'Memory of this process by kind, sampled at scrape time: shared pages are still shared with the master.'
+    )
+
+    def collect(_) -> None:
+        # Only the current version is reported
+        with model_info.lock:
+            model_info.children.clear()
+        model_info.labels(version=str(model_loader.version)).set(1)
+
+        if prediction_cache is not None:
+            stats = prediction_cache.get_stats()
+            cache_hits.labels(tier='local').value = stats['hits']
+            cache_hits.labels(tier='shared').value = stats['shared_hits']
+            cache_misses.labels().value = stats['misses']
+            cache_entries.labels().set(stats['entries'])
+
+        # Sampled while serving, after requests had the chance to write to the pages shared with the master
+        memory_usage = get_memory_usage()
+        if memory_usage is not None:
+            for kind in ('rss', 'pss', 'shared', 'private'):
+                process_memory.labels(kind=kind).set(memory_usage[f'{kind}_mb'])
+
+    registry.register_collector(collect)
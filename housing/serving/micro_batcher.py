@@ -0,0 +1,145 @@
+# housing/serving/micro_batcher.py
+
+# Import required libraries and packages
+import os
+import sys
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+from housing.logger import logging
+from housing.exception import CustomException
+from housing.serving.metrics import metrics, SIZE_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+batch_rows = metrics.histogram('housing_micro_batch_rows', 'Number of rows per micro-batch.', SIZE_BUCKETS)
+
+class MicroBatcher:
+    """
+    Coalesces concurrent prediction requests into batches for one vectorized predict call.
+
+    Every request is a list of rows. A worker thread takes the first waiting request and keeps
+    collecting requests until the batch holds max_batch_size rows or max_wait_us microseconds
+    have passed, then calls predict_function once with all rows and hands every caller its
+    slice of the results. The wait is adaptive: while requests arrive one at a time, a single
+    request is dispatched immediately instead of waiting for company that is not coming.
+
+    Only requests served concurrently by one process are coalesced, so the server must run
+    several request threads per process, such as the gthread workers of gunicorn.conf.py.
+
+    Args:
+        predict_function (callable): Predicts a list of rows, returns one result per row.
+        max_batch_size (int): The maximum number of rows of a batch.
+        max_wait_us (int): The maximum number of microseconds a request waits for a batch to fill.
+
+    Raises:
+        CustomException: If an error occurs while initializing the batcher.
+    """
+    def __init__(self, predict_function, max_batch_size: int=64, max_wait_us: int=2000) -> None:
+        try:
+            self.predict_function = predict_function
+            self.max_batch_size = max_batch_size
+            self.max_wait_us = max_wait_us
+
+            self.__queue = queue.Queue()
+            self.__lock = threading.Lock()
+            self.__worker_thread = None
+            self.__worker_pid = None
+            self.__last_batch_request_count = 0
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def submit(self, rows: list) -> Future:
+        """
+        Queue rows for the next batch.
+
+        Args:
+            rows (list): The rows to predict.
+
+        Returns:
+            Future: Resolves to the list of results of the rows.
+        """
+        try:
+            self.__ensure_worker()
+            future = Future()
+            self.__queue.put((rows, future, time.perf_counter() if metrics.enabled else None))
+            return future
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def predict(self, rows: list, timeout: float=None) -> list:
+        """
+        Predict rows as part of a batch and wait for the results.
+        """
+        try:
+            return self.submit(rows).result(timeout=timeout)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def __ensure_worker(self) -> None:
+        # The worker starts with the first request, in the process that serves it, so a
+        # server that forks workers after importing the app gives every worker its own thread
+        if self.__worker_pid == os.getpid() and self.__worker_thread.is_alive():
+            return
+        with self.__lock:
+            if self.__worker_pid == os.getpid() and self.__worker_thread.is_alive():
+                return
+            if self.__worker_pid != os.getpid():
+                self.__queue = queue.Queue()
+            self.__worker_thread = threading.Thread(target=self.__run, name='micro-batcher', daemon=True)
+            self.__worker_thread.start()
+            self.__worker_pid = os.getpid()
+
+    def __collect_batch(self) -> list:
+        requests = [self.__queue.get()]
+        row_count = len(requests[0][0])
+
+        # A lone request under light load is not held back
+        if self.__queue.empty() and self.__last_batch_request_count <= 1:
+            return requests
+
+        deadline = time.monotonic() + self.max_wait_us / 1e6
+        while row_count < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self.__queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            requests.append(request)
+            row_count += len(request[0])
+        return requests
+
+    def __run(self) -> None:
+        while True:
+            requests = self.__collect_batch()
+            self.__last_batch_request_count = len(requests)
+            rows = [row for request_rows, _, _ in requests for row in request_rows]
+
+            if metrics.enabled:
+                dispatch_time = time.perf_counter()
+                for _, _, submit_time in requests:
+                    if submit_time is not None:
+                        metrics.observe_stage('queue', dispatch_time - submit_time)
+                batch_rows.labels().observe(len(rows))
+
+            try:
+                results = self.predict_function(rows)
+                start = 0
+                for request_rows, future, _ in requests:
+                    future.set_result(list(results[start:start + len(request_rows)]))
+                    start += len(request_rows)
+            except Exception as e:
+                if len(requests) == 1:
+                    requests[0][1].set_exception(e)
+                    continue
+                # Predict the requests one by one so a bad row only fails its own request
+                logger.info('batch of [%d] requests failed, retrying them separately: [%s]', len(requests), e)
+                for request_rows, future, _ in requests:
+                    try:
+                        future.set_result(list(self.predict_function(request_rows)))
+                    except Exception as request_error:
+                        future.set_exception(request_error)
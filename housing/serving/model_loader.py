@@ -0,0 +1,161 @@
+# housing/serving/model_loader.py
+
+# Import required libraries and packages
+import os
+import sys
+import threading
+
+from housing.constant import *
+from housing.logger import logging
+from housing.exception import CustomException
+from housing.util import load_object
+
+logger = logging.getLogger(__name__)
+
+class HotReloadingModel:
+    """
+    Serves the current pushed model and swaps in new versions without a restart.
+
+    A background thread polls the current model pointer file of the export directory. When
+    it names a new version, the thread loads the model, warms it up on the warm-up sample of
+    the version and only then replaces the served model. Requests hold on to the model they
+    started with, so in-flight requests finish on the old version while new requests use the
+    new one.
+
+    Args:
+        export_dir_path (str): The export directory the model pusher publishes versions into.
+        poll_interval (float): The number of seconds between checks for a new version.
+        use_flat_forest (bool): Whether forests predict with the flat forest engine, once it is
+            checked against the forest on the warm-up sample.
+
+    Raises:
+        CustomException: If an error occurs while initializing the model.
+    """
+    def __init__(self, export_dir_path: str, poll_interval: float=5.0, use_flat_forest: bool=False) -> None:
+        try:
+            self.export_dir_path = export_dir_path
+            self.poll_interval = poll_interval
+            self.use_flat_forest = use_flat_forest
+
+            # The version and the model are swapped together as one tuple
+            self.__current = (None, None)
+            self.__stop_event = threading.Event()
+            self.__watcher_thread = None
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @property
+    def version(self) -> str:
+        """
+        The version of the served model, None if no model is loaded.
+        """
+        return self.__current[0]
+
+    def get_model(self) -> tuple:
+        """
+        Returns the served version and model as one consistent snapshot.
+
+        Returns:
+            tuple: The version and the HousingEstimatorModel, (None, None) if no model is loaded.
+        """
+        return self.__current
+
+    def predict(self, X):
+        """
+        Predicts with the served model.
+
+        Args:
+            X (pd.DataFrame): The input features.
+
+        Returns:
+            np.array: The predicted values.
+        """
+        try:
+            _, model = self.__current
+            if model is None:
+                raise Exception(f'no model is published in: [{self.export_dir_path}]')
+            return model.predict(X)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_current_version(self) -> str:
+        """
+        Reads the version named by the current model pointer file.
+
+        Returns:
+            str: The current version, None if no model has been pushed yet.
+        """
+        try:
+            pointer_file_path = os.path.join(self.export_dir_path, CURRENT_MODEL_POINTER_FILE_NAME)
+            if not os.path.exists(pointer_file_path):
+                return None
+            with open(pointer_file_path) as pointer_file:
+                return pointer_file.read().strip() or None
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def reload(self) -> bool:
+        """
+        Loads, warms up and swaps in the current version if it is not the served one.
+
+        Returns:
+            bool: True if a new version was swapped in.
+        """
+        try:
+            current_version = self.get_current_version()
+            if current_version is None or current_version == self.version:
+                return False
+
+            version_dir_path = os.path.join(self.export_dir_path, current_version)
+            logger.info('loading model version: [%s]', current_version)
+            model = load_object(file_path=os.path.join(version_dir_path, EXPORTED_MODEL_FILE_NAME))
+
+            # Run a prediction before serving so the first request does not pay for lazy initialization
+            warmup_sample_file_path = os.path.join(version_dir_path, WARMUP_SAMPLE_FILE_NAME)
+            if os.path.exists(warmup_sample_file_path):
+                import pandas as pd
+                warmup_sample = pd.read_csv(warmup_sample_file_path)
+                if self.use_flat_forest:
+                    try:
+                        if model.enable_flat_forest(warmup_sample):
+                            logger.info('model version: [%s] predicts with the flat forest engine', current_version)
+                    except Exception as e:
+                        logger.info('model version: [%s] keeps the trained forest: [%s]', current_version, e)
+                model.predict(warmup_sample)
+
+            self.__current = (current_version, model)
+            logger.info('serving model version: [%s]', current_version)
+            return True
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def start(self) -> None:
+        """
+        Loads the current version and starts watching for new versions in the background.
+        """
+        try:
+            self.reload()
+            if self.__watcher_thread is not None and self.__watcher_thread.is_alive():
+                return
+            self.__stop_event.clear()
+            self.__watcher_thread = threading.Thread(target=self.__watch, name='model-reloader', daemon=True)
+            self.__watcher_thread.start()
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def stop(self) -> None:
+        """
+        Stops watching for new versions.
+        """
+        self.__stop_event.set()
+        if self.__watcher_thread is not None:
+            self.__watcher_thread.join()
+            self.__watcher_thread = None
+
+    def __watch(self) -> None:
+        while not self.__stop_event.wait(self.poll_interval):
+            try:
+                self.reload()
+            except Exception as e:
+                # Keep serving the current version if a new one fails to load
+                logger.error('model reload failed: [%s]', e, exc_info=e)
@@ -0,0 +1,283 @@
+# housing/serving/prediction_cache.py
+
+# Import required libraries and packages
+import os
+import sys
+import json
+import math
+import time
+import hashlib
+import sqlite3
+import threading
+import collections
+
+from housing.logger import logging
+from housing.exception import CustomException
+
+logger = logging.getLogger(__name__)
+
+# Table of the shared backend
+SHARED_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prediction (
+    key TEXT PRIMARY KEY,
+    model_version TEXT NOT NULL,
+    value REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS prediction_model_version_index ON prediction (model_version);
+CREATE INDEX IF NOT EXISTS prediction_expires_at_index ON prediction (expires_at);
+"""
+
+class PredictionCache:
+    """
+    LRU cache of predictions with a time to live, keyed by the canonical input row and the model version.
+
+    Rows are canonicalised before hashing, so the order of the fields, integer and float
+    spellings of the same number and missing fields all map to the same key. When a new model
+    version is seen, the entries of the previous versions are dropped from memory. An optional
+    SQLite file shared by the worker processes of a server is consulted on local misses, so a
+    row predicted by one worker is a hit in the others.
+
+    The shared file keeps the entries of every version, as workers of a rolling reload serve
+    different versions at the same time. Writers purge its expired entries and trim it to its
+    maximum number of entries, soonest to expire first, at most once per purge interval.
+
+    Args:
+        max_entries (int): The maximum number of predictions kept in memory.
+        ttl_seconds (float): The number of seconds a prediction stays valid.
+        shared_cache_file_path (str, optional): The file path of the shared SQLite backend.
+        shared_max_entries (int): The maximum number of predictions kept in the shared backend.
+        purge_interval_seconds (float): The number of seconds between two purges of the shared
+            backend by this process.
+
+    Raises:
+        CustomException: If an error occurs while initializing the cache.
+    """
+    def __init__(
+        self,
+        max_entries: int=100000,
+        ttl_seconds: float=3600.0,
+        shared_cache_file_path: str=None,
+        shared_max_entries: int=1000000,
+        purge_interval_seconds: float=60.0
+    ) -> None:
+        try:
+            self.max_entries = max_entries
+            self.ttl_seconds = ttl_seconds
+            self.shared_cache_file_path = shared_cache_file_path
+            self.shared_max_entries = shared_max_entries
+            self.purge_interval_seconds = purge_interval_seconds
+            self.__next_purge_time = 0.0
+
+            self.__entries = collections.OrderedDict()
+            self.__lock = threading.Lock()
+            self.__model_version = None
+            self.__local = threading.local()
+            self.hits = 0
+            self.shared_hits = 0
+            self.misses = 0
+
+            if self.shared_cache_file_path is not None:
+                os.makedirs(os.path.dirname(self.shared_cache_file_path), exist_ok=True)
+                connection = sqlite3.connect(self.shared_cache_file_path, isolation_level=None)
+                try:
+                    connection.execute('PRAGMA journal_mode=WAL')
+                    connection.executescript(SHARED_CACHE_SCHEMA)
+                finally:
+                    connection.close()
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def make_key(row: dict, model_version: str) -> str:
+        """
+        Hash the canonical form of a row together with the model version.
+
+        Args:
+            row (dict): The input row.
+            model_version (str): The version of the model predicting the row.
+
+        Returns:
+            str: The cache key.
+        """
+        try:
+            canonical_row = dict()
+            for column, value in row.items():
+                if value is None or (isinstance(value, float) and math.isnan(value)):
+                    continue
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    value = float(value)
+                elif not isinstance(value, (str, bool)):
+                    value = value.item() if hasattr(value, 'item') else str(value)
+                    if isinstance(value, float) and math.isnan(value):
+                        continue
+                    if isinstance(value, int):
+                        value = float(value)
+                canonical_row[str(column)] = value
+            canonical = json.dumps([model_version, canonical_row], sort_keys=True, separators=(',', ':'))
+            return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def __shared_connection(self) -> sqlite3.Connection:
+        # One connection per thread, opened in the process that uses it
+        connection = getattr(self.__local, 'connection', None)
+        if connection is None or self.__local.pid != os.getpid():
+            connection = sqlite3.connect(self.shared_cache_file_path, timeout=5.0, isolation_level=None)
+            self.__local.connection, self.__local.pid = connection, os.getpid()
+        return connection
+
+    def __set_model_version(self, model_version: str) -> None:
+        if model_version == self.__model_version:
+            return
+        with self.__lock:
+            if model_version == self.__model_version:
+                return
+            logger.info('prediction cache invalidated for model version: [%s]', model_version)
+            self.__entries.clear()
+            self.__model_version = model_version
+
+    def purge_shared(self) -> int:
+        """
+        Remove the expired entries of the shared backend, then the entries soonest to expire
+        until it fits in its maximum number of entries.
+
+        Returns:
+            int: The number of removed entries.
+        """
+        try:
+            connection = self.__shared_connection()
+            removed_count = connection.execute('DELETE FROM prediction WHERE expires_at <= ?', (time.time(),)).rowcount
+            excess_count = connection.execute('SELECT COUNT(*) FROM prediction').fetchone()[0] - self.shared_max_entries
+            if excess_count > 0:
+                removed_count += connection.execute(
+                    'DELETE FROM prediction WHERE key IN (SELECT key FROM prediction ORDER BY expires_at LIMIT ?)',
+                    (excess_count,)
+                ).rowcount
+            if removed_count > 0:
+                logger.info('purged [%d] entries of the shared prediction cache', removed_count)
+            return removed_count
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_many(self, keys: list) -> dict:
+        """
+        Look up keys in memory, then in the shared backend.
+
+        Returns:
+            dict: The cached predictions of the keys that were found and have not expired.
+        """
+        try:
+            now = time.time()
+            found = dict()
+            with self.__lock:
+                for key in keys:
+                    entry = self.__entries.get(key)
+                    if entry is None:
+                        continue
+                    if entry[1] <= now:
+                        del self.__entries[key]
+                        continue
+                    self.__entries.move_to_end(key)
+                    found[key] = entry[0]
+                self.hits += len(found)
+
+            missing_keys = [key for key in set(keys) if key not in found]
+            if self.shared_cache_file_path is not None and len(missing_keys) > 0:
+                shared_found = dict()
+                connection = self.__shared_connection()
+                # Stay below the limit of SQLite on the number of query parameters
+                for start in range(0, len(missing_keys), 500):
+                    batch = missing_keys[start:start + 500]
+                    rows = connection.execute(
+                        f'SELECT key, value, expires_at FROM prediction WHERE key IN ({",".join("?" * len(batch))}) '
+                        'AND expires_at > ?',
+                        batch + [now]
+                    )
+                    shared_found.update((key, (value, expires_at)) for key, value, expires_at in rows)
+                with self.__lock:
+                    for key, (value, expires_at) in shared_found.items():
+                        self.__put_local(key, value, expires_at)
+                        found[key] = value
+                    self.shared_hits += len(shared_found)
+            return found
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def __put_local(self, key: str, value: float, expires_at: float) -> None:
+        self.__entries[key] = (value, expires_at)
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.max_entries:
+            self.__entries.popitem(last=False)
+
+    def put_many(self, values: dict, model_version: str) -> None:
+        """
+        Store predictions in memory and in the shared backend.
+        """
+        try:
+            expires_at = time.time() + self.ttl_seconds
+            with self.__lock:
+                for key, value in values.items():
+                    self.__put_local(key, value, expires_at)
+            if self.shared_cache_file_path is not None and len(values) > 0:
+                self.__shared_connection().executemany(
+                    'INSERT OR REPLACE INTO prediction (key, model_version, value, expires_at) VALUES (?, ?, ?, ?)',
+                    [(key, model_version, value, expires_at) for key, value in values.items()]
+                )
+
+                # Purge at most once per interval, so puts do not pay for a full count
+                now = time.time()
+                if now >= self.__next_purge_time:
+                    self.__next_purge_time = now + self.purge_interval_seconds
+                    self.purge_shared()
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def predict(self, model_version: str, rows: list, predict_function) -> list:
+        """
+        Predict rows, computing only the ones that are not cached.
+
+        Args:
+            model_version (str): The version of the model predicting the rows.
+            rows (list): The input rows, as dicts.
+            predict_function (callable): Predicts a list of rows, returns one value per row.
+
+        Returns:
+            list: The prediction of every row.
+        """
+        try:
+            self.__set_model_version(model_version)
+            keys = [self.make_key(row, model_version) for row in rows]
+            found = self.get_many(keys)
+
+            # Rows repeated within the batch are predicted once
+            missing_positions = dict()
+            for position, key in enumerate(keys):
+                if key not in found and key not in missing_positions:
+                    missing_positions[key] = position
+            with self.__lock:
+                self.misses += len(missing_positions)
+
+            if len(missing_positions) > 0:
+                predictions = predict_function([rows[position] for position in missing_positions.values()])
+                computed = {key: float(prediction) for key, prediction in zip(missing_positions, predictions)}
+                self.put_many(computed, model_version)
+                found.update(computed)
+            return [found[key] for key in keys]
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_stats(self) -> dict:
+        """
+        Returns the hit and miss counters and the number of cached predictions.
+        """
+        with self.__lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                'model_version': self.__model_version,
+                'entries': len(self.__entries),
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'hit_ratio': (self.hits + self.shared_hits) / lookups if lookups > 0 else 0.0
+            }
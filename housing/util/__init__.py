@@ -1,9 +1,23 @@
 # housing/util/__init__.py
 import os
 import sys
+import ast
+import stat
+import hashlib
+import functools
+import tempfile
+from types import MappingProxyType
 import yaml
+import numpy as np
 from housing.exception import CustomException
-from housing.constant import DATASET_SCHEMA_COLUMNS_KEY
+from housing.constant import (
+    DATASET_SCHEMA_COLUMNS_KEY,
+    NUMERICAL_COLUMN_KEY,
+    CATEGORICAL_COLUMN_KEY,
+    TARGET_COLUMN_KEY,
+    DOMAIN_VALUE_KEY
+)
+from housing.entity.config_entity import DatasetSchema
 
 def read_yaml(file_path: str) -> dict:
     """
@@ -27,14 +41,194 @@ def read_yaml(file_path: str) -> dict:
         # If there's an exception, raise a CustomException with the original exception and the sys module
         raise CustomException(e, sys) from e
 
+def freeze_yaml(value):
+    """
+    Convert parsed YAML into an immutable structure: mappings become read-only mapping
+    proxies and lists become tuples.
+
+    Parameters:
+        value: The parsed YAML value.
+
+    Returns:
+        The immutable copy of the value.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze_yaml(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze_yaml(item) for item in value)
+    return value
+
+def thaw_yaml(value):
+    """
+    Convert a frozen YAML structure back into plain dicts and lists, for the libraries
+    that only accept those.
+
+    Parameters:
+        value: The frozen YAML value.
+
+    Returns:
+        A mutable copy of the value.
+    """
+    if isinstance(value, MappingProxyType):
+        return {key: thaw_yaml(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw_yaml(item) for item in value]
+    return value
+
+def merge_yaml(base, overrides):
+    """
+    Merge configuration overrides into parsed YAML: nested mappings are merged key by key,
+    any other value of the overrides replaces the value of the base.
+
+    Parameters:
+        base: The parsed YAML value, frozen or not.
+        overrides: The values to override, frozen or not.
+
+    Returns:
+        A mutable merged copy, see thaw_yaml.
+    """
+    base, overrides = thaw_yaml(base), thaw_yaml(overrides)
+    if not isinstance(base, dict) or not isinstance(overrides, dict):
+        return overrides
+    merged = dict(base)
+    for key, value in overrides.items():
+        merged[key] = merge_yaml(merged[key], value) if key in merged else value
+    return merged
+
+# Parsed YAML files by absolute path: (stat key, content digest, frozen contents)
+_yaml_cache = dict()
+
+def read_yaml_cached(file_path: str):
+    """
+    Read a YAML file once per file version and return its contents as an immutable mapping.
+
+    The parsed contents are shared by every caller. A file is only read again when its
+    modification time, size or inode changed, and only parsed again when its content
+    digest changed too, so touching a file does not cost a new parse.
+
+    Parameters:
+        file_path (str): The path to the YAML file.
+
+    Returns:
+        Mapping: The frozen contents of the YAML file, see freeze_yaml.
+
+    Raises:
+        CustomException: If there is an error reading the YAML file.
+    """
+    try:
+        file_path = os.path.abspath(file_path)
+        file_stat = os.stat(file_path)
+        stat_key = (file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino)
+
+        # Unchanged file version
+        cached = _yaml_cache.get(file_path)
+        if cached is not None and cached[0] == stat_key:
+            return cached[2]
+
+        # Parse again only if the content changed
+        with open(file_path, 'rb') as yaml_file:
+            content = yaml_file.read()
+        digest = hashlib.sha256(content).hexdigest()
+        if cached is not None and cached[1] == digest:
+            contents = cached[2]
+        else:
+            contents = freeze_yaml(yaml.safe_load(content))
+        _yaml_cache[file_path] = (stat_key, digest, contents)
+        return contents
+    except Exception as e:
+        # If there's an exception, raise a CustomException with the original exception and the sys module
+        raise CustomException(e, sys) from e
+
+# Validated dataset schemas by absolute path: (frozen YAML contents, schema)
+_dataset_schema_cache = dict()
+
+def load_dataset_schema(schema_file_path: str) -> DatasetSchema:
+    """
+    Load and validate a dataset schema once per file version.
+
+    Parameters:
+        schema_file_path (str): The path to the schema file.
+
+    Returns:
+        DatasetSchema: The immutable schema, with the input column positions and the
+        allowed values of the categorical columns indexed.
+
+    Raises:
+        CustomException: If the schema file can't be read or is inconsistent.
+    """
+    try:
+        schema_file_path = os.path.abspath(schema_file_path)
+        contents = read_yaml_cached(schema_file_path)
+
+        # The schema is validated again only when the file was parsed again
+        cached = _dataset_schema_cache.get(schema_file_path)
+        if cached is not None and cached[0] is contents:
+            return cached[1]
+
+        columns = contents[DATASET_SCHEMA_COLUMNS_KEY]
+        numerical_columns = tuple(contents[NUMERICAL_COLUMN_KEY])
+        categorical_columns = tuple(contents[CATEGORICAL_COLUMN_KEY])
+        target_column = contents[TARGET_COLUMN_KEY]
+        input_columns = numerical_columns + categorical_columns
+        domain_values = contents.get(DOMAIN_VALUE_KEY) or dict()
+
+        # Every column the schema refers to must be declared, and used only once
+        undeclared_columns = [column for column in input_columns + (target_column,) if column not in columns]
+        if len(undeclared_columns) > 0:
+            raise Exception(f'columns: {undeclared_columns} are not declared in the schema: [{schema_file_path}]')
+        if len(set(input_columns + (target_column,))) != len(input_columns) + 1:
+            raise Exception(f'a column is listed more than once in the schema: [{schema_file_path}]')
+        unknown_domain_columns = [column for column in domain_values if column not in categorical_columns]
+        if len(unknown_domain_columns) > 0:
+            raise Exception(f'domain values of columns: {unknown_domain_columns} which are not categorical')
+
+        dataset_schema = DatasetSchema(
+            columns=columns,
+            numerical_columns=numerical_columns,
+            categorical_columns=categorical_columns,
+            target_column=target_column,
+            input_columns=input_columns,
+            column_positions=MappingProxyType({column: position for position, column in enumerate(input_columns)}),
+            domain_values=MappingProxyType({column: frozenset(values) for column, values in domain_values.items()})
+        )
+        _dataset_schema_cache[schema_file_path] = (contents, dataset_schema)
+        return dataset_schema
+    except Exception as e:
+        # If there's an exception, raise a CustomException with the original exception and the sys module
+        raise CustomException(e, sys) from e
+
 import os
 import yaml
 import sys
 
+# Process umask, read once at import since reading it means setting it
+_umask = os.umask(0)
+os.umask(_umask)
+
+def get_new_file_mode(file_path: str) -> int:
+    """
+    The permission bits a file replaced through a temporary file should get: the mode of the
+    file it replaces, or the mode open() would give a new file. Temporary files are created
+    readable by their owner only.
+
+    Parameters:
+        file_path (str): The path of the file to replace.
+
+    Returns:
+        int: The permission bits.
+    """
+    try:
+        return stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_umask
+
 def write_yaml(file_path: str, data: dict=None) -> None:
     """
     Write YAML data to a file.
 
+    The data is written to a temporary file in the same directory which then replaces the
+    target file, so readers never see a partially written file.
+
     Args:
         file_path (str): The path to the file.
         data (dict, optional): The YAML data to write. Defaults to None.
@@ -47,13 +241,23 @@ def write_yaml(file_path: str, data: dict=None) -> None:
     """
     try:
         # Create the directory for the file if it doesn't exist
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        dir_path = os.path.dirname(file_path)
+        os.makedirs(dir_path, exist_ok=True)
         
-        # Open the file in write mode
-        with open(file_path, 'w') as yaml_file:
-            # If data is not None, dump the YAML data into the file
-            if data is not None:
-                yaml.dump(data, yaml_file)
+        # Open a temporary file next to the target file in write mode
+        file_descriptor, temp_file_path = tempfile.mkstemp(dir=dir_path, suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'w') as yaml_file:
+                # If data is not None, dump the YAML data into the file
+                if data is not None:
+                    yaml.dump(data, yaml_file)
+
+            # Atomically replace the target file, with the permissions of a plainly written file
+            os.chmod(temp_file_path, get_new_file_mode(file_path))
+            os.replace(temp_file_path, file_path)
+        except Exception:
+            os.remove(temp_file_path)
+            raise
     except Exception as e:
         # If an exception occurs, raise a CustomException with the original exception and the sys module
         raise CustomException(e, sys) from e
@@ -112,6 +316,7 @@ def save_object(file_path:str, obj):
     try:
         dir_path = os.path.dirname(file_path)
         os.makedirs(dir_path, exist_ok=True)
+        import dill
         with open(file_path, "wb") as file_obj:
             dill.dump(obj, file_obj)
     except Exception as e:
@@ -120,19 +325,47 @@ def save_object(file_path:str, obj):
     
 def load_object(file_path:str):
     try:
+        import dill
         with open(file_path, "rb") as file_obj:
             return dill.load(file_obj)
     except Exception as e:
         # If an exception occurs, raise a CustomException with the original exception and the sys module
         raise CustomException(e, sys) from e
+
+@functools.lru_cache(maxsize=8)
+def _load_object_version(file_path: str, modified_time_ns: int):
+    return load_object(file_path=file_path)
+
+def load_cached_object(file_path: str):
+    """
+    Load a dill pickled object once per file version.
+
+    Loaded objects are kept in an LRU cache keyed by the file path and its modification
+    time, so a file is only loaded again after it has been replaced.
+
+    Args:
+        file_path (str): The path to the pickled object.
+
+    Returns:
+        object: The loaded object, shared by every caller of the same file version.
+
+    Raises:
+        CustomException: If an exception occurs while loading the object.
+    """
+    try:
+        return _load_object_version(file_path, os.stat(file_path).st_mtime_ns)
+    except Exception as e:
+        # If an exception occurs, raise a CustomException with the original exception and the sys module
+        raise CustomException(e, sys) from e
     
-def load_data(file_path: str, schema_file_path: str) -> pd.DataFrame:
+def load_data(file_path: str, schema_file_path: str, dtype: str=None) -> 'pd.DataFrame':
     """
     Load data from a CSV file into a pandas DataFrame using a given schema.
 
     Parameters:
         file_path (str): The path to the CSV file.
         schema_file_path (str): The path to the schema file.
+        dtype (str, optional): The floating point dtype of the float columns of the schema.
 
     Returns:
         pd.DataFrame: The loaded data as a pandas DataFrame.
@@ -141,13 +374,11 @@ def load_data(file_path: str, schema_file_path: str) -> pd.DataFrame:
         CustomException: If any error occurs during the data loading process.
     """
     try:
-        # Read the dataset schema from the schema file
-        datatset_schema = read_yaml(schema_file_path)
-        
-        # Extract the schema from the dataset schema
-        schema = datatset_schema[DATASET_SCHEMA_COLUMNS_KEY]
+        # Read the column types from the parsed dataset schema
+        schema = load_dataset_schema(schema_file_path).columns
         
         # Read the data from the CSV file into a pandas DataFrame
+        import pandas as pd
         dataframe = pd.read_csv(file_path)
         
         # Initialize an empty error message
@@ -156,7 +387,7 @@ def load_data(file_path: str, schema_file_path: str) -> pd.DataFrame:
         # Iterate over each column in the DataFrame
         for column in dataframe.columns:
             # Check if the column is in the schema
-            if column in list(schema.keys()):
+            if column in schema:
                 # Convert the column to the specified data type from the schema
                 dataframe[column].astype(schema[column])
             else:
@@ -166,9 +397,170 @@ def load_data(file_path: str, schema_file_path: str) -> pd.DataFrame:
         # If there are any error messages, raise an exception
         if len(error_message) > 0:
             raise Exception(error_message)
+
+        # Cast the float columns to the requested precision
+        if dtype is not None:
+            float_columns = [column for column in dataframe.columns if schema[column] == 'float']
+            dataframe[float_columns] = dataframe[float_columns].astype(dtype)
         
         # Return the loaded data as a pandas DataFrame
         return dataframe
     except Exception as e:
         # If an exception occurs, raise a CustomException with the original exception and the sys module
         raise CustomException(e, sys) from e
+
+# Bytes of a non contiguous array copied at a time to be hashed
+ARRAY_FINGERPRINT_BLOCK_BYTES = 16 * 1024 * 1024
+
+def get_array_fingerprint(*arrays) -> str:
+    """
+    Compute one content fingerprint of one or more NumPy arrays, without copying them.
+
+    The fingerprint covers the dtype, the shape and the raw bytes of every array, in order,
+    so two lists of arrays share a fingerprint only when they hold exactly the same data.
+    Arrays that are not C-contiguous are hashed a block of rows at a time, so the digest does
+    not depend on the memory layout and at most one block is copied.
+
+    Args:
+        *arrays (np.array): The arrays to fingerprint, such as the features and the target.
+
+    Returns:
+        str: The hex encoded SHA-256 digest of the arrays.
+
+    Raises:
+        CustomException: If an error occurs while hashing the arrays.
+    """
+    try:
+        digest = hashlib.sha256()
+        for array in arrays:
+            array = np.asarray(array)
+            digest.update(str(array.dtype).encode())
+            digest.update(str(array.shape).encode())
+            if array.flags.c_contiguous:
+                digest.update(array.data)
+                continue
+            rows_per_block = max(1, ARRAY_FINGERPRINT_BLOCK_BYTES // max(1, array[:1].nbytes))
+            for start in range(0, len(array), rows_per_block):
+                digest.update(np.ascontiguousarray(array[start:start + rows_per_block]).data)
+        return digest.hexdigest()
+    except Exception as e:
+        # If an exception occurs, raise a CustomException with the original exception and the sys module
+        raise CustomException(e, sys) from e
+
+def get_file_fingerprint(file_path: str) -> str:
+    """
+    Compute a content fingerprint of a file.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Returns:
+        str: The hex encoded SHA-256 digest of the file content.
+
+    Raises:
+        CustomException: If an error occurs while reading the file.
+    """
+    try:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as file_obj:
+            # Read the file in blocks so large files are not loaded into memory at once
+            for block in iter(lambda: file_obj.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    except Exception as e:
+        # If an exception occurs, raise a CustomException with the original exception and the sys module
+        raise CustomException(e, sys) from e
+
+# Package modules imported by a source file, by absolute path: (stat key, module names)
+_source_imports_cache = dict()
+
+def get_module_file_path(module_name: str) -> str:
+    """
+    The source file of a module of an imported package, None if it has no source file.
+    """
+    package_dir = os.path.dirname(os.path.abspath(sys.modules[module_name.split('.')[0]].__file__))
+    module_path = os.path.join(os.path.dirname(package_dir), *module_name.split('.'))
+    for file_path in (os.path.join(module_path, '__init__.py'), module_path + '.py'):
+        if os.path.isfile(file_path):
+            return file_path
+    return None
+
+def get_source_imports(module_name: str, file_path: str) -> set:
+    """
+    The modules of its own package a source file imports, including the imports inside
+    functions and the packages the imported modules belong to. Parsed once per file version.
+    """
+    file_stat = os.stat(file_path)
+    stat_key = (file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino)
+    cached = _source_imports_cache.get(file_path)
+    if cached is not None and cached[0] == stat_key:
+        return cached[1]
+
+    with open(file_path, 'rb') as source_file:
+        tree = ast.parse(source_file.read(), filename=file_path)
+
+    # Relative imports are resolved from the package of the module
+    is_package = os.path.basename(file_path) == '__init__.py'
+    package_parts = module_name.split('.') if is_package else module_name.split('.')[:-1]
+
+    imported_names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imported_names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base_parts = package_parts[:len(package_parts) - node.level + 1] if node.level > 0 else []
+            base_name = '.'.join(base_parts + ([node.module] if node.module else []))
+            imported_names.add(base_name)
+            # The names imported from a package may be its modules
+            imported_names.update(f'{base_name}.{alias.name}' for alias in node.names if alias.name != '*')
+
+    root_name = module_name.split('.')[0]
+    module_names = set()
+    for imported_name in imported_names:
+        parts = imported_name.split('.')
+        if parts[0] != root_name:
+            continue
+        # Importing a module runs every package it belongs to
+        for index in range(1, len(parts) + 1):
+            name = '.'.join(parts[:index])
+            if get_module_file_path(name) is not None:
+                module_names.add(name)
+
+    _source_imports_cache[file_path] = (stat_key, module_names)
+    return module_names
+
+def get_source_file_paths(module_name: str) -> dict:
+    """
+    Find the source files of a module and of every module of its package it imports,
+    directly or indirectly.
+
+    Imports are read from the source rather than from sys.modules, so modules imported
+    lazily inside functions are found too, and modules of other packages are left out.
+
+    Args:
+        module_name (str): The name of the module, such as housing.component.model_trainer.
+
+    Returns:
+        dict: The source file path of every module, by module name.
+
+    Raises:
+        CustomException: If a source file cannot be read or parsed.
+    """
+    try:
+        # Importing the module runs every package it belongs to
+        file_paths = dict()
+        parts = module_name.split('.')
+        pending_module_names = ['.'.join(parts[:index]) for index in range(1, len(parts) + 1)]
+        while len(pending_module_names) > 0:
+            name = pending_module_names.pop()
+            if name in file_paths:
+                continue
+            file_path = get_module_file_path(name)
+            if file_path is None:
+                continue
+            file_paths[name] = file_path
+            pending_module_names.extend(get_source_imports(name, file_path) - set(file_paths))
+        return file_paths
+    except Exception as e:
+        # If an exception occurs, raise a CustomException with the original exception and the sys module
+        raise CustomException(e, sys) from e
@@ -0,0 +1,118 @@
+# housing/util/import_benchmark.py
+
+# Import required libraries and packages
+import os
+import sys
+import json
+import argparse
+import subprocess
+from collections import namedtuple
+
+from housing.constant import ROOT_DIR
+
+# Modules that importing an entry point must not import, and its import time budget in milliseconds.
+# Serving entry points never need training-only dependencies, and no module pulls in evidently,
+# pandas or sklearn before the component that uses them runs.
+IMPORT_BUDGETS = {
+    'housing.logger': (('pandas', 'sklearn', 'dill', 'multiprocessing', 'evidently'), 150),
+    'housing.util': (('pandas', 'sklearn', 'dill', 'evidently'), 400),
+    'housing.config': (('pandas', 'sklearn', 'dill', 'evidently'), 400),
+    'housing.component.housing_estimator': (('pandas', 'sklearn', 'evidently'), 400),
+    'housing.component.data_transformation': (('pandas', 'sklearn', 'evidently'), 400),
+    'housing.component.data_validation': (('pandas', 'sklearn', 'evidently'), 400),
+    'housing.serving.bundle_runtime': (('pandas', 'sklearn', 'scipy', 'dill', 'evidently'), 400),
+    'housing.serving.model_loader': (('pandas', 'sklearn', 'dill', 'evidently'), 400),
+    'asgi': (('pandas', 'sklearn', 'dill', 'evidently'), 600),
+    'app': (('sklearn', 'evidently'), 1500)
+}
+
+# Measured in a fresh interpreter, so nothing is imported beforehand
+MEASURE_SCRIPT = '''
+import sys, json, time, importlib
+module_name, forbidden_modules = sys.argv[1], sys.argv[2].split(',')
+start_time = time.perf_counter()
+importlib.import_module(module_name)
+import_ms = (time.perf_counter() - start_time) * 1000
+print(json.dumps({'import_ms': import_ms, 'loaded': [name for name in forbidden_modules if name in sys.modules]}))
+'''
+
+# A named tuple that represents the import measurement of one entry point.
+#
+# Attributes:
+#     module_name (str): The imported module.
+#     import_ms (float): The fastest import time in milliseconds over the repeated imports.
+#     budget_ms (float): The import time budget in milliseconds.
+#     loaded_forbidden_modules (list): The forbidden modules the import loaded.
+ImportMeasurement = namedtuple(
+    'ImportMeasurement',
+    [
+        'module_name',
+        'import_ms',
+        'budget_ms',
+        'loaded_forbidden_modules'
+    ]
+)
+
+def measure_import(module_name: str, forbidden_modules: tuple, budget_ms: float, repeat: int=3) -> ImportMeasurement:
+    """
+    Imports a module in fresh interpreters, from the project root, and records its import time
+    and the forbidden modules it loaded.
+
+    Args:
+        module_name (str): The module to import.
+        forbidden_modules (tuple): The modules the import must not load.
+        budget_ms (float): The import time budget in milliseconds.
+        repeat (int): The number of imports, the fastest one is kept.
+
+    Returns:
+        ImportMeasurement: The measurement.
+    """
+    results = []
+    for _ in range(repeat):
+        completed_process = subprocess.run(
+            [sys.executable, '-c', MEASURE_SCRIPT, module_name, ','.join(forbidden_modules)],
+            cwd=ROOT_DIR,
+            env=dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT_DIR, os.environ.get('PYTHONPATH')]))),
+            capture_output=True,
+            text=True
+        )
+        if completed_process.returncode != 0:
+            raise RuntimeError(f'importing [{module_name}] failed: {completed_process.stderr.strip()}')
+        results.append(json.loads(completed_process.stdout.strip().splitlines()[-1]))
+
+    return ImportMeasurement(
+        module_name=module_name,
+        import_ms=min(result['import_ms'] for result in results),
+        budget_ms=budget_ms,
+        loaded_forbidden_modules=sorted(set(name for result in results for name in result['loaded']))
+    )
+
+def main(args=None) -> None:
+    """
+    Command line entry point: measures the import of every entry point and exits with an error if
+    one loads a forbidden module or exceeds its time budget.
+    """
+    parser = argparse.ArgumentParser(description='Guard the import time and import footprint of the package.')
+    parser.add_argument('modules', nargs='*', help='entry points to measure, all by default')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--budget-factor', type=float, default=1.0, help='scales every time budget, for slower machines')
+    arguments = parser.parse_args(args)
+
+    failures = []
+    for module_name in arguments.modules or list(IMPORT_BUDGETS):
+        forbidden_modules, budget_ms = IMPORT_BUDGETS.get(module_name, ((), float('inf')))
+        measurement = measure_import(module_name, forbidden_modules, budget_ms * arguments.budget_factor, arguments.repeat)
+        is_over_budget = measurement.import_ms > measurement.budget_ms
+        if is_over_budget or measurement.loaded_forbidden_modules:
+            failures.append(measurement)
+        print(
+            f'{measurement.module_name:<40} {measurement.import_ms:8.1f} ms  budget {measurement.budget_ms:8.1f} ms'
+            f'{"  OVER BUDGET" if is_over_budget else ""}'
+            f'{"  loads: " + ", ".join(measurement.loaded_forbidden_modules) if measurement.loaded_forbidden_modules else ""}'
+        )
+
+    if failures:
+        sys.exit(f'{len(failures)} import regression(s): {", ".join(failure.module_name for failure in failures)}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# tests/conftest.py
+
+# Import required libraries and packages
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from housing.util import load_dataset_schema
+
+# The dataset schema the pipeline and the serving apps use
+SCHEMA_FILE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'schema.yaml')
+
+def make_housing_frame(n_rows: int, seed: int=0) -> pd.DataFrame:
+    """
+    Synthetic housing records following the dataset schema, with missing values in every
+    numerical column and in the categorical one.
+    """
+    rng = np.random.default_rng(seed)
+    data_frame = pd.DataFrame({
+        'longitude': rng.uniform(-124.3, -114.3, n_rows),
+        'latitude': rng.uniform(32.5, 42.0, n_rows),
+        'housing_median_age': rng.integers(1, 52, n_rows).astype(float),
+        'total_rooms': rng.integers(100, 8000, n_rows).astype(float),
+        'total_bedrooms': rng.integers(20, 1500, n_rows).astype(float),
+        'population': rng.integers(50, 5000, n_rows).astype(float),
+        'households': rng.integers(20, 1500, n_rows).astype(float),
+        'median_income': rng.uniform(0.5, 15.0, n_rows),
+        'ocean_proximity': rng.choice(['<1H OCEAN', 'INLAND', 'ISLAND', 'NEAR BAY', 'NEAR OCEAN'], n_rows)
+    })
+    data_frame['median_house_value'] = (
+        50000 + 30000 * data_frame['median_income'] - 40000 * (data_frame['ocean_proximity'] == 'INLAND')
+        + rng.normal(0, 20000, n_rows)
+    )
+    for column in ('longitude', 'total_bedrooms', 'median_income', 'ocean_proximity'):
+        data_frame.loc[rng.choice(n_rows, n_rows // 50, replace=False), column] = np.nan
+    return data_frame
+
+@pytest.fixture(scope='session')
+def dataset_schema():
+    return load_dataset_schema(SCHEMA_FILE_PATH)
+
+@pytest.fixture(scope='session')
+def housing_frame() -> pd.DataFrame:
+    return make_housing_frame(3000)
+
+@pytest.fixture
+def preprocessing(dataset_schema):
+    """
+    An unfitted preprocessing object built like the one of the data transformation.
+    """
+    from sklearn.preprocessing import StandardScaler, OneHotEncoder
+    from sklearn.pipeline import Pipeline
+    from sklearn.compose import ColumnTransformer
+    from sklearn.impute import SimpleImputer
+    from housing.component.feature_generator import FeatureGenerator
+
+    numerical_columns = list(dataset_schema.numerical_columns)
+    categorical_columns = list(dataset_schema.categorical_columns)
+    num_pipeline = Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='median')),
+        ('feature_generator', FeatureGenerator(add_bedrooms_per_room=True, columns=numerical_columns)),
+        ('scaler', StandardScaler())
+    ])
+    cat_pipeline = Pipeline(steps=[
+        ('impute', SimpleImputer(strategy='most_frequent')),
+        ('one_hot_encoder', OneHotEncoder()),
+        ('scaler', StandardScaler(with_mean=False))
+    ])
+    return ColumnTransformer([
+        ('num_pipeline', num_pipeline, numerical_columns),
+        ('cat_pipeline', cat_pipeline, categorical_columns),
+    ])
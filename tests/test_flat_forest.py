@@ -0,0 +1,92 @@
+# tests/test_flat_forest.py
+
+# Import required libraries and packages
+import pickle
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor, ExtraTreesRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.tree import DecisionTreeRegressor
+
+from housing.component.housing_estimator import HousingEstimatorModel
+from housing.serving.flat_forest import FlatForest
+from conftest import make_housing_frame
+
+MODELS = {
+    'random_forest': lambda: RandomForestRegressor(n_estimators=25, random_state=0),
+    'extra_trees': lambda: ExtraTreesRegressor(n_estimators=25, random_state=0),
+    'decision_tree': lambda: DecisionTreeRegressor(random_state=0),
+}
+
+@pytest.fixture(params=sorted(MODELS))
+def model_name(request) -> str:
+    return request.param
+
+@pytest.fixture(params=['float32', 'float64'])
+def dtype(request) -> str:
+    return request.param
+
+@pytest.fixture
+def fitted(model_name, dtype, preprocessing, housing_frame):
+    """
+    The fitted preprocessing object and model, trained in the given precision.
+    """
+    X = housing_frame.drop(columns='median_house_value')
+    transformed = preprocessing.fit_transform(X).astype(dtype)
+    model = MODELS[model_name]().fit(transformed, housing_frame['median_house_value'])
+    return preprocessing, model
+
+def transform(preprocessing, data_frame, dtype: str) -> np.array:
+    return preprocessing.transform(data_frame.drop(columns='median_house_value')).astype(dtype)
+
+def test_predict_matches_sklearn_on_a_large_batch(fitted, dtype):
+    preprocessing, model = fitted
+    X = transform(preprocessing, make_housing_frame(20000, seed=1), dtype)
+    np.testing.assert_array_equal(FlatForest.from_estimator(model).predict(X), model.predict(X))
+
+def test_predict_matches_sklearn_on_single_rows(fitted, dtype):
+    preprocessing, model = fitted
+    flat_forest = FlatForest.from_estimator(model)
+    X = transform(preprocessing, make_housing_frame(50, seed=2), dtype)
+    for index in range(len(X)):
+        np.testing.assert_array_equal(flat_forest.predict(X[index:index + 1]), model.predict(X[index:index + 1]))
+
+def test_predict_matches_sklearn_on_imputed_rows(fitted, dtype):
+    preprocessing, model = fitted
+    data_frame = make_housing_frame(2000, seed=3)
+    data_frame.loc[::3, ['total_bedrooms', 'median_income', 'ocean_proximity']] = np.nan
+    X = transform(preprocessing, data_frame, dtype)
+    np.testing.assert_array_equal(FlatForest.from_estimator(model).predict(X), model.predict(X))
+
+def test_predict_matches_sklearn_on_training_rows(fitted, dtype, housing_frame):
+    # Training rows land exactly on the split thresholds of the trees
+    preprocessing, model = fitted
+    X = transform(preprocessing, housing_frame, dtype)
+    np.testing.assert_array_equal(FlatForest.from_estimator(model).predict(X), model.predict(X))
+
+def test_enable_flat_forest_round_trip(fitted, dtype, housing_frame):
+    preprocessing, model = fitted
+    housing_estimator = HousingEstimatorModel(preprocessing, model, dtype=dtype)
+    X = make_housing_frame(500, seed=4).drop(columns='median_house_value')
+    records = X.head(20).to_dict(orient='records')
+    expected = housing_estimator.predict(X)
+    expected_records = housing_estimator.predict_records(records)
+
+    assert housing_estimator.enable_flat_forest(housing_frame.head(200).drop(columns='median_house_value'))
+    assert isinstance(housing_estimator.get_predictor(), FlatForest)
+    np.testing.assert_array_equal(housing_estimator.predict(X), expected)
+    np.testing.assert_array_equal(housing_estimator.predict_records(records), expected_records)
+
+    # The engine is not saved with the model, the loader enables it again
+    loaded_estimator = pickle.loads(pickle.dumps(housing_estimator))
+    assert not isinstance(loaded_estimator.get_predictor(), FlatForest)
+    np.testing.assert_array_equal(loaded_estimator.predict(X), expected)
+    assert loaded_estimator.enable_flat_forest(housing_frame.head(200).drop(columns='median_house_value'))
+    np.testing.assert_array_equal(loaded_estimator.predict(X), expected)
+
+def test_enable_flat_forest_skips_other_models(preprocessing, housing_frame):
+    X = housing_frame.drop(columns='median_house_value')
+    model = LinearRegression().fit(preprocessing.fit_transform(X), housing_frame['median_house_value'])
+    housing_estimator = HousingEstimatorModel(preprocessing, model)
+    assert not housing_estimator.enable_flat_forest(X.head(200))
+    assert housing_estimator.get_predictor() is model
@@ -0,0 +1,128 @@
+# tests/test_inference_bundle.py
+
+# Import required libraries and packages
+import os
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor, ExtraTreesRegressor, GradientBoostingRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.tree import DecisionTreeRegressor
+
+from housing.constant import INFERENCE_BUNDLE_FILE_NAME
+from housing.util import save_object
+from housing.component.housing_estimator import HousingEstimatorModel
+from housing.component.inference_bundle import InferenceBundleExporter
+from housing.component.model_pusher import ModelPusher
+from housing.entity.config_entity import ModelPusherConfig
+from housing.entity.artifact_entity import DataIngestionArtifact, ModelEvaluationArtifact
+from housing.serving.bundle_runtime import InferenceBundle
+from conftest import make_housing_frame
+
+# The tolerance of the model pusher configuration
+TOLERANCE = 1.0e-6
+
+MODELS = {
+    'linear_regression': lambda: LinearRegression(),
+    'ridge': lambda: Ridge(alpha=1.0),
+    'random_forest': lambda: RandomForestRegressor(n_estimators=25, random_state=0),
+    'extra_trees': lambda: ExtraTreesRegressor(n_estimators=25, random_state=0),
+    'decision_tree': lambda: DecisionTreeRegressor(random_state=0),
+}
+
+@pytest.fixture(params=sorted(MODELS))
+def model_name(request) -> str:
+    return request.param
+
+@pytest.fixture(params=['float32', 'float64'])
+def dtype(request) -> str:
+    return request.param
+
+def fit_housing_model(model, preprocessing, housing_frame, dtype: str=None) -> HousingEstimatorModel:
+    X = housing_frame.drop(columns='median_house_value')
+    transformed = preprocessing.fit_transform(X)
+    if dtype is not None:
+        transformed = transformed.astype(dtype)
+    model.fit(transformed, housing_frame['median_house_value'])
+    return HousingEstimatorModel(preprocessing, model, dtype=dtype)
+
+def assert_close(predicted, expected, dtype: str=None) -> None:
+    # Features rounded to float32 may differ in their last bit, which a linear model scales up
+    tolerance = TOLERANCE if dtype != 'float32' else max(TOLERANCE, 64 * float(np.finfo(np.float32).eps))
+    allowed_difference = tolerance * max(1.0, float(np.max(np.abs(expected))))
+    assert float(np.max(np.abs(np.asarray(predicted) - np.asarray(expected)))) <= allowed_difference
+
+def test_bundle_matches_the_estimator(model_name, dtype, preprocessing, housing_frame, tmp_path):
+    housing_model = fit_housing_model(MODELS[model_name](), preprocessing, housing_frame, dtype)
+    bundle_file_path = InferenceBundleExporter(housing_model).export(str(tmp_path / INFERENCE_BUNDLE_FILE_NAME))
+    bundle = InferenceBundle.load(bundle_file_path)
+
+    # Rows with missing values are imputed by both
+    data_frame = make_housing_frame(5000, seed=5).drop(columns='median_house_value')
+    data_frame.loc[::7, ['total_bedrooms', 'ocean_proximity']] = np.nan
+    expected = housing_model.predict(data_frame)
+    assert_close(
+        bundle.predict_columns({column: data_frame[column].to_numpy() for column in bundle.columns}), expected, dtype
+    )
+
+    # Records, one at a time and as a batch, with missing fields and values
+    records = [
+        {key: value for key, value in record.items() if value == value}
+        for record in data_frame.head(50).to_dict(orient='records')
+    ]
+    assert_close(bundle.predict_records(records), expected[:50], dtype)
+    for record, expected_prediction in zip(records[:10], expected[:10]):
+        assert_close(bundle.predict_records([record]), [expected_prediction], dtype)
+
+    # Forests predict with the same engine and the same thresholds
+    if model_name not in ('linear_regression', 'ridge'):
+        np.testing.assert_array_equal(
+            bundle.predict_columns({column: data_frame[column].to_numpy() for column in bundle.columns}), expected
+        )
+
+def test_exporter_check_parity(model_name, preprocessing, housing_frame, tmp_path):
+    housing_model = fit_housing_model(MODELS[model_name](), preprocessing, housing_frame)
+    exporter = InferenceBundleExporter(housing_model)
+    bundle_file_path = exporter.export(str(tmp_path / INFERENCE_BUNDLE_FILE_NAME))
+    data_frame = make_housing_frame(500, seed=6)
+    assert exporter.check_parity(bundle_file_path, data_frame, tolerance=TOLERANCE) <= TOLERANCE * np.max(
+        np.abs(housing_model.predict(data_frame))
+    )
+
+def push_model(housing_model, housing_frame, tmp_path):
+    model_file_path = str(tmp_path / 'evaluated' / 'model.pkl')
+    save_object(file_path=model_file_path, obj=housing_model)
+    test_file_path = str(tmp_path / 'test.csv')
+    housing_frame.head(200).to_csv(test_file_path, index=False)
+
+    return ModelPusher(
+        model_pusher_config=ModelPusherConfig(
+            export_dir_path=str(tmp_path / 'saved_models'),
+            model_version='2026-01-01-00-00-00',
+            warmup_sample_size=100,
+            inference_bundle_tolerance=TOLERANCE
+        ),
+        model_evaluation_artifact=ModelEvaluationArtifact(
+            is_model_accepted=True, evaluated_model_path=model_file_path, evaluation_report_file_path=None
+        ),
+        data_ingestion_artifact=DataIngestionArtifact(
+            train_file_path=None, test_file_path=test_file_path, is_ingested=True, message=''
+        )
+    ).initiate_model_pusher()
+
+def test_pusher_publishes_the_bundle(preprocessing, housing_frame, tmp_path):
+    housing_model = fit_housing_model(MODELS['random_forest'](), preprocessing, housing_frame)
+    model_pusher_artifact = push_model(housing_model, housing_frame, tmp_path)
+    assert model_pusher_artifact.inference_bundle_message is None
+    assert os.path.isfile(model_pusher_artifact.inference_bundle_file_path)
+
+def test_pusher_records_a_version_published_without_bundle(preprocessing, housing_frame, tmp_path, caplog):
+    housing_model = fit_housing_model(GradientBoostingRegressor(n_estimators=5), preprocessing, housing_frame)
+    model_pusher_artifact = push_model(housing_model, housing_frame, tmp_path)
+    assert model_pusher_artifact.is_model_pusher
+    assert model_pusher_artifact.inference_bundle_file_path is None
+    assert model_pusher_artifact.inference_bundle_message
+    assert any(
+        record.levelname == 'WARNING' and 'without inference bundle' in record.getMessage() for record in caplog.records
+    )
+    version_dir_path = os.path.dirname(model_pusher_artifact.export_model_file_path)
+    assert not os.path.exists(os.path.join(version_dir_path, INFERENCE_BUNDLE_FILE_NAME))